@@ -8,6 +8,12 @@ setup(
     install_requires=[
         "pandas",
         "openpyxl",
+        "requests",
     ],
+    entry_points={
+        "console_scripts": [
+            "database360=database360.cli:main",
+        ],
+    },
     python_requires=">=3.8",
 )
@@ -0,0 +1,368 @@
+"""Batch mode probing the resources of several institutions in one process.
+
+Every institution keeps its own ProbeRunner, settings and result file, but all
+of them share one keep-alive HTTP client and response cache, one per-host rate
+limiter and one thread pool. Resources are dispatched round-robin across
+institutions, and no institution has more resources in flight than its own
+'Max Workers' setting, so a large catalog cannot starve a small one.
+
+Run with ``python -m database360.batch CONFIG [CONFIG ...] --output-dir results``.
+"""
+
+import argparse
+import logging
+import re
+import sys
+import urllib.parse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+from database360.config.loader import ConfigurationLoader, DEFAULT_CACHE_DIR, ENGINES
+from database360.config.settings import get_setting
+from database360.net.client import HttpClient, DEFAULT_TIMEOUT, DELAY_BETWEEN_REQUESTS
+from database360.net.rate_limiter import (
+    AdaptiveHostRateLimiter, DEFAULT_MAX_REQUEST_RATE, DEFAULT_MIN_REQUEST_RATE
+)
+from database360.probe_runner import ProbeRunner
+from database360.result_sinks import ResultSink, SINKS_BY_EXTENSION, open_sink
+from database360.result_store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the shared thread pool when --max-workers is not given
+DEFAULT_MAX_BATCH_WORKERS = 32
+
+# Extension of the per-institution result files when none is chosen
+DEFAULT_OUTPUT_FORMAT = 'jsonl'
+
+# Settings of the shared client and rate limiter, with their default and how the institutions'
+# values are combined so that the most polite institution wins
+SHARED_CLIENT_SETTINGS = {
+    'host_request_interval': (DELAY_BETWEEN_REQUESTS, max),
+    'min_request_rate': (DEFAULT_MIN_REQUEST_RATE, min),
+    'max_request_rate': (DEFAULT_MAX_REQUEST_RATE, min),
+    'request_timeout': (DEFAULT_TIMEOUT, max),
+    'request_retries': (3, min),
+    'retry_backoff_factor': (0.5, max),
+    'connections_per_host': (10, min),
+}
+
+
+def institution_name(institution_config: Dict, config_source: str) -> str:
+    """Derive a file-name-safe name for an institution.
+
+    The 'Institution Name' setting is used when present; otherwise the name is
+    taken from the configuration workbook's file name or Google Sheet ID.
+
+    Args:
+        institution_config: Dictionary containing institution configuration
+        config_source: Path or URL the configuration was loaded from
+
+    Returns:
+        Lowercase name made of letters, digits and dashes
+    """
+    name = get_setting(institution_config, 'institution_name', None, str)
+    if not name:
+        parsed = urllib.parse.urlparse(config_source)
+        sheet = re.search(r'/d/([\w-]+)', parsed.path) if parsed.scheme in ('http', 'https') else None
+        name = sheet.group(1) if sheet else Path(parsed.path or config_source).stem
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'institution'
+
+
+def shared_client_config(configs: List[Dict]) -> Dict:
+    """Combine the institutions' settings for the client and rate limiter they share.
+
+    Request pacing, timeouts, retries and pool sizes are combined with
+    SHARED_CLIENT_SETTINGS; every other setting, such as the HTTP cache, comes
+    from the first configuration. Settings on which the institutions differ
+    are logged with the value the batch uses.
+
+    Args:
+        configs: Institution configurations of the batch
+
+    Returns:
+        Configuration for HttpClient.from_config and AdaptiveHostRateLimiter.from_config
+    """
+    shared = dict(configs[0]) if configs else {}
+    for key, (default, combine) in SHARED_CLIENT_SETTINGS.items():
+        values = [get_setting(config, key, default, float) for config in configs]
+        if not values:
+            continue
+        shared[key] = combine(values)
+        if len(set(values)) > 1:
+            logger.info("Institutions differ on '%s'; the batch uses %g for all of them", key, shared[key])
+    return shared
+
+
+class BatchInstitution:
+    """One institution of a batch: its configuration, resources and progress."""
+
+    def __init__(self, name: str, config_source: str, institution_config: Dict, resources: List[Dict]):
+        """Initialize the institution.
+
+        Args:
+            name: File-name-safe institution name, used for its result file
+            config_source: Path or URL the configuration was loaded from
+            institution_config: Dictionary containing institution configuration
+            resources: Resources to probe
+        """
+        self.name = name
+        self.config_source = config_source
+        self.institution_config = institution_config
+        self.resources = resources
+        self.max_workers = max(1, get_setting(institution_config, 'max_workers', 1, int))
+        self.runner: Optional[ProbeRunner] = None
+        self.sink: Optional[ResultSink] = None
+        self.result_store: Optional[ResultStore] = None
+        self.in_flight = 0
+        self._queue: Deque[Tuple[int, Dict]] = deque(enumerate(resources, 1))
+        self._buffer: Dict[int, Dict] = {}
+        self._next_index = 1
+
+    @property
+    def has_queued(self) -> bool:
+        """Whether resources remain to be dispatched."""
+        return bool(self._queue)
+
+    @property
+    def finished(self) -> bool:
+        """Whether every result has been written."""
+        return self._next_index > len(self.resources)
+
+    def next_resource(self) -> Tuple[int, Dict]:
+        """Take the next resource to dispatch, with its 1-based index."""
+        return self._queue.popleft()
+
+    def complete(self, index: int, result: Dict):
+        """Accept a result and write every result now available in input order."""
+        self._buffer[index] = result
+        while self._next_index in self._buffer:
+            result = self._buffer.pop(self._next_index)
+            if self.sink is not None:
+                self.sink.write(result)
+            self.runner.notify_resource(result)
+            self._next_index += 1
+
+
+def load_institutions(config_sources: List[str], cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+                      engine: str = 'pandas') -> List[BatchInstitution]:
+    """Load the configuration of each institution of a batch.
+
+    A source that cannot be loaded is logged and left out so the other
+    institutions still run.
+
+    Args:
+        config_sources: Paths of configuration workbooks or URLs of Google Sheets
+        cache_dir: Directory caching downloaded workbooks and parsed snapshots
+        engine: Workbook reader, 'pandas' or 'openpyxl'
+
+    Returns:
+        Loaded institutions, with unique names
+    """
+    institutions = []
+    names = set()
+    for source in config_sources:
+        try:
+            loader = ConfigurationLoader(source, cache_dir=cache_dir, engine=engine)
+            institution_config = loader.load_institution_config()
+            resources = loader.load_resources()
+        except Exception as e:
+            logger.warning("Error loading configuration %s: %s", source, e)
+            continue
+        if not institution_config.get('catalog_search_url'):
+            logger.warning("Skipping configuration %s: no Catalog Search URL", source)
+            continue
+
+        name = base = institution_name(institution_config, source)
+        suffix = 2
+        while name in names:
+            name = f"{base}-{suffix}"
+            suffix += 1
+        names.add(name)
+        institutions.append(BatchInstitution(name, source, institution_config, resources))
+    return institutions
+
+
+class BatchRunner:
+    """Probes the resources of several institutions on one shared pool, client and rate limiter."""
+
+    def __init__(self, institutions: List[BatchInstitution], max_workers: Optional[int] = None,
+                 output_dir: Optional[str] = None, output_format: str = DEFAULT_OUTPUT_FORMAT,
+                 result_store_dir: Optional[str] = None):
+        """Initialize the batch runner.
+
+        The shared client and rate limiter take the most polite of the institutions'
+        request rates, timeouts and retries, and the HTTP cache of the first
+        institution; see shared_client_config.
+
+        Args:
+            institutions: Institutions to probe
+            max_workers: Size of the shared thread pool. Defaults to the sum of the
+                         institutions' 'Max Workers' settings, capped at DEFAULT_MAX_BATCH_WORKERS.
+            output_dir: Directory receiving one result file per institution
+            output_format: Extension of the result files: jsonl, csv or sqlite
+            result_store_dir: Optional directory of per-institution result stores for incremental runs
+        """
+        if f".{output_format}" not in SINKS_BY_EXTENSION:
+            raise ValueError(f"Unsupported output format '{output_format}'")
+        self.institutions = institutions
+        if max_workers is None:
+            max_workers = min(DEFAULT_MAX_BATCH_WORKERS, sum(i.max_workers for i in institutions))
+        self.max_workers = max(1, max_workers)
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.output_format = output_format
+        self.result_store_dir = Path(result_store_dir) if result_store_dir else None
+
+        shared_config = shared_client_config([i.institution_config for i in institutions])
+        host_request_interval = get_setting(shared_config, 'host_request_interval', DELAY_BETWEEN_REQUESTS, float)
+        self.rate_limiter = AdaptiveHostRateLimiter.from_config(shared_config, host_request_interval)
+        self.client = HttpClient.from_config(shared_config, self.max_workers, self.rate_limiter)
+        self._active: Deque[BatchInstitution] = deque()
+
+    def run(self, full: bool = False) -> Dict[str, Dict]:
+        """Probe every institution's resources.
+
+        Args:
+            full: Probe every resource even if the result store holds a fresh result for it
+
+        Returns:
+            Run summary of each institution, by name
+        """
+        try:
+            for institution in self.institutions:
+                self._start(institution)
+            self._active = deque(i for i in self.institutions if i.has_queued)
+
+            pending: Dict[Future, Tuple[BatchInstitution, int]] = {}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                try:
+                    while True:
+                        self._dispatch(executor, pending, full)
+                        if not pending:
+                            break
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            institution, index = pending.pop(future)
+                            institution.in_flight -= 1
+                            institution.complete(index, future.result())
+                            if institution.finished:
+                                self._finish(institution)
+                finally:
+                    for future in pending:
+                        future.cancel()
+        finally:
+            for institution in self.institutions:
+                self._finish(institution)
+            self.client.close()
+        return {i.name: i.runner.summary for i in self.institutions if i.runner is not None}
+
+    def _start(self, institution: BatchInstitution):
+        """Create an institution's runner and outputs and prepare its run."""
+        if self.result_store_dir is not None:
+            self.result_store_dir.mkdir(parents=True, exist_ok=True)
+            institution.result_store = ResultStore(str(self.result_store_dir / f"{institution.name}.sqlite"))
+        if self.output_dir is not None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            institution.sink = open_sink(str(self.output_dir / f"{institution.name}.{self.output_format}"))
+
+        institution.runner = ProbeRunner(institution.institution_config, max_workers=institution.max_workers,
+                                         result_store=institution.result_store, client=self.client,
+                                         rate_limiter=self.rate_limiter)
+        logger.info("Institution %s: %d resources", institution.name, len(institution.resources))
+        institution.runner.start_run(institution.resources)
+        if institution.finished:
+            self._finish(institution)
+
+    def _dispatch(self, executor: ThreadPoolExecutor, pending: Dict[Future, Tuple[BatchInstitution, int]],
+                  full: bool):
+        """Submit resources round-robin across institutions until the pool or every institution is full."""
+        skipped = 0
+        while self._active and len(pending) < self.max_workers and skipped < len(self._active):
+            institution = self._active[0]
+            self._active.rotate(-1)
+            if institution.in_flight >= institution.max_workers:
+                skipped += 1
+                continue
+            skipped = 0
+
+            index, resource = institution.next_resource()
+            if not institution.has_queued:
+                self._active.remove(institution)
+            institution.in_flight += 1
+            future = executor.submit(institution.runner.run_resource, index, len(institution.resources),
+                                     resource, full)
+            pending[future] = (institution, index)
+
+    def _finish(self, institution: BatchInstitution):
+        """Summarize an institution's run and close its outputs, once."""
+        if institution.runner is None or institution.runner.summary is not None:
+            return
+        institution.runner.finish_run()
+        if institution.sink is not None:
+            institution.sink.close()
+        if institution.result_store is not None:
+            institution.result_store.close()
+
+
+def read_sources(paths: List[str], sources_file: Optional[str] = None) -> List[str]:
+    """Collect configuration sources from the command line and an optional list file.
+
+    Args:
+        paths: Sources given as arguments
+        sources_file: File with one source per line; blank lines and lines starting with # are ignored
+
+    Returns:
+        Configuration sources in order
+    """
+    sources = list(paths)
+    if sources_file:
+        with open(sources_file, encoding='utf-8') as f:
+            sources.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith('#'))
+    return sources
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a batch from the command line.
+
+    Args:
+        argv: Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        Process exit code: 1 if a configuration could not be loaded, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Probe the resources of several institutions in one process.")
+    parser.add_argument('sources', nargs='*',
+                        help="Paths of configuration workbooks or URLs of Google Sheets, one per institution")
+    parser.add_argument('--sources-file', help="File listing one configuration source per line")
+    parser.add_argument('--output-dir', default='results', help="Directory receiving one result file per institution")
+    parser.add_argument('--format', default=DEFAULT_OUTPUT_FORMAT,
+                        choices=sorted(extension.lstrip('.') for extension in SINKS_BY_EXTENSION),
+                        help="Format of the result files")
+    parser.add_argument('--max-workers', type=int, help="Size of the thread pool shared by all institutions")
+    parser.add_argument('--result-store-dir', default=str(DEFAULT_CACHE_DIR / 'results'),
+                        help="Directory of per-institution SQLite stores used for incremental runs")
+    parser.add_argument('--full', action='store_true',
+                        help="Probe every resource, even those with an unchanged and recent result")
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help="Directory caching downloaded configuration workbooks and parsed snapshots")
+    parser.add_argument('--engine', choices=ENGINES, default='openpyxl',
+                        help="Workbook reader; openpyxl avoids importing pandas")
+    parser.add_argument('--log-level', default='INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'),
+                        help="Logging verbosity")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level, format='%(message)s')
+
+    sources = read_sources(args.sources, args.sources_file)
+    if not sources:
+        parser.error("no configuration sources given")
+
+    institutions = load_institutions(sources, cache_dir=Path(args.cache_dir), engine=args.engine)
+    runner = BatchRunner(institutions, max_workers=args.max_workers, output_dir=args.output_dir,
+                         output_format=args.format, result_store_dir=args.result_store_dir)
+    runner.run(full=args.full)
+    return 0 if len(institutions) == len(sources) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Load benchmark of the probe pipeline against the local fake catalog server.
+
+Run with ``python -m database360.bench``. For each resource count the whole
+ProbeRunner.run_probes pipeline is timed and resources per second, per-resource
+p50/p95 latency and the peak RSS of the process are reported.
+"""
+
+import argparse
+import json
+import logging
+import math
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+from database360.probe_runner import ProbeRunner, PROBE_BACKENDS
+from database360.testing.fake_server import FakeCatalogServer
+
+try:
+    import resource as resource_usage
+except ImportError:  # pragma: no cover - not available on Windows
+    resource_usage = None
+
+# Resource counts benchmarked by default
+DEFAULT_SIZES = (10, 1000, 10000)
+
+
+class TimedProbeRunner(ProbeRunner):
+    """ProbeRunner recording the wall time spent probing each resource."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies: List[float] = []
+
+    def _probe_resource(self, index, total, resource, full=False):
+        started = time.perf_counter()
+        try:
+            return super()._probe_resource(index, total, resource, full)
+        finally:
+            # list.append is atomic, so worker threads can record without a lock
+            self.latencies.append(time.perf_counter() - started)
+
+    async def _probe_resource_async(self, index, total, resource, full=False):
+        started = time.perf_counter()
+        try:
+            return await super()._probe_resource_async(index, total, resource, full)
+        finally:
+            self.latencies.append(time.perf_counter() - started)
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a sequence.
+
+    Args:
+        values: Sample values
+        fraction: Percentile as a fraction between 0 and 1
+
+    Returns:
+        The percentile, or 0.0 for an empty sequence
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(fraction * len(ordered))))
+    return ordered[rank - 1]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Return the peak resident set size of this process, or None where it is unavailable."""
+    if resource_usage is None:
+        return None
+    peak = resource_usage.getrusage(resource_usage.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def benchmark_config(server: FakeCatalogServer, backend: str = 'threads', max_workers: int = 16,
+                     bulk: bool = False) -> Dict:
+    """Institution settings used to probe the fake server as fast as it allows.
+
+    Args:
+        server: Running fake catalog server
+        backend: Probe backend
+        max_workers: Number of worker threads for the threads backend
+        bulk: Index the catalog's database listing instead of searching for each resource
+
+    Returns:
+        Institution configuration dictionary
+    """
+    config = {
+        'catalog_search_url': server.catalog_search_url,
+        'valid_catalog_links_match': r'/catalog/\d+',
+        'host_request_interval': 0,
+        'retry_backoff_factor': 0,
+        'max_workers': max_workers,
+        'connections_per_host': max_workers,
+        'probe_backend': backend,
+    }
+    if bulk:
+        config['catalog_listing_url'] = server.listing_url
+    return config
+
+
+def run_benchmark(server: FakeCatalogServer, size: int, backend: str = 'threads', max_workers: int = 16,
+                  bulk: bool = False, quiet: bool = True) -> Dict:
+    """Probe ``size`` synthetic resources and measure the run.
+
+    Args:
+        server: Running fake catalog server
+        size: Number of resources
+        backend: Probe backend
+        max_workers: Number of worker threads for the threads backend
+        bulk: Index the catalog's database listing instead of searching for each resource
+        quiet: Only log warnings from the run, not its progress
+
+    Returns:
+        Dictionary of measurements for the run
+    """
+    resources = server.resources(size)
+    runner = TimedProbeRunner(benchmark_config(server, backend, max_workers, bulk))
+    catalog_requests = server.request_counts['catalog']
+    package_logger = logging.getLogger('database360')
+    level = package_logger.level
+    if quiet:
+        package_logger.setLevel(logging.WARNING)
+    try:
+        started = time.perf_counter()
+        results = runner.run_probes(resources)
+        elapsed = time.perf_counter() - started
+    finally:
+        runner.client.close()
+        package_logger.setLevel(level)
+
+    matched = sum(
+        1 for result in results
+        if 'purl_link_text' in result['catalog_probe'] and result['purl_probe'].get('purl_led_to_database')
+    )
+    peak_rss = peak_rss_bytes()
+    return {
+        'resources': size,
+        'backend': backend,
+        'seconds': round(elapsed, 3),
+        'resources_per_second': round(size / elapsed, 1) if elapsed > 0 else 0.0,
+        'p50_ms': round(1000 * percentile(runner.latencies, 0.50), 2),
+        'p95_ms': round(1000 * percentile(runner.latencies, 0.95), 2),
+        'peak_rss_mb': round(peak_rss / (1024 * 1024), 1) if peak_rss is not None else None,
+        'matched': matched,
+        'catalog_requests': server.request_counts['catalog'] - catalog_requests,
+    }
+
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, backend: str = 'threads', max_workers: int = 16,
+                   latency: float = 0.0, page_size: int = 10, padding_bytes: int = 0,
+                   error_rate: float = 0.0, bulk: bool = False) -> List[Dict]:
+    """Run the benchmark for each resource count against one fake catalog server.
+
+    Sizes run in increasing order because peak RSS is a high-water mark for the
+    whole process; each reported value is therefore the peak up to that size.
+
+    Args:
+        sizes: Resource counts to benchmark
+        backend: Probe backend
+        max_workers: Number of worker threads for the threads backend
+        latency: Seconds the fake server delays each response
+        page_size: Number of documents on a search results page
+        padding_bytes: Extra markup added to every page
+        error_rate: Fraction of requests the fake server fails with 503
+        bulk: Index the catalog's database listing instead of searching for each resource
+
+    Returns:
+        One measurement dictionary per size
+    """
+    measurements = []
+    with FakeCatalogServer(latency=latency, page_size=page_size, padding_bytes=padding_bytes,
+                           error_rate=error_rate, listing_count=max(sizes)) as server:
+        for size in sorted(sizes):
+            measurements.append(run_benchmark(server, size, backend=backend, max_workers=max_workers, bulk=bulk))
+    return measurements
+
+
+def format_table(measurements: List[Dict]) -> str:
+    """Format measurements as a plain-text table."""
+    columns = ('resources', 'backend', 'seconds', 'resources_per_second', 'p50_ms', 'p95_ms', 'peak_rss_mb',
+               'matched', 'catalog_requests')
+    rows = [columns] + [tuple(str(m[column]) for column in columns) for m in measurements]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return '\n'.join('  '.join(value.rjust(width) for value, width in zip(row, widths)) for row in rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark from the command line.
+
+    Args:
+        argv: Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        Process exit code: 1 if a run fell below --min-rate, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the probe pipeline against a local fake catalog.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Resource counts to benchmark")
+    parser.add_argument('--backend', choices=PROBE_BACKENDS, default='threads', help="Probe backend")
+    parser.add_argument('--max-workers', type=int, default=16, help="Worker threads for the threads backend")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds the server delays each response")
+    parser.add_argument('--page-size', type=int, default=10, help="Documents per search results page")
+    parser.add_argument('--padding-bytes', type=int, default=0, help="Extra markup added to every page")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests failed with 503")
+    parser.add_argument('--bulk', action='store_true',
+                        help="Index the catalog's database listing instead of searching for each resource")
+    parser.add_argument('--json', action='store_true', help="Print measurements as JSON")
+    parser.add_argument('--min-rate', type=float,
+                        help="Fail if any run probes fewer resources per second than this")
+    args = parser.parse_args(argv)
+
+    measurements = run_benchmarks(args.sizes, backend=args.backend, max_workers=args.max_workers,
+                                  latency=args.latency, page_size=args.page_size,
+                                  padding_bytes=args.padding_bytes, error_rate=args.error_rate, bulk=args.bulk)
+    print(json.dumps(measurements, indent=2) if args.json else format_table(measurements))
+
+    if args.min_rate is not None:
+        slow = [m for m in measurements if m['resources_per_second'] < args.min_rate]
+        for m in slow:
+            print(f"{m['resources']} resources: {m['resources_per_second']}/s is below {args.min_rate}/s",
+                  file=sys.stderr)
+        return 1 if slow else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
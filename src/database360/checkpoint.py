@@ -0,0 +1,121 @@
+"""Durable progress checkpoints so an interrupted run can be resumed."""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """Append-only JSONL file of the results completed in the current run.
+
+    Every result is appended as soon as its resource completes and the file is
+    fsynced every ``every`` results, so at most ``every - 1`` results are lost
+    if the process is killed. The first line identifies the configuration of
+    the run and every result is recorded with the fingerprint of its inputs, so
+    a resume never replays results of another institution or of resources
+    that changed since.
+    """
+
+    def __init__(self, path: str, every: int = 1):
+        """Initialize the checkpoint.
+
+        Args:
+            path: Path of the checkpoint file
+            every: Number of results between fsyncs
+        """
+        self.path = Path(path).expanduser()
+        self.every = max(1, every)
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending = 0
+
+    def load(self, config_id: Optional[str] = None) -> Dict[str, Dict]:
+        """Read the results recorded by a previous, possibly interrupted, run.
+
+        A partially written last line (from a crash mid-write) is ignored.
+
+        Args:
+            config_id: Identity of the current configuration. When given, a checkpoint
+                       written for another configuration yields no results.
+
+        Returns:
+            Dictionary mapping database names to entries with the recorded 'result' and the
+            'fingerprint' of its inputs, None for results recorded without one
+        """
+        completed = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if 'checkpoint' in entry:
+                        recorded_id = entry['checkpoint'].get('config')
+                        if config_id is not None and recorded_id != config_id:
+                            logger.warning("Checkpoint %s belongs to another configuration, ignoring it", self.path)
+                            return {}
+                        continue
+                    if 'result' not in entry:
+                        # Checkpoints of earlier versions hold bare results
+                        entry = {'fingerprint': None, 'result': entry}
+                    completed[entry['result'].get('database_name')] = entry
+        except FileNotFoundError:
+            pass
+        return completed
+
+    def start(self, resume: bool = False, config_id: Optional[str] = None):
+        """Open the checkpoint for writing.
+
+        Args:
+            resume: Keep previously recorded results instead of starting over
+            config_id: Identity of the configuration, written at the top of a new checkpoint
+        """
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if resume and self.path.exists():
+                # Terminate a partially written last line so new records start on their own line
+                needs_newline = False
+                with open(self.path, 'rb') as f:
+                    if f.seek(0, os.SEEK_END) > 0:
+                        f.seek(-1, os.SEEK_END)
+                        needs_newline = f.read(1) != b'\n'
+                self._file = open(self.path, 'a', encoding='utf-8')
+                if needs_newline:
+                    self._file.write('\n')
+            else:
+                self._file = open(self.path, 'w', encoding='utf-8')
+                if config_id is not None:
+                    self._file.write(json.dumps({'checkpoint': {'config': config_id}}) + '\n')
+            self._pending = 0
+
+    def record(self, result: Dict, fingerprint: Optional[str] = None):
+        """Durably record a completed result. Safe to call from worker threads.
+
+        Args:
+            result: Combined probe result of one resource
+            fingerprint: Fingerprint of the resource's inputs, checked when the result is replayed
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps({'fingerprint': fingerprint, 'result': result}, default=str) + '\n')
+            self._file.flush()
+            self._pending += 1
+            if self._pending >= self.every:
+                os.fsync(self._file.fileno())
+                self._pending = 0
+
+    def close(self):
+        """Sync and close the checkpoint file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
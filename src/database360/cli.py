@@ -0,0 +1,295 @@
+"""Command line interface of Database 360, installed as the ``database360`` console script.
+
+Subcommands:
+    probe            Probe every resource of an institution (the default run)
+    probe-one        Probe a single resource and exit with 0 if it was found and its PURL works
+    validate-config  Check a configuration workbook without probing anything
+    diff             Report what changed between two runs recorded with --history
+    batch            Probe several institutions in one process
+    bench            Benchmark the probe pipeline against a local fake catalog
+
+This module only imports the standard library. Each subcommand imports what
+it needs when it runs, so ``--help`` and ``validate-config`` never load
+requests, and no command loads pandas unless ``--engine pandas`` is given.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+DEFAULT_CONFIG_SOURCE = "https://docs.google.com/spreadsheets/d/1VbcDF6cndXZVD186GqjV8qPabl6v3PQH/edit?gid=671040191#gid=671040191"
+
+# Mirrors config.loader.DEFAULT_CACHE_DIR without importing the loader to build the parser
+DEFAULT_CACHE_DIR = Path(os.environ.get('DATABASE360_CACHE_DIR', Path.home() / '.cache' / 'database360'))
+
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+# Subcommands whose arguments, options and --help included, are parsed by their own module
+PASSTHROUGH_COMMANDS = ('batch', 'bench')
+
+
+def configure_logging(level: str):
+    """Send log records to stderr as plain messages."""
+    logging.basicConfig(level=level, format='%(message)s')
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """Add the options choosing and reading the configuration workbook."""
+    parser.add_argument('--config', default=DEFAULT_CONFIG_SOURCE,
+                        help="Path to the configuration workbook or URL of a Google Sheet")
+    parser.add_argument('--engine', choices=('openpyxl', 'pandas'), default='openpyxl',
+                        help="Workbook reader; openpyxl avoids importing pandas")
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help="Directory caching downloaded configuration workbooks and parsed snapshots")
+    parser.add_argument('--shared-cache', default=os.environ.get('DATABASE360_SHARED_CACHE'),
+                        help="SQLite file caching parsed workbooks, catalog links and PURL redirect chains "
+                             "for every database360 process on the host")
+    parser.add_argument('--resources',
+                        help="CSV file of resources read instead of the workbook's Resources sheet, "
+                             "with the same column headers")
+    parser.add_argument('--log-level', default='INFO', choices=LOG_LEVELS,
+                        help="Logging verbosity; DEBUG also logs every search and link")
+
+
+def add_probe_arguments(parser: argparse.ArgumentParser):
+    """Add the options of the probe command."""
+    add_config_arguments(parser)
+    parser.add_argument('--result-store', default=str(DEFAULT_CACHE_DIR / 'results.sqlite'),
+                        help="SQLite file keeping the latest result per resource for incremental runs")
+    parser.add_argument('--full', action='store_true',
+                        help="Probe every resource, even those with an unchanged and recent result")
+    parser.add_argument('--output',
+                        help="Write each result as it completes to this .jsonl, .csv or .sqlite file")
+    parser.add_argument('--checkpoint', default=str(DEFAULT_CACHE_DIR / 'checkpoint.jsonl'),
+                        help="File recording completed resources so an interrupted run can be resumed")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip resources completed by the interrupted run recorded in the checkpoint")
+    parser.add_argument('--metrics',
+                        help="Write the run's metrics to this .json file or .prom Prometheus textfile")
+    parser.add_argument('--deadline', type=parse_deadline,
+                        help="Local time (HH:MM, or an ISO 8601 date and time) by which the run must be done; "
+                             "resources are probed by priority and those that do not fit are deferred")
+    parser.add_argument('--history',
+                        help="SQLite file recording the results of every run, compared with the diff command")
+    parser.add_argument('--stream', action='store_true',
+                        help="Probe resources while they are read instead of loading them all first; "
+                             "results are written to --output but not kept in memory")
+
+
+def parse_deadline(text: str) -> float:
+    """Parse a --deadline value into a Unix time.
+
+    Args:
+        text: 'HH:MM' for the next occurrence of that local time, or an ISO 8601 date and time
+
+    Returns:
+        Unix time of the deadline
+    """
+    now = datetime.datetime.now()
+    try:
+        at = datetime.datetime.combine(now.date(), datetime.time.fromisoformat(text))
+        if at <= now:
+            at += datetime.timedelta(days=1)
+    except ValueError:
+        try:
+            at = datetime.datetime.fromisoformat(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected HH:MM or an ISO 8601 date and time, got {text!r}")
+    return at.timestamp()
+
+
+def load_configuration(args: argparse.Namespace):
+    """Load the institution settings and resources named by the config options.
+
+    Returns:
+        Tuple of (institution configuration, resources)
+    """
+    from database360.config.loader import ConfigurationLoader
+    from database360.shared_cache import SharedCache
+
+    shared_cache = SharedCache(args.shared_cache) if args.shared_cache else None
+    try:
+        loader = ConfigurationLoader(args.config, cache_dir=args.cache_dir, engine=args.engine,
+                                     shared_cache=shared_cache, resources_file=args.resources)
+        return loader.load_institution_config(), loader.load_resources()
+    finally:
+        if shared_cache is not None:
+            shared_cache.close()
+
+
+def cmd_probe(args: argparse.Namespace) -> int:
+    from database360.main import run_probe
+
+    run_probe(args)
+    return 0
+
+
+def cmd_probe_one(args: argparse.Namespace) -> int:
+    from database360.probe_resources.matching import normalize_title
+    from database360.result_store import probe_succeeded
+
+    if args.catalog_search_url:
+        institution_config, resources = {'catalog_search_url': args.catalog_search_url}, []
+        if args.links_match:
+            institution_config['valid_catalog_links_match'] = args.links_match
+    else:
+        institution_config, resources = load_configuration(args)
+
+    wanted = normalize_title(args.name)
+    resource = next((r for r in resources if normalize_title(str(r.get('database_name') or '')) == wanted), None)
+    if resource is None:
+        if not args.catalog_search_url and not args.purl:
+            print(f"No resource named {args.name!r} in {args.config}", file=sys.stderr)
+            return 2
+        resource = {'database_name': args.name}
+    resource = dict(resource)
+    if args.purl:
+        resource['purl'] = args.purl
+    if args.expect_text:
+        resource['database_home_page_should_contain_text'] = args.expect_text
+
+    from database360.probe_runner import ProbeRunner
+
+    # A single probe does not pay for crawling the whole catalog listing
+    institution_config = {k: v for k, v in institution_config.items() if k != 'catalog_listing_url'}
+    runner = ProbeRunner(institution_config, max_workers=1)
+    try:
+        result = runner.run_probes([resource])[0]
+    finally:
+        runner.client.close()
+    print(json.dumps(result, indent=2, default=str))
+    return 0 if probe_succeeded(result) else 1
+
+
+def cmd_validate_config(args: argparse.Namespace) -> int:
+    from database360.config.validation import ERROR, validate_configuration
+
+    institution_config, resources = load_configuration(args)
+    problems = validate_configuration(institution_config, resources)
+    for level, message in problems:
+        print(f"{level}: {message}")
+    errors = sum(1 for level, _ in problems if level == ERROR)
+    print(f"{len(resources)} resources, {errors} errors, {len(problems) - errors} warnings")
+    return 1 if errors else 0
+
+
+def cmd_diff(args: argparse.Namespace) -> int:
+    from database360.result_history import ResultHistory, format_change
+
+    history = ResultHistory(args.history)
+    try:
+        runs = history.finished_runs()
+        latest = args.run if args.run is not None else (runs[0] if runs else None)
+        baseline = args.baseline
+        if baseline is None:
+            baseline = next((run for run in runs if latest is not None and run < latest), None)
+        if latest is None or baseline is None:
+            print(f"Need two finished runs in {args.history} to compare", file=sys.stderr)
+            return 2
+
+        counts = dict.fromkeys(('changed', 'added', 'removed', 'regressions'), 0)
+        for change in history.iter_changes(baseline, latest):
+            counts[change['status']] += 1
+            counts['regressions'] += change['regression']
+            if args.format == 'jsonl':
+                print(json.dumps(change, default=str))
+            else:
+                print(format_change(change))
+    finally:
+        history.close()
+
+    if args.format == 'text':
+        print(f"Run {latest} against run {baseline}: {counts['changed']} changed, {counts['added']} added, "
+              f"{counts['removed']} removed, {counts['regressions']} regressions")
+    if args.fail_on == 'change':
+        return 1 if counts['changed'] or counts['added'] or counts['removed'] else 0
+    if args.fail_on == 'regression':
+        return 1 if counts['regressions'] else 0
+    return 0
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    from database360.batch import main as batch_main
+
+    return batch_main(args.arguments)
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    from database360.bench import main as bench_main
+
+    return bench_main(args.arguments)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with one subparser per command."""
+    parser = argparse.ArgumentParser(prog='database360', description="Probe library database resources.")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    probe = commands.add_parser('probe', help="Probe every resource of an institution")
+    add_probe_arguments(probe)
+    probe.set_defaults(handler=cmd_probe)
+
+    probe_one = commands.add_parser('probe-one', help="Probe a single resource; exit status 1 if it fails")
+    probe_one.add_argument('name', help="Database name, matched against the Resources sheet ignoring case")
+    add_config_arguments(probe_one)
+    probe_one.add_argument('--catalog-search-url',
+                           help="Probe with this catalog search URL instead of loading the configuration")
+    probe_one.add_argument('--links-match', help="Regular expression of catalog record links, with --catalog-search-url")
+    probe_one.add_argument('--purl', help="PURL to check, overriding the Resources sheet")
+    probe_one.add_argument('--expect-text', help="Text the PURL's landing page should contain")
+    probe_one.set_defaults(handler=cmd_probe_one, log_level='WARNING')
+
+    validate = commands.add_parser('validate-config', help="Check a configuration workbook")
+    add_config_arguments(validate)
+    validate.set_defaults(handler=cmd_validate_config, log_level='WARNING')
+
+    diff = commands.add_parser('diff', help="Report what changed between two runs; exit status 1 on regressions")
+    diff.add_argument('--history', required=True, help="History file written by probe --history")
+    diff.add_argument('--run', type=int, help="Run to check. Defaults to the latest finished run.")
+    diff.add_argument('--baseline', type=int, help="Run compared against. Defaults to the finished run before --run.")
+    diff.add_argument('--format', choices=('text', 'jsonl'), default='text',
+                      help="One line per changed resource, as text or as JSON objects")
+    diff.add_argument('--fail-on', choices=('regression', 'change', 'never'), default='regression',
+                      help="Exit with status 1 on regressions (default), on any change, or never")
+    diff.set_defaults(handler=cmd_diff, log_level='WARNING')
+
+    # batch and bench keep their own parsers; main passes their arguments through unparsed
+    batch = commands.add_parser('batch', help="Probe several institutions in one process", add_help=False)
+    batch.add_argument('arguments', nargs=argparse.REMAINDER)
+    batch.set_defaults(handler=cmd_batch)
+
+    bench = commands.add_parser('bench', help="Benchmark against a local fake catalog", add_help=False)
+    bench.add_argument('arguments', nargs=argparse.REMAINDER)
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a subcommand.
+
+    Args:
+        argv: Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        Process exit code of the subcommand
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in PASSTHROUGH_COMMANDS:
+        # The subparser would read a leading option as its own, so only the command name is parsed here
+        args = build_parser().parse_args(argv[:1])
+        args.arguments = argv[1:]
+    else:
+        args = build_parser().parse_args(argv)
+    if getattr(args, 'log_level', None):
+        configure_logging(args.log_level)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,34 @@
-"""Configuration loader for Database 360."""
+"""Configuration loader for Database 360.
 
-import pandas as pd
-from typing import Dict, List
+pandas and requests are imported only when a workbook is parsed with the
+pandas engine or downloaded, so loading a local workbook with the openpyxl
+engine stays cheap for short command line invocations.
+"""
+
+from typing import Dict, Iterator, List, Optional
 from pathlib import Path
 import urllib.parse
-import requests
 import tempfile
+import hashlib
+import csv
+import json
+import logging
 import os
+import pickle
 import re
+from database360.config.records import Resource
+from database360.shared_cache import SharedCache
+
+logger = logging.getLogger(__name__)
+
+# Default directory for downloaded configuration files and parsed snapshots
+DEFAULT_CACHE_DIR = Path(os.environ.get('DATABASE360_CACHE_DIR', Path.home() / '.cache' / 'database360'))
+
+# Bump when the parsed snapshot format changes so stale snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+# Workbook readers: 'pandas' parses with pandas.read_excel, 'openpyxl' reads the cells directly
+ENGINES = ('pandas', 'openpyxl')
 
 class ConfigurationLoader:
     """Loads and manages configuration from Excel files or Google Sheets URLs."""
@@ -42,13 +63,51 @@ class ConfigurationLoader:
         """
         return {ConfigurationLoader.to_snake_case(k): v for k, v in d.items()}
 
-    def __init__(self, config_source: str):
+    @staticmethod
+    def snake_case_columns(columns) -> List[str]:
+        """Convert the column index of a DataFrame to snake case in one vectorized pass.
+
+        Args:
+            columns: pandas Index of column names
+
+        Returns:
+            Snake case column names, as to_snake_case would return them
+        """
+        names = columns.astype(str).str.strip().str.lower()
+        return list(names.str.replace(r'[-\s]+', '_', regex=True).str.replace(r'_+', '_', regex=True))
+
+    def __init__(self, config_source: str, cache_dir: Optional[str] = None, engine: str = 'pandas',
+                 shared_cache: Optional[SharedCache] = None, resources_file: Optional[str] = None,
+                 stream_resources: bool = False):
         """Initialize the configuration loader.
         
         Args:
             config_source: Path to the configuration Excel file or URL to a publicly accessible Google Sheet
+            cache_dir: Optional directory where downloaded sheets and parsed snapshots are kept
+                       between invocations. Without it, URL sources are downloaded to a temporary
+                       file and every process parses the workbook again.
+            engine: Workbook reader, 'pandas' or 'openpyxl'. The openpyxl reader avoids importing
+                    pandas and skips empty rows.
+            shared_cache: Optional cache shared between processes, holding the parsed snapshots
+                          instead of the cache directory
+            resources_file: Optional CSV file read instead of the Resources sheet, with the
+                            same column headers and one resource per row
+            stream_resources: Read the Resources rows as iter_resources yields them instead of
+                              parsing the whole sheet up front; load_institution_config then
+                              reads the Institution sheet alone and no snapshot is kept
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown configuration engine '{engine}', expected one of {ENGINES}")
         self.config_source = config_source
+        self.engine = engine
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.shared_cache = shared_cache
+        self.resources_file = Path(resources_file).expanduser() if resources_file else None
+        if self.resources_file is not None and not self.resources_file.exists():
+            raise FileNotFoundError(f"Resources file not found: {resources_file}")
+        self.stream_resources = stream_resources
+        self._parsed = None
+        self._temp_file = None
         
         # Check if the source is a URL
         parsed = urllib.parse.urlparse(config_source)
@@ -60,16 +119,22 @@ class ConfigurationLoader:
                     file_id = parsed.path.split('/d/')[1].split('/')[0]
                     config_source = f"https://docs.google.com/spreadsheets/d/{file_id}/export?format=xlsx"
                 
-                # Download the file to a temporary location
-                response = requests.get(config_source)
-                response.raise_for_status()
-                
-                # Create a temporary file
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-                temp_file.write(response.content)
-                temp_file.close()
-                
-                self.config_file = Path(temp_file.name)
+                if self.cache_dir:
+                    self.config_file = self._download_cached(config_source)
+                else:
+                    import requests
+
+                    # Download the file to a temporary location
+                    response = requests.get(config_source, timeout=60)
+                    response.raise_for_status()
+
+                    # Create a temporary file
+                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
+                    temp_file.write(response.content)
+                    temp_file.close()
+
+                    self.config_file = Path(temp_file.name)
+                    self._temp_file = self.config_file
             except Exception as e:
                 raise RuntimeError(f"Failed to download configuration from URL: {e}")
         else:  # It's a local file path
@@ -79,38 +144,255 @@ class ConfigurationLoader:
     
     def __del__(self):
         """Cleanup temporary files if they exist."""
-        # Check if we have a temporary file (URL case)
-        if hasattr(self, 'config_file') and str(self.config_file).startswith(tempfile.gettempdir()):
+        # Only remove the temporary download, never a local or cached configuration file
+        if getattr(self, '_temp_file', None) is not None:
             try:
-                os.unlink(self.config_file)
+                os.unlink(self._temp_file)
             except:
                 pass
     
+    def _download_cached(self, url: str) -> Path:
+        """Download a configuration file into the cache directory.
+
+        The previous download is revalidated with its ETag / Last-Modified, so an
+        unchanged sheet costs a 304 instead of a full download.
+
+        Args:
+            url: URL of the xlsx export
+
+        Returns:
+            Path of the cached xlsx file
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+        cached_file = self.cache_dir / f"config-{key}.xlsx"
+        meta_file = self.cache_dir / f"config-{key}.json"
+
+        headers = {}
+        if cached_file.exists() and meta_file.exists():
+            try:
+                meta = json.loads(meta_file.read_text())
+            except ValueError:
+                meta = {}
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        import requests
+
+        response = requests.get(url, headers=headers, timeout=60)
+        if response.status_code == 304 and headers:
+            return cached_file
+        response.raise_for_status()
+
+        self._write_atomic(cached_file, response.content)
+        self._write_atomic(meta_file, json.dumps({
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }).encode('utf-8'))
+        return cached_file
+
+    def _write_atomic(self, path: Path, data: bytes):
+        """Write a file in the cache directory via a temporary file and rename."""
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_name, path)
+
+    def _load_parsed(self) -> Dict:
+        """Return the parsed Institution and Resources sheets, parsing the workbook at most once.
+
+        With a shared cache or a cache directory, the parsed sheets are also kept in a
+        pickled snapshot keyed by the SHA-256 of the workbook, so an unchanged workbook
+        is not parsed again.
+
+        Returns:
+            Dictionary with 'institution' and 'resources' entries; an entry is None if
+            its sheet could not be loaded
+        """
+        if self._parsed is not None:
+            return self._parsed
+
+        snapshot_file = None
+        snapshot_key = None
+        if self.shared_cache is not None:
+            try:
+                snapshot_key = f"{self.engine}-{hashlib.sha256(self.config_file.read_bytes()).hexdigest()}"
+                data = self.shared_cache.get('config', snapshot_key)
+                snapshot = pickle.loads(data) if data is not None else {}
+                if snapshot.get('version') == SNAPSHOT_VERSION:
+                    self._parsed = snapshot
+                    return self._parsed
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                pass
+        elif self.cache_dir:
+            try:
+                digest = hashlib.sha256(self.config_file.read_bytes()).hexdigest()
+                snapshot_file = self.cache_dir / f"parsed-{self.engine}-{digest}.pickle"
+                with open(snapshot_file, 'rb') as f:
+                    snapshot = pickle.load(f)
+                if snapshot.get('version') == SNAPSHOT_VERSION:
+                    self._parsed = snapshot
+                    return self._parsed
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                pass
+
+        parsed = {'version': SNAPSHOT_VERSION, 'institution': None, 'resources': None}
+        if self.engine == 'openpyxl':
+            self._parse_openpyxl(parsed)
+        else:
+            self._parse_pandas(parsed)
+
+        complete = parsed['institution'] is not None and parsed['resources'] is not None
+        if snapshot_key is not None and complete:
+            self.shared_cache.set('config', snapshot_key, pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL))
+        if snapshot_file is not None and complete:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._write_atomic(snapshot_file, pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL))
+            except OSError as e:
+                logger.warning("Error writing configuration snapshot: %s", e)
+
+        self._parsed = parsed
+        return parsed
+
+    def _parse_pandas(self, parsed: Dict, resources: bool = True):
+        """Parse both sheets with pandas into ``parsed``, or only the Institution sheet without ``resources``."""
+        import pandas as pd
+
+        try:
+            with pd.ExcelFile(self.config_file, engine='openpyxl') as workbook:
+                try:
+                    df = workbook.parse('Institution', usecols=[0, 1])
+                    # Convert keys to snake case and empty values to None
+                    values = df.iloc[:, 1].astype(object)
+                    parsed['institution'] = {
+                        self.to_snake_case(key): value
+                        for key, value in zip(df.iloc[:, 0], values.where(values.notna(), None))
+                    }
+                except Exception as e:
+                    logger.warning("Error loading institution configuration: %s", e)
+
+                if not resources:
+                    return
+                try:
+                    df = workbook.parse('Resources')
+                    columns = self.snake_case_columns(df.columns)
+                    # NaN becomes None once for the whole sheet instead of in every probe
+                    df = df.astype(object)
+                    df = df.where(df.notna(), None)
+                    parsed['resources'] = [
+                        Resource.from_row(columns, row) for row in df.itertuples(index=False, name=None)
+                    ]
+                except Exception as e:
+                    logger.warning("Error loading resources configuration: %s", e)
+        except Exception as e:
+            logger.warning("Error opening configuration workbook: %s", e)
+
+    def _parse_openpyxl(self, parsed: Dict, resources: bool = True):
+        """Read both sheets cell by cell with openpyxl's read-only mode into ``parsed``.
+
+        Without ``resources``, only the Institution sheet is read.
+        """
+        from openpyxl import load_workbook
+
+        try:
+            workbook = load_workbook(self.config_file, read_only=True, data_only=True)
+        except Exception as e:
+            logger.warning("Error opening configuration workbook: %s", e)
+            return
+        try:
+            try:
+                rows = workbook['Institution'].iter_rows(min_row=2, max_col=2, values_only=True)
+                parsed['institution'] = {
+                    self.to_snake_case(str(key)): value for key, value, *_ in rows if key is not None
+                }
+            except Exception as e:
+                logger.warning("Error loading institution configuration: %s", e)
+
+            if resources:
+                try:
+                    parsed['resources'] = list(self._resource_rows(workbook['Resources'].iter_rows(values_only=True)))
+                except Exception as e:
+                    logger.warning("Error loading resources configuration: %s", e)
+        finally:
+            workbook.close()
+
+    def _resource_rows(self, rows: Iterator[tuple]) -> Iterator[Resource]:
+        """Turn the rows of a Resources sheet, header first, into resources, skipping empty rows."""
+        header = next(rows, ())
+        columns = [(i, self.to_snake_case(str(name))) for i, name in enumerate(header) if name is not None]
+        for row in rows:
+            if any(value is not None for value in row):
+                yield Resource(**{column: (row[i] if i < len(row) else None) for i, column in columns})
+
+    def _iter_workbook_resources(self) -> Iterator[Resource]:
+        """Stream the Resources sheet with openpyxl's read-only mode, one row at a time."""
+        from openpyxl import load_workbook
+
+        try:
+            workbook = load_workbook(self.config_file, read_only=True, data_only=True)
+        except Exception as e:
+            logger.warning("Error opening configuration workbook: %s", e)
+            return
+        try:
+            yield from self._resource_rows(workbook['Resources'].iter_rows(values_only=True))
+        except Exception as e:
+            logger.warning("Error loading resources configuration: %s", e)
+        finally:
+            workbook.close()
+
+    def _iter_csv_resources(self) -> Iterator[Resource]:
+        """Stream the rows of the resources CSV file; empty cells become None, as in the workbook."""
+        with open(self.resources_file, newline='', encoding='utf-8-sig') as f:
+            rows = (tuple(value if value != '' else None for value in row) for row in csv.reader(f))
+            yield from self._resource_rows(rows)
+
     def load_institution_config(self) -> Dict[str, str]:
         """Load institution configuration from the Institution sheet.
         
         Returns:
             Dictionary with institution configuration key-value pairs with snake_case keys
         """
-        try:
-            df = pd.read_excel(self.config_file, sheet_name='Institution', usecols=[0, 1], engine='openpyxl')
-            # Convert keys to snake case
-            return {self.to_snake_case(key): value for key, value in zip(df.iloc[:, 0], df.iloc[:, 1])}
-        except Exception as e:
-            print(f"Error loading institution configuration: {e}")
-            return {}
+        if self._parsed is None and (self.stream_resources or self.resources_file is not None):
+            # The resources come from elsewhere, so the Resources sheet is not parsed
+            parsed = {'version': SNAPSHOT_VERSION, 'institution': None, 'resources': None}
+            if self.engine == 'openpyxl':
+                self._parse_openpyxl(parsed, resources=False)
+            else:
+                self._parse_pandas(parsed, resources=False)
+            institution = parsed['institution']
+        else:
+            institution = self._load_parsed()['institution']
+        return dict(institution) if institution is not None else {}
     
-    def load_resources(self) -> List[Dict]:
+    def load_resources(self) -> List[Resource]:
         """Load resources configuration from the Resources sheet.
         
         Returns:
-            List of dictionaries where each dictionary represents a resource record with snake_case keys
+            List of read-only Resource mappings, one per row, with snake_case keys
         """
-        try:
-            df = pd.read_excel(self.config_file, sheet_name='Resources', engine='openpyxl')
-            records = df.to_dict('records')
-            # Convert all keys to snake case
-            return [self.convert_dict_keys_to_snake_case(record) for record in records]
-        except Exception as e:
-            print(f"Error loading resources configuration: {e}")
-            return []
+        if self.resources_file is not None or self.stream_resources:
+            return list(self.iter_resources())
+        resources = self._load_parsed()['resources']
+        return list(resources) if resources is not None else []
+
+    def iter_resources(self) -> Iterator[Resource]:
+        """Yield the resources one row at a time, as they are read.
+
+        Rows come from the resources CSV file if one was given. Otherwise, the
+        Resources sheet is streamed with openpyxl's read-only mode whatever the
+        engine, unless it was already parsed, so a probe can start before a
+        sheet of tens of thousands of rows is read, and only the rows in flight
+        are held in memory.
+
+        Yields:
+            Read-only Resource mappings with snake_case keys, in sheet order
+        """
+        if self.resources_file is not None:
+            yield from self._iter_csv_resources()
+        elif self._parsed is not None and self._parsed['resources'] is not None:
+            yield from self._parsed['resources']
+        else:
+            yield from self._iter_workbook_resources()
@@ -0,0 +1,82 @@
+"""Compact records for the rows of the Resources sheet."""
+
+import math
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+# Columns every probe reads, stored in slots; other columns are kept in an extra dict
+RESOURCE_FIELDS = ('database_name', 'purl', 'database_home_page_should_contain_text')
+
+
+def clean_value(value: Any) -> Any:
+    """Return None for empty and NaN cells, and the value unchanged otherwise."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+
+def clean_text(value: Any) -> Optional[str]:
+    """Return a cell as a stripped string, or None if it is empty or NaN."""
+    value = clean_value(value)
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+class Resource(Mapping):
+    """One row of the Resources sheet.
+
+    The probed columns are stored in slots as stripped strings, or None when
+    the cell is empty or NaN, so the probes need no per-row cleanup. Other
+    columns are kept as they were read, with NaN replaced by None. A Resource
+    is a read-only mapping with the same snake_case keys as the dictionaries
+    previously returned by the loader; use dict(resource) for a mutable copy.
+    """
+
+    __slots__ = RESOURCE_FIELDS + ('extra',)
+
+    def __init__(self, database_name: Any = None, purl: Any = None,
+                 database_home_page_should_contain_text: Any = None, **extra):
+        """Create a resource, normalizing its values.
+
+        Args:
+            database_name: Name searched in the catalog
+            purl: Persistent URL of the database
+            database_home_page_should_contain_text: Text expected on the PURL's landing page
+            **extra: Other columns of the row
+        """
+        self.database_name = clean_text(database_name)
+        self.purl = clean_text(purl)
+        self.database_home_page_should_contain_text = clean_text(database_home_page_should_contain_text)
+        self.extra: Optional[Dict[str, Any]] = {key: clean_value(value) for key, value in extra.items()} or None
+
+    @classmethod
+    def from_row(cls, columns: Sequence[str], values: Iterable[Any]) -> 'Resource':
+        """Create a resource from the snake_case column names and cell values of a row."""
+        return cls(**dict(zip(columns, values)))
+
+    def __getitem__(self, key: str) -> Any:
+        if key in RESOURCE_FIELDS:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from RESOURCE_FIELDS
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(RESOURCE_FIELDS) + (len(self.extra) if self.extra is not None else 0)
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        return f"Resource({dict(self)!r})"
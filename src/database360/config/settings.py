@@ -0,0 +1,50 @@
+"""Helpers for reading typed settings from the institution configuration."""
+
+import logging
+import math
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Execution backends selectable with the 'Probe Backend' setting
+PROBE_BACKENDS = ('threads', 'asyncio')
+
+
+def get_setting(config: Dict, key: str, default: Any = None, cast: Optional[Callable] = None) -> Any:
+    """Read a single setting from the institution configuration.
+
+    Values coming from the Institution sheet may be missing, empty strings or
+    NaN floats; all of these are treated as "not set" and yield the default.
+
+    Args:
+        config: Institution configuration dictionary
+        key: Snake case setting name
+        default: Value to return when the setting is not set
+        cast: Optional callable used to convert the raw value (e.g. int, float)
+
+    Returns:
+        The converted setting value, or the default if not set or not convertible
+    """
+    value = config.get(key) if config else None
+
+    if value is None:
+        return default
+    if isinstance(value, float) and math.isnan(value):
+        return default
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return default
+
+    if cast is None:
+        return value
+
+    try:
+        if cast is int and isinstance(value, str):
+            return int(float(value))
+        if cast is bool and isinstance(value, str):
+            return value.lower() in ('1', 'true', 'yes', 'y', 'on')
+        return cast(value)
+    except (TypeError, ValueError):
+        logger.warning("Invalid value for setting '%s': %r, using default %r", key, value, default)
+        return default
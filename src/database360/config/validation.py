@@ -0,0 +1,103 @@
+"""Checks of a loaded configuration before it is used for a run."""
+
+import re
+import urllib.parse
+from collections import Counter
+from typing import Dict, List, Tuple
+from database360.config.records import clean_text
+from database360.config.settings import PROBE_BACKENDS
+from database360.probe_resources.link_extractor import LINK_EXTRACTORS
+
+# Institution settings that must be numbers when they are set
+NUMERIC_SETTINGS = (
+    'max_workers', 'host_request_interval', 'min_request_rate', 'max_request_rate', 'request_timeout',
+    'request_retries', 'retry_backoff_factor', 'connections_per_host', 'http_cache_ttl', 'http_cache_max_bytes',
+    'http_cache_expire_after', 'purl_max_bytes', 'max_result_age_hours', 'checkpoint_every', 'max_in_flight',
+    'catalog_listing_max_pages', 'redirect_cache_ttl', 'parse_workers', 'parse_queue_size',
+    'time_budget_minutes', 'shared_cache_ttl', 'shared_cache_max_bytes', 'resource_window',
+)
+
+# Problem levels: errors make the configuration unusable, warnings only skip part of a probe
+ERROR = 'ERROR'
+WARNING = 'WARNING'
+
+
+def _is_set(value) -> bool:
+    return clean_text(value) is not None
+
+
+def _is_http_url(value) -> bool:
+    parsed = urllib.parse.urlparse(str(value).strip())
+    return parsed.scheme in ('http', 'https') and bool(parsed.netloc)
+
+
+def validate_configuration(institution_config: Dict, resources: List[Dict]) -> List[Tuple[str, str]]:
+    """Check the Institution settings and the Resources sheet.
+
+    Args:
+        institution_config: Dictionary containing institution configuration
+        resources: Resource dictionaries as loaded from the Resources sheet
+
+    Returns:
+        List of (level, message) pairs, where level is ERROR or WARNING; empty if the configuration is valid
+    """
+    problems = []
+
+    if not institution_config:
+        problems.append((ERROR, "The Institution sheet is empty or missing"))
+    search_url = institution_config.get('catalog_search_url')
+    if not _is_set(search_url):
+        problems.append((ERROR, "'Catalog Search URL' is not set"))
+    elif not _is_http_url(search_url):
+        problems.append((ERROR, f"'Catalog Search URL' is not an http(s) URL: {search_url!r}"))
+
+    listing_url = institution_config.get('catalog_listing_url')
+    if _is_set(listing_url) and not _is_http_url(listing_url):
+        problems.append((ERROR, f"'Catalog Listing URL' is not an http(s) URL: {listing_url!r}"))
+
+    link_matcher = institution_config.get('valid_catalog_links_match')
+    if _is_set(link_matcher):
+        try:
+            re.compile(str(link_matcher))
+        except re.error as e:
+            problems.append((ERROR, f"'Valid Catalog Links Match' is not a valid regular expression: {e}"))
+
+    for key in NUMERIC_SETTINGS:
+        value = institution_config.get(key)
+        if not _is_set(value) or isinstance(value, bool):
+            continue
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            problems.append((ERROR, f"Setting '{key}' is not a number: {value!r}"))
+
+    backend = institution_config.get('probe_backend')
+    if _is_set(backend) and str(backend).strip().lower() not in PROBE_BACKENDS:
+        problems.append((ERROR, f"'Probe Backend' must be one of {PROBE_BACKENDS}, got {backend!r}"))
+
+    extractor = institution_config.get('link_extractor')
+    if _is_set(extractor) and str(extractor).strip().lower() not in LINK_EXTRACTORS:
+        problems.append((ERROR, f"'Link Extractor' must be one of {sorted(LINK_EXTRACTORS)}, got {extractor!r}"))
+
+    if not resources:
+        problems.append((WARNING, "The Resources sheet has no resources"))
+    names = Counter()
+    for row, resource in enumerate(resources, 2):
+        name = resource.get('database_name')
+        if not _is_set(name):
+            problems.append((ERROR, f"Resources row {row}: 'Database Name' is empty"))
+        else:
+            names[str(name).strip()] += 1
+
+        purl = resource.get('purl')
+        expected_text = resource.get('database_home_page_should_contain_text')
+        if _is_set(purl) and not _is_http_url(purl):
+            problems.append((ERROR, f"Resources row {row}: 'PURL' is not an http(s) URL: {purl!r}"))
+        elif _is_set(purl) != _is_set(expected_text):
+            problems.append((WARNING, f"Resources row {row}: the PURL probe needs both 'PURL' and "
+                                      f"'Database Home Page Should Contain Text'"))
+
+    for name, count in names.items():
+        if count > 1:
+            problems.append((WARNING, f"'{name}' is listed {count} times in the Resources sheet"))
+    return problems
@@ -0,0 +1,269 @@
+"""Instrumentation of probe runs.
+
+Each probed resource gets a ProbeMetrics collector made current for the
+probe's thread or task. The probes mark their phases (catalog search fetch
+and parse, record page fetch and parse, PURL fetch) with phase(), and the
+HTTP clients report every response, retry, redirect and rate-limit wait to
+the current phase. Nothing is recorded when no collector is active, so the
+probe functions work the same when called on their own.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_metrics: ContextVar[Optional['ProbeMetrics']] = ContextVar('probe_metrics', default=None)
+_current_phase: ContextVar[str] = ContextVar('probe_phase', default='other')
+
+# Counters kept for each phase
+PHASE_COUNTERS = ('seconds', 'requests', 'cache_hits', 'bytes', 'retries', 'redirects', 'rate_limit_wait')
+
+
+def _new_phase() -> Dict:
+    phase_metrics = {counter: 0 for counter in PHASE_COUNTERS}
+    phase_metrics['status_codes'] = {}
+    return phase_metrics
+
+
+def _add_phase(target: Dict, source: Dict):
+    for counter in PHASE_COUNTERS:
+        target[counter] += source.get(counter, 0)
+    for code, count in source.get('status_codes', {}).items():
+        target['status_codes'][code] = target['status_codes'].get(code, 0) + count
+
+
+def _round_phase(phase_metrics: Dict) -> Dict:
+    rounded = dict(phase_metrics)
+    rounded['seconds'] = round(rounded['seconds'], 6)
+    rounded['rate_limit_wait'] = round(rounded['rate_limit_wait'], 6)
+    return rounded
+
+
+class ProbeMetrics:
+    """Timings and HTTP counters of one resource's probes, broken down by phase."""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict] = {}
+        self.seconds = 0.0
+
+    @contextmanager
+    def activate(self) -> Iterator['ProbeMetrics']:
+        """Make this collector current and time the enclosed block as the resource's total time."""
+        token = _current_metrics.set(self)
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.seconds += time.perf_counter() - started
+            _current_metrics.reset(token)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Attribute the enclosed block's time and HTTP activity to a phase."""
+        token = _current_phase.set(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phase(name)['seconds'] += time.perf_counter() - started
+            _current_phase.reset(token)
+
+    def _phase(self, name: Optional[str] = None) -> Dict:
+        name = name or _current_phase.get()
+        phase_metrics = self.phases.get(name)
+        if phase_metrics is None:
+            phase_metrics = self.phases[name] = _new_phase()
+        return phase_metrics
+
+    def record_response(self, status_codes: Iterable[int], retries: int = 0, body_bytes: int = 0):
+        """Record a response received over the network, including the redirects leading to it.
+
+        Args:
+            status_codes: Status codes of the redirects followed and of the final response
+            retries: Number of retries needed
+            body_bytes: Body bytes read
+        """
+        phase_metrics = self._phase()
+        codes = list(status_codes)
+        phase_metrics['requests'] += len(codes)
+        phase_metrics['redirects'] += max(0, len(codes) - 1)
+        phase_metrics['retries'] += retries
+        phase_metrics['bytes'] += body_bytes
+        for code in codes:
+            key = str(code)
+            phase_metrics['status_codes'][key] = phase_metrics['status_codes'].get(key, 0) + 1
+
+    def as_dict(self) -> Dict:
+        """Return the metrics as a JSON-serializable dictionary.
+
+        Returns:
+            Totals over all phases, the resource's wall time and a 'phases' breakdown
+        """
+        totals = _new_phase()
+        for phase_metrics in self.phases.values():
+            _add_phase(totals, phase_metrics)
+        # Phases of the async backend overlap, so the total time is measured separately
+        totals['seconds'] = self.seconds
+        metrics = _round_phase(totals)
+        metrics['phases'] = {name: _round_phase(phase_metrics) for name, phase_metrics in self.phases.items()}
+        return metrics
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Attribute the enclosed block to a phase of the current resource, if one is being measured.
+
+    Args:
+        name: Phase name, such as 'search_fetch' or 'purl_fetch'
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.phase(name):
+        yield
+
+
+def record_response(status_codes: Iterable[int], retries: int = 0, body_bytes: int = 0):
+    """Report a network response to the current phase. See ProbeMetrics.record_response."""
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.record_response(status_codes, retries, body_bytes)
+
+
+def record_bytes(body_bytes: int):
+    """Report body bytes read after the response was recorded, as with streamed responses."""
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics._phase()['bytes'] += body_bytes
+
+
+def record_cache_hit():
+    """Report a response served from the on-disk cache without a request."""
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics._phase()['cache_hits'] += 1
+
+
+def record_wait(seconds: float):
+    """Report time spent waiting for the per-host rate limiter."""
+    metrics = _current_metrics.get()
+    if metrics is not None and seconds > 0:
+        metrics._phase()['rate_limit_wait'] += seconds
+
+
+def retry_count(response) -> int:
+    """Return the number of retries urllib3 needed for a requests response and its redirects."""
+    redirects = getattr(response, 'history', None)
+    retries = 0
+    for r in (list(redirects) if isinstance(redirects, list) else []) + [response]:
+        history = getattr(getattr(getattr(r, 'raw', None), 'retries', None), 'history', None)
+        if isinstance(history, tuple):
+            retries += len(history)
+    return retries
+
+
+class RunSummary:
+    """Thread-safe aggregate of the probe metrics of a run."""
+
+    def __init__(self, total: int = 0):
+        """Start the summary of a run.
+
+        Args:
+            total: Number of resources in the run
+        """
+        self.total = total
+        self.probed = 0
+        self.reused = 0
+        self.catalog_errors = 0
+        self.purl_matches = 0
+        self.phases: Dict[str, Dict] = {}
+        self.resource_seconds = 0.0
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_probed(self, result: Dict, metrics: ProbeMetrics):
+        """Add the metrics of a resource probed in this run."""
+        with self._lock:
+            self.probed += 1
+            self.resource_seconds += metrics.seconds
+            if 'error' in result.get('catalog_probe', {}):
+                self.catalog_errors += 1
+            if result.get('purl_probe', {}).get('purl_led_to_database'):
+                self.purl_matches += 1
+            for name, phase_metrics in metrics.phases.items():
+                _add_phase(self.phases.setdefault(name, _new_phase()), phase_metrics)
+
+    def add_reused(self):
+        """Count a resource whose stored or checkpointed result was reused."""
+        with self._lock:
+            self.reused += 1
+
+    def as_dict(self, **extra) -> Dict:
+        """Return the summary as a JSON-serializable dictionary.
+
+        Args:
+            **extra: Additional entries, such as shared fetch or catalog index counters
+
+        Returns:
+            Summary of the run
+        """
+        with self._lock:
+            seconds = time.perf_counter() - self._started
+            totals = _new_phase()
+            for phase_metrics in self.phases.values():
+                _add_phase(totals, phase_metrics)
+            summary = {
+                'started_at': self.started_at,
+                'resources': self.total,
+                'probed': self.probed,
+                'reused': self.reused,
+                'catalog_errors': self.catalog_errors,
+                'purl_matches': self.purl_matches,
+                'resources_per_second': round(self.probed / seconds, 3) if seconds > 0 else 0.0,
+                'mean_resource_seconds': round(self.resource_seconds / self.probed, 6) if self.probed else 0.0,
+            }
+            summary.update(_round_phase(totals))
+            # Concurrent resources overlap, so the run's wall time replaces the sum of phase times
+            summary['seconds'] = round(seconds, 6)
+            summary['phases'] = {name: _round_phase(phase_metrics) for name, phase_metrics in self.phases.items()}
+        summary.update(extra)
+        return summary
+
+
+class ProbeHook:
+    """Callbacks notified as a run progresses. Subclasses override the methods they need."""
+
+    def resource_finished(self, result: Dict):
+        """Called with each result, in input order, as soon as it is available.
+
+        Args:
+            result: Combined probe result; only resources probed in this run carry a 'metrics' entry
+        """
+
+    def run_finished(self, summary: Dict):
+        """Called once at the end of a run.
+
+        Args:
+            summary: Run summary as returned by RunSummary.as_dict
+        """
+
+
+def log_summary(summary: Dict):
+    """Log the headline numbers of a run summary."""
+    logger.info(
+        "Probed %d of %d resources in %.1fs (%d reused, %d catalog errors, %d PURL matches); "
+        "%d requests, %d retries, %d redirects, %d bytes, %.1fs waiting for rate limits",
+        summary['probed'], summary['resources'], summary['seconds'], summary['reused'], summary['catalog_errors'],
+        summary['purl_matches'], summary['requests'], summary['retries'], summary['redirects'], summary['bytes'],
+        summary['rate_limit_wait']
+    )
+    for name, phase_metrics in sorted(summary['phases'].items()):
+        logger.info("  %-14s %9.3fs %6d requests %10d bytes", name, phase_metrics['seconds'],
+                    phase_metrics['requests'], phase_metrics['bytes'])
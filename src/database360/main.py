@@ -1,40 +1,101 @@
-"""Main entry point for Database 360."""
+"""Main entry point for Database 360: the probe command of the database360 CLI."""
 
-from pathlib import Path
+import argparse
+import logging
+from typing import Dict, List, Optional
+from database360.checkpoint import Checkpoint
+from database360.cli import add_probe_arguments, configure_logging
 from database360.config.loader import ConfigurationLoader
+from database360.config.settings import get_setting
+from database360.metrics_exporters import open_metrics_exporter
 from database360.probe_runner import ProbeRunner
+from database360.result_history import HistoryRecorder, ResultHistory
+from database360.result_sinks import open_sink
+from database360.result_store import ResultStore
+from database360.shared_cache import SharedCache
 
-def main():
-    """Main entry point for the application."""
-    # Get the project root directory (two levels up from this file)
-    project_root = Path(__file__).parent.parent.parent
-    # config_source = project_root / 'institution_data' / 'Configuration.xlsx'
-    config_source = "https://docs.google.com/spreadsheets/d/1VbcDF6cndXZVD186GqjV8qPabl6v3PQH/edit?gid=671040191#gid=671040191"
+logger = logging.getLogger(__name__)
+
+
+def run_probe(args: argparse.Namespace) -> List[Dict]:
+    """Probe every resource of the configured institution.
+
+    Args:
+        args: Parsed options of the probe command
+
+    Returns:
+        Combined probe results in input order; empty with --stream, where they only go to --output
+    """
+    # One cache shared with the other database360 processes of the host, if requested
+    shared_cache = SharedCache(args.shared_cache) if args.shared_cache else None
 
     # Initialize configuration loader
-    config_loader = ConfigurationLoader(config_source)
+    config_loader = ConfigurationLoader(args.config, cache_dir=args.cache_dir, engine=args.engine,
+                                        shared_cache=shared_cache, resources_file=args.resources,
+                                        stream_resources=args.stream)
 
-    # Load configurations
+    # Load configurations; streamed resources are read while they are probed
     institution_config = config_loader.load_institution_config()
-    resources = config_loader.load_resources()
+    if args.stream:
+        resources = config_loader.iter_resources()
+    else:
+        resources = config_loader.load_resources()
+    if shared_cache is None:
+        shared_cache = SharedCache.from_config(institution_config)
 
-    print("\nInstitution Configuration:")
-    print(f"Catalog Search URL: {institution_config['catalog_search_url']}\n")
-
-    print("Resources Configuration:")
-    for resource in resources:
-        print(resource)
+    logger.info("Catalog Search URL: %s", institution_config['catalog_search_url'])
+    if not args.stream:
+        logger.info("Loaded %d resources", len(resources))
+        for resource in resources:
+            logger.debug("%s", resource)
 
     # Initialize and run probes
-    probe_runner = ProbeRunner(institution_config)
-    results = probe_runner.run_probes(resources)
+    result_store = ResultStore(args.result_store)
+    checkpoint = Checkpoint(args.checkpoint, every=get_setting(institution_config, 'checkpoint_every', 1, int))
+    # Resumed results are replayed from the checkpoint, so the output is always complete
+    sink = open_sink(args.output) if args.output else None
+    history = ResultHistory(args.history) if args.history else None
+    try:
+        hooks = [open_metrics_exporter(args.metrics)] if args.metrics else []
+        if history is not None:
+            hooks.append(HistoryRecorder(history))
+        probe_runner = ProbeRunner(institution_config, result_store=result_store, checkpoint=checkpoint,
+                                   hooks=hooks, shared_cache=shared_cache)
+        if args.stream:
+            results = []
+            for result in probe_runner.iter_probes(resources, full=args.full, resume=args.resume,
+                                                   deadline=args.deadline):
+                if sink is not None:
+                    sink.write(result)
+        else:
+            results = probe_runner.run_probes(resources, full=args.full, sink=sink, resume=args.resume,
+                                              deadline=args.deadline)
+    finally:
+        if sink is not None:
+            sink.close()
+        if history is not None:
+            history.close()
+        if shared_cache is not None:
+            shared_cache.close()
+        result_store.close()
 
-    print("\nProbe Results:")
     for result in results:
-        print(result)
+        logger.debug("%s", result)
 
-    # Here you might want to save the results to a file
     return results
 
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the application, equivalent to ``database360 probe``.
+
+    Args:
+        argv: Command line arguments. Defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Probe library database resources.")
+    add_probe_arguments(parser)
+    args = parser.parse_args(argv)
+    configure_logging(args.log_level)
+    return run_probe(args)
+
 if __name__ == "__main__":
     main()
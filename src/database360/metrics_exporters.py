@@ -0,0 +1,179 @@
+"""Exporters writing the metrics of a probe run for monitoring.
+
+Exporters are ProbeHooks: pass one to ProbeRunner and it writes the run
+summary when the run finishes. The JSON exporter also keeps the metrics of
+every probed resource; the Prometheus exporter writes a textfile for the
+node_exporter textfile collector.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+from database360.instrumentation import ProbeHook
+
+# Default prefix of the exported Prometheus metric names
+DEFAULT_PROMETHEUS_PREFIX = 'database360'
+
+
+def _write_atomic(path: Path, text: str):
+    # Readers such as the textfile collector must never see a half-written file
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+            tmp_file.write(text)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class JsonMetricsExporter(ProbeHook):
+    """Writes the run summary and the metrics of each probed resource as one JSON document."""
+
+    def __init__(self, path: str):
+        """Initialize the exporter.
+
+        Args:
+            path: Output file path, replaced at the end of every run
+        """
+        self.path = Path(path)
+        self.resources: List[Dict] = []
+
+    def resource_finished(self, result: Dict):
+        # Reused, replayed and deferred results come without metrics and are not exported
+        if 'metrics' in result:
+            self.resources.append({'database_name': result.get('database_name'), **result['metrics']})
+
+    def run_finished(self, summary: Dict):
+        _write_atomic(self.path, json.dumps({'summary': summary, 'resources': self.resources}, indent=2))
+        self.resources = []
+
+
+class PrometheusTextfileExporter(ProbeHook):
+    """Writes the run summary in the Prometheus text exposition format."""
+
+    def __init__(self, path: str, prefix: str = DEFAULT_PROMETHEUS_PREFIX):
+        """Initialize the exporter.
+
+        Args:
+            path: Output file path, usually ending in .prom
+            prefix: Prefix of the metric names
+        """
+        self.path = Path(path)
+        self.prefix = prefix
+
+    def run_finished(self, summary: Dict):
+        _write_atomic(self.path, format_prometheus(summary, self.prefix))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+def format_prometheus(summary: Dict, prefix: str = DEFAULT_PROMETHEUS_PREFIX) -> str:
+    """Format a run summary as Prometheus gauges.
+
+    Args:
+        summary: Run summary as returned by RunSummary.as_dict
+        prefix: Prefix of the metric names
+
+    Returns:
+        Text exposition of the summary
+    """
+    gauges = [
+        ('run_timestamp_seconds', "Start time of the last run", [({}, summary['started_at'])]),
+        ('run_seconds', "Wall time of the last run", [({}, summary['seconds'])]),
+        ('resources', "Resources of the last run by state", [
+            ({'state': 'total'}, summary['resources']),
+            ({'state': 'probed'}, summary['probed']),
+            ({'state': 'reused'}, summary['reused']),
+            ({'state': 'catalog_error'}, summary['catalog_errors']),
+            ({'state': 'purl_matched'}, summary['purl_matches']),
+        ]),
+        ('resources_per_second', "Resources probed per second in the last run",
+         [({}, summary['resources_per_second'])]),
+        ('phase_seconds', "Time spent in each probe phase, summed over resources",
+         [({'phase': name}, phase['seconds']) for name, phase in sorted(summary['phases'].items())]),
+        ('phase_requests', "HTTP responses received in each probe phase",
+         [({'phase': name}, phase['requests']) for name, phase in sorted(summary['phases'].items())]),
+        ('phase_bytes', "Body bytes read in each probe phase",
+         [({'phase': name}, phase['bytes']) for name, phase in sorted(summary['phases'].items())]),
+        ('http_responses', "HTTP responses of the last run by status code",
+         [({'code': code}, count) for code, count in sorted(summary['status_codes'].items())]),
+        ('http_retries', "Requests retried in the last run", [({}, summary['retries'])]),
+        ('http_redirects', "Redirects followed in the last run", [({}, summary['redirects'])]),
+        ('cache_hits', "Responses served from the HTTP cache in the last run", [({}, summary['cache_hits'])]),
+        ('rate_limit_wait_seconds', "Time spent waiting for per-host rate limits, summed over resources",
+         [({}, summary['rate_limit_wait'])]),
+    ]
+    shared = summary.get('shared_fetches')
+    if shared:
+        gauges.append(('shared_fetches', "Fetches shared between resources of the last run",
+                       [({'result': 'hit'}, shared['hits']), ({'result': 'miss'}, shared['misses'])]))
+
+    redirects = summary.get('redirect_cache')
+    if redirects:
+        gauges.append(('redirect_cache', "PURLs resolved from the redirect cache (hit) or over the network (miss)",
+                       [({'result': 'hit'}, redirects['hits']), ({'result': 'miss'}, redirects['misses'])]))
+
+    shared_cache = summary.get('shared_cache')
+    if shared_cache:
+        gauges.append(('shared_cache', "Lookups in the cache shared between processes, by kind of entry",
+                       [({'namespace': namespace, 'result': result}, counts[key])
+                        for namespace, counts in sorted(shared_cache['namespaces'].items())
+                        for result, key in (('hit', 'hits'), ('miss', 'misses'))]))
+
+    parse_pool = summary.get('parse_pool')
+    if parse_pool:
+        gauges.append(('parse_pool_pages', "Catalog pages parsed in worker processes in the last run",
+                       [({}, parse_pool['pages'])]))
+        gauges.append(('parse_queue_wait_seconds', "Time fetchers waited for room in the parse queue",
+                       [({}, parse_pool['queue_wait'])]))
+
+    rates = summary.get('host_rates')
+    if rates:
+        gauges.append(('host_request_rate', "Request rate of each host at the end of the last run, per second",
+                       [({'host': host}, round(rate, 3)) for host, rate in sorted(rates.items())]))
+
+    lines = []
+    for name, help_text, samples in gauges:
+        if not samples:
+            continue
+        metric = f"{prefix}_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.extend(f"{metric}{_format_labels(labels)} {value}" for labels, value in samples)
+    return '\n'.join(lines) + '\n'
+
+
+# Exporter classes by file extension, used by open_metrics_exporter
+EXPORTERS_BY_EXTENSION = {
+    '.json': JsonMetricsExporter,
+    '.prom': PrometheusTextfileExporter,
+}
+
+
+def open_metrics_exporter(path: str) -> ProbeHook:
+    """Create a metrics exporter, choosing the format from the file extension.
+
+    Args:
+        path: Output path ending in .json or .prom
+
+    Returns:
+        The exporter, to be passed to ProbeRunner as a hook
+    """
+    suffix = Path(path).suffix.lower()
+    try:
+        exporter_class = EXPORTERS_BY_EXTENSION[suffix]
+    except KeyError:
+        raise ValueError(f"Unsupported metrics file extension '{suffix}', expected one of {sorted(EXPORTERS_BY_EXTENSION)}")
+    return exporter_class(path)
@@ -0,0 +1 @@
+"""Networking helpers shared by the probe modules."""
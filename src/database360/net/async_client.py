@@ -0,0 +1,354 @@
+"""Asynchronous HTTP client used by the asyncio probe backend.
+
+aiohttp is used when it is installed; otherwise requests go through a small
+HTTP/1.1 implementation built on asyncio streams from the standard library.
+"""
+
+import asyncio
+import importlib.util
+import ssl
+import time
+import urllib.parse
+from typing import Callable, Dict, List, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+from database360 import instrumentation
+from database360.config.settings import get_setting
+from database360.net.cache import ResponseCache
+from database360.net.client import DEFAULT_TIMEOUT, HEADERS, RETRY_STATUS_CODES
+from database360.net.rate_limiter import HostRateLimiter, THROTTLE_STATUS_CODES, parse_retry_after
+
+# aiohttp is imported by the first request that uses it, keeping it off the start-up path
+AIOHTTP_AVAILABLE = importlib.util.find_spec('aiohttp') is not None
+
+# Default number of requests kept in flight at once
+DEFAULT_MAX_IN_FLIGHT = 100
+
+# Size of the chunks read from response bodies
+CHUNK_SIZE = 64 * 1024
+
+# Maximum number of redirects followed for one request
+MAX_REDIRECTS = 10
+
+REDIRECT_STATUS_CODES = (301, 302, 303, 307, 308)
+
+# Called with the response (headers only) and each chunk of its body; returning True stops reading
+ChunkCallback = Callable[['AsyncResponse', bytes], bool]
+
+
+class AsyncResponse:
+    """Response of an asynchronous request, mirroring the parts of requests.Response the probes use."""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes = b'',
+                 history: Optional[List['AsyncResponse']] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.history = history or []
+        self.encoding = requests.utils.get_encoding_from_headers(self.headers)
+        # Number of retries before this response and body bytes read, including streamed chunks
+        self.retries = 0
+        self.bytes_read = 0
+
+    @property
+    def text(self) -> str:
+        """Body decoded with the response encoding, falling back to UTF-8."""
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def raise_for_status(self):
+        """Raise requests.HTTPError for 4xx and 5xx responses, like requests.Response."""
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=None)
+
+
+class AsyncHttpClient:
+    """Asynchronous HTTP client with an in-flight limit, per-host rate limiting, retries and redirects."""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, retries: int = 3, backoff_factor: float = 0.5,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, rate_limiter: Optional[HostRateLimiter] = None,
+                 headers: Optional[Dict[str, str]] = None, cache: Optional[ResponseCache] = None,
+                 use_aiohttp: Optional[bool] = None):
+        """Initialize the client.
+
+        Args:
+            timeout: Timeout in seconds for a single request, including redirects
+            retries: Number of retries for connection errors and retryable status codes
+            backoff_factor: Exponential backoff factor between retries
+            max_in_flight: Maximum number of requests in flight at once
+            rate_limiter: Optional per-host rate limiter
+            headers: Headers sent with every request. Defaults to HEADERS.
+            cache: Optional on-disk response cache used by requests made with use_cache=True
+            use_aiohttp: Force (True) or disable (False) aiohttp. Defaults to using it when installed.
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_in_flight = max_in_flight
+        self.rate_limiter = rate_limiter
+        self.headers = dict(headers if headers is not None else HEADERS)
+        self.cache = cache
+        if use_aiohttp and not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is not installed")
+        self.use_aiohttp = AIOHTTP_AVAILABLE if use_aiohttp is None else use_aiohttp
+        self._semaphore = None
+        self._loop = None
+        self._session = None
+        self._ssl_context = None
+
+    @classmethod
+    def from_config(cls, institution_config: Dict, rate_limiter: Optional[HostRateLimiter] = None) -> 'AsyncHttpClient':
+        """Create a client from institution settings.
+
+        Args:
+            institution_config: Dictionary containing institution configuration
+            rate_limiter: Optional per-host rate limiter
+
+        Returns:
+            Configured AsyncHttpClient
+        """
+        return cls(
+            timeout=get_setting(institution_config, 'request_timeout', DEFAULT_TIMEOUT, float),
+            retries=get_setting(institution_config, 'request_retries', 3, int),
+            backoff_factor=get_setting(institution_config, 'retry_backoff_factor', 0.5, float),
+            max_in_flight=get_setting(institution_config, 'max_in_flight', DEFAULT_MAX_IN_FLIGHT, int),
+            rate_limiter=rate_limiter,
+            cache=ResponseCache.from_config(institution_config),
+        )
+
+    async def get(self, url: str, allow_redirects: bool = True, use_cache: bool = False,
+                  chunk_callback: Optional[ChunkCallback] = None) -> AsyncResponse:
+        """Send a GET request.
+
+        Args:
+            url: URL to request
+            allow_redirects: Follow redirects
+            use_cache: Serve and store the response through the response cache, if one is configured
+            chunk_callback: Optional callback receiving the response and a successful (2xx) body chunk
+                            by chunk instead of the body being kept in the response. Reading stops
+                            when it returns True.
+
+        Returns:
+            The response
+        """
+        if use_cache and self.cache is not None and chunk_callback is None:
+            return await self._cached_get(url, allow_redirects)
+        return await self._request(url, {}, allow_redirects, chunk_callback)
+
+    async def head(self, url: str, allow_redirects: bool = True) -> AsyncResponse:
+        """Send a HEAD request.
+
+        Args:
+            url: URL to request
+            allow_redirects: Follow redirects
+
+        Returns:
+            The response, without a body
+        """
+        return await self._request(url, {}, allow_redirects, None, method='HEAD')
+
+    async def _cached_get(self, url: str, allow_redirects: bool):
+        meta = self.cache.load(url)
+        if meta is not None and self.cache.is_fresh(meta):
+            cached = self.cache.to_response(meta)
+            if cached is not None:
+                instrumentation.record_cache_hit()
+                return cached
+            meta = None
+
+        headers = self.cache.conditional_headers(meta) if meta is not None else {}
+        response = await self._request(url, headers, allow_redirects, None)
+        if response.status_code == 304 and meta is not None:
+            cached = self.cache.to_response(meta)
+            if cached is not None:
+                self.cache.refresh(meta)
+                instrumentation.record_cache_hit()
+                return cached
+            response = await self._request(url, {}, allow_redirects, None)
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    async def _request(self, url: str, headers: Dict[str, str], allow_redirects: bool,
+                       chunk_callback: Optional[ChunkCallback], method: str = 'GET') -> AsyncResponse:
+        # The semaphore and aiohttp session belong to one event loop; recreate them for a new loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            stale, self._session = self._session, None
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            if stale is not None:
+                await self._close_session(stale)
+
+        async with self._semaphore:
+            history = []
+            for _ in range(MAX_REDIRECTS + 1):
+                response = await self._send_with_retries(url, headers, chunk_callback, method)
+                location = response.headers.get('Location')
+                if not allow_redirects or response.status_code not in REDIRECT_STATUS_CODES or not location:
+                    response.history = history
+                    chain = history + [response]
+                    instrumentation.record_response([r.status_code for r in chain],
+                                                    retries=sum(r.retries for r in chain),
+                                                    body_bytes=sum(r.bytes_read for r in chain))
+                    return response
+                history.append(response)
+                url = urllib.parse.urljoin(url, location)
+            raise requests.TooManyRedirects(f"Exceeded {MAX_REDIRECTS} redirects")
+
+    async def _send_with_retries(self, url: str, headers: Dict[str, str],
+                                 chunk_callback: Optional[ChunkCallback], method: str = 'GET') -> AsyncResponse:
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.reserve(url)
+                if wait > 0:
+                    instrumentation.record_wait(wait)
+                    await asyncio.sleep(wait)
+
+            final_attempt = attempt == self.retries
+            delay = self.backoff_factor * (2 ** attempt)
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self._send(url, headers, chunk_callback, method), self.timeout)
+            except (OSError, asyncio.TimeoutError, ConnectionError) as e:
+                if final_attempt:
+                    raise requests.ConnectionError(f"Error requesting {url}: {e!r}")
+            else:
+                retry_after = None
+                if response.status_code in THROTTLE_STATUS_CODES:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if self.rate_limiter is not None:
+                    # The limiter holds the host back for Retry-After before the next reservation
+                    self.rate_limiter.record_response(url, response.status_code,
+                                                      latency=time.perf_counter() - started,
+                                                      retry_after=retry_after)
+                elif retry_after:
+                    delay = max(delay, retry_after)
+                if response.status_code not in RETRY_STATUS_CODES or final_attempt:
+                    response.retries = attempt
+                    return response
+
+            await asyncio.sleep(delay)
+
+    async def _send(self, url: str, headers: Dict[str, str], chunk_callback: Optional[ChunkCallback],
+                    method: str = 'GET') -> AsyncResponse:
+        if self.use_aiohttp:
+            return await self._send_aiohttp(url, headers, chunk_callback, method)
+        return await self._send_stdlib(url, headers, chunk_callback, method)
+
+    async def _send_aiohttp(self, url: str, headers: Dict[str, str],
+                            chunk_callback: Optional[ChunkCallback], method: str = 'GET') -> AsyncResponse:
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(headers=self.headers)
+        async with self._session.request(method, url, headers=headers, allow_redirects=False) as response:
+            result = AsyncResponse(str(response.url), response.status, dict(response.headers))
+            callback = chunk_callback if 200 <= response.status < 300 else None
+            body = []
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                result.bytes_read += len(chunk)
+                if callback is None:
+                    body.append(chunk)
+                elif callback(result, chunk):
+                    break
+            result.content = b''.join(body)
+            return result
+
+    async def _send_stdlib(self, url: str, headers: Dict[str, str],
+                           chunk_callback: Optional[ChunkCallback], method: str = 'GET') -> AsyncResponse:
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ('http', 'https'):
+            raise requests.InvalidURL(f"Unsupported URL scheme: {url}")
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        ssl_context = None
+        if parsed.scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+
+        reader, writer = await asyncio.open_connection(parsed.hostname, port, ssl=ssl_context)
+        try:
+            target = parsed.path or '/'
+            if parsed.query:
+                target += '?' + parsed.query
+            request_headers = dict(self.headers)
+            request_headers.update(headers)
+            request_headers.update({'Host': parsed.netloc, 'Accept-Encoding': 'identity', 'Connection': 'close'})
+            request = f"{method} {target} HTTP/1.1\r\n" + ''.join(
+                f"{name}: {value}\r\n" for name, value in request_headers.items()
+            ) + "\r\n"
+            writer.write(request.encode('latin-1'))
+            await writer.drain()
+
+            status_line = await reader.readline()
+            parts = status_line.decode('latin-1').split(None, 2)
+            if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+                raise ConnectionError(f"Malformed status line from {parsed.netloc}: {status_line!r}")
+            status_code = int(parts[1])
+
+            response_headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                response_headers[name.strip()] = value.strip()
+
+            response = AsyncResponse(url, status_code, response_headers)
+            # A HEAD response has no body, whatever its Content-Length says
+            if method == 'HEAD':
+                return response
+            # Only successful bodies are streamed to the callback; error and redirect bodies are kept
+            callback = chunk_callback if 200 <= status_code < 300 else None
+            body = []
+            async for chunk in self._iter_body(reader, response.headers):
+                response.bytes_read += len(chunk)
+                if callback is None:
+                    body.append(chunk)
+                elif callback(response, chunk):
+                    break
+            response.content = b''.join(body)
+            return response
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _iter_body(reader: asyncio.StreamReader, headers: CaseInsensitiveDict):
+        if 'chunked' in headers.get('Transfer-Encoding', '').lower():
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    return
+                yield await reader.readexactly(size)
+                await reader.readline()
+        elif 'Content-Length' in headers:
+            remaining = int(headers['Content-Length'])
+            while remaining > 0:
+                chunk = await reader.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            while True:
+                chunk = await reader.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    async def close(self):
+        """Close the aiohttp session, if one was opened."""
+        session, self._session = self._session, None
+        if session is not None:
+            await self._close_session(session)
+
+    @staticmethod
+    async def _close_session(session):
+        """Close an aiohttp session and its connector, even one opened on an earlier event loop."""
+        try:
+            await session.close()
+        except RuntimeError:
+            # Its event loop is already closed, which closed the session's sockets with it
+            pass
@@ -0,0 +1,223 @@
+"""Persistent on-disk HTTP response cache with conditional revalidation."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+from database360.config.settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the Institution sheet cache settings
+DEFAULT_CACHE_TTL = 0  # seconds an entry is served without revalidation
+DEFAULT_CACHE_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_CACHE_EXPIRE_AFTER = 30 * 24 * 3600  # seconds before an unrefreshed entry is evicted
+
+# Response headers kept alongside the cached body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class ResponseCache:
+    """Caches successful GET responses on disk, keyed by URL.
+
+    Each entry is a pair of files named after the SHA-256 of the URL: a body
+    file and a small JSON metadata file holding the validators (ETag and
+    Last-Modified). Files are written to a temporary name and atomically
+    renamed, so several processes can share one cache directory.
+    """
+
+    def __init__(self, directory: str, ttl: float = DEFAULT_CACHE_TTL, max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 expire_after: float = DEFAULT_CACHE_EXPIRE_AFTER):
+        """Initialize the response cache.
+
+        Args:
+            directory: Directory holding the cache files. Created if missing.
+            ttl: Seconds a stored response is served without contacting the server.
+                 Older entries are revalidated with If-None-Match / If-Modified-Since.
+            max_bytes: Maximum total size of cached bodies before least recently used entries are evicted
+            expire_after: Seconds after which an entry that was not refreshed is evicted
+        """
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.expire_after = expire_after
+        self._size = self._scan_size()
+
+    @classmethod
+    def from_config(cls, institution_config: Dict) -> Optional['ResponseCache']:
+        """Create a cache from institution settings.
+
+        Args:
+            institution_config: Dictionary containing institution configuration
+
+        Returns:
+            ResponseCache, or None if the 'HTTP Cache Dir' setting is not set
+        """
+        directory = get_setting(institution_config, 'http_cache_dir', None, str)
+        if not directory:
+            return None
+        return cls(
+            directory,
+            ttl=get_setting(institution_config, 'http_cache_ttl', DEFAULT_CACHE_TTL, float),
+            max_bytes=get_setting(institution_config, 'http_cache_max_bytes', DEFAULT_CACHE_MAX_BYTES, int),
+            expire_after=get_setting(institution_config, 'http_cache_expire_after', DEFAULT_CACHE_EXPIRE_AFTER, float),
+        )
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def _scan_size(self) -> int:
+        return sum(path.stat().st_size for path in self.directory.glob('*.body'))
+
+    def _write_atomic(self, path: Path, data: bytes):
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def load(self, url: str) -> Optional[Dict]:
+        """Load the metadata of a cached entry.
+
+        Args:
+            url: Requested URL
+
+        Returns:
+            Metadata dictionary, or None if the URL is not cached
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or not body_path.exists():
+            return None
+        return meta
+
+    def is_fresh(self, meta: Dict) -> bool:
+        """Return True if an entry may be served without revalidation."""
+        return time.time() - meta.get('stored_at', 0) < self.ttl
+
+    def conditional_headers(self, meta: Dict) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a cached entry."""
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def to_response(self, meta: Dict) -> Optional[requests.Response]:
+        """Rebuild a response object from a cached entry.
+
+        Args:
+            meta: Metadata returned by load()
+
+        Returns:
+            Response with the cached body, or None if the body vanished
+        """
+        _, body_path = self._paths(meta['url'])
+        try:
+            content = body_path.read_bytes()
+            # Touch the body so size-based eviction drops least recently used entries first
+            os.utime(body_path)
+        except OSError:
+            return None
+
+        response = requests.Response()
+        response.status_code = meta.get('status_code', 200)
+        response.url = meta['url']
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = meta.get('encoding')
+        response._content = content
+        response.from_cache = True
+        return response
+
+    def store(self, url: str, response: requests.Response):
+        """Store a successful response.
+
+        Args:
+            url: Requested URL
+            response: Response whose body has been read
+        """
+        meta_path, body_path = self._paths(url)
+        content = response.content
+        meta = {
+            'url': url,
+            'status_code': response.status_code,
+            'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+            'encoding': response.encoding,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'stored_at': time.time(),
+        }
+        try:
+            previous_size = body_path.stat().st_size if body_path.exists() else 0
+            self._write_atomic(body_path, content)
+            self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            logger.warning("Error writing HTTP cache entry for %s: %s", url, e)
+            return
+
+        self._size += len(content) - previous_size
+        if self._size > self.max_bytes:
+            self.prune()
+
+    def refresh(self, meta: Dict):
+        """Mark an entry as revalidated after a 304 Not Modified."""
+        meta_path, _ = self._paths(meta['url'])
+        meta['stored_at'] = time.time()
+        try:
+            self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            logger.warning("Error refreshing HTTP cache entry for %s: %s", meta['url'], e)
+
+    def prune(self):
+        """Evict expired entries, then least recently used entries until under max_bytes."""
+        now = time.time()
+        entries = []
+        for body_path in self.directory.glob('*.body'):
+            meta_path = body_path.with_suffix('.json')
+            try:
+                stat = body_path.stat()
+                stored_at = meta_path.stat().st_mtime
+            except OSError:
+                continue
+            if now - stored_at > self.expire_after:
+                self._remove(body_path, meta_path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, body_path, meta_path))
+
+        entries.sort()
+        total = sum(size for _, size, _, _ in entries)
+        # Evict down to 90% so a full cache does not prune on every store
+        target = self.max_bytes * 0.9
+        for _, size, body_path, meta_path in entries:
+            if total <= target:
+                break
+            self._remove(body_path, meta_path)
+            total -= size
+        self._size = total
+
+    @staticmethod
+    def _remove(body_path: Path, meta_path: Path):
+        for path in (meta_path, body_path):
+            try:
+                path.unlink()
+            except OSError:
+                pass
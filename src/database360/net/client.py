@@ -0,0 +1,235 @@
+"""Shared pooled HTTP client used by the catalog and PURL probes."""
+
+import datetime
+import threading
+import time
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from database360 import instrumentation
+from database360.config.settings import get_setting
+from database360.net.cache import ResponseCache
+from database360.net.rate_limiter import (
+    AdaptiveHostRateLimiter, HostRateLimiter, THROTTLE_STATUS_CODES, parse_retry_after
+)
+
+# Default politeness interval between requests to the same host
+DELAY_BETWEEN_REQUESTS = 2  # seconds
+
+# Default timeout for a single request
+DEFAULT_TIMEOUT = 30  # seconds
+
+# Headers for requests
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+}
+
+# Status codes that are retried with backoff
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Status codes urllib3 retries inside the adapter. Throttling responses are retried by the client
+# itself, so that every attempt waits for the host's rate limiter and the limiter sees each of them.
+ADAPTER_RETRY_STATUS_CODES = tuple(code for code in RETRY_STATUS_CODES if code not in THROTTLE_STATUS_CODES)
+
+
+class HttpClient:
+    """Keep-alive HTTP client with connection pooling, timeouts, retries and rate limiting.
+
+    A single client is meant to be shared by every probe in a run so that
+    TCP and TLS connections to the same host are reused.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, retries: int = 3, backoff_factor: float = 0.5,
+                 pool_connections: int = 100, pool_maxsize: int = 10,
+                 rate_limiter: Optional[HostRateLimiter] = None, headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[ResponseCache] = None):
+        """Initialize the HTTP client.
+
+        Args:
+            timeout: Default timeout in seconds applied to every request
+            retries: Number of retries for connection errors and retryable status codes
+            backoff_factor: Exponential backoff factor between retries
+            pool_connections: Number of per-host connection pools kept alive
+            pool_maxsize: Maximum number of connections kept alive per host
+            rate_limiter: Optional per-host rate limiter consulted before each request
+            headers: Headers sent with every request. Defaults to HEADERS.
+            cache: Optional on-disk response cache used by requests made with use_cache=True
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=ADAPTER_RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(headers if headers is not None else HEADERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def from_config(cls, institution_config: Dict, max_workers: int = 1,
+                    rate_limiter: Optional[HostRateLimiter] = None) -> 'HttpClient':
+        """Create a client from institution settings.
+
+        Args:
+            institution_config: Dictionary containing institution configuration
+            max_workers: Number of concurrent workers, used to size the per-host pools
+            rate_limiter: Optional per-host rate limiter
+
+        Returns:
+            Configured HttpClient
+        """
+        return cls(
+            timeout=get_setting(institution_config, 'request_timeout', DEFAULT_TIMEOUT, float),
+            retries=get_setting(institution_config, 'request_retries', 3, int),
+            backoff_factor=get_setting(institution_config, 'retry_backoff_factor', 0.5, float),
+            pool_maxsize=max(max_workers, get_setting(institution_config, 'connections_per_host', 10, int)),
+            rate_limiter=rate_limiter,
+            cache=ResponseCache.from_config(institution_config),
+        )
+
+    def get(self, url: str, use_cache: bool = False, **kwargs) -> requests.Response:
+        """Send a GET request through the pooled session.
+
+        Args:
+            url: URL to request
+            use_cache: Serve and store the response through the response cache, if one is configured
+            **kwargs: Extra arguments passed to requests.Session.get
+
+        Returns:
+            The response
+        """
+        if use_cache and self.cache is not None and not kwargs.get('stream'):
+            return self._cached_get(url, **kwargs)
+        return self._send(url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """Send a HEAD request through the pooled session.
+
+        Args:
+            url: URL to request
+            **kwargs: Extra arguments passed to requests.Session.head, such as allow_redirects
+
+        Returns:
+            The response, without a body
+        """
+        return self._send(url, method='HEAD', **kwargs)
+
+    def _send(self, url: str, method: str = 'GET', **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        send = self.session.head if method == 'HEAD' else self.session.get
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter is not None:
+                instrumentation.record_wait(self.rate_limiter.acquire(url))
+            response = send(url, **kwargs)
+            if self.rate_limiter is not None:
+                self._report_to_rate_limiter(response)
+            if response.status_code not in THROTTLE_STATUS_CODES or attempt == self.retries:
+                break
+
+            # An adaptive limiter holds the host back for Retry-After before the next acquire
+            delay = self.backoff_factor * (2 ** attempt)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after and not isinstance(self.rate_limiter, AdaptiveHostRateLimiter):
+                delay = max(delay, retry_after)
+            if kwargs.get('stream'):
+                response.close()
+            time.sleep(delay)
+
+        # Streamed bodies are counted by the caller as they are read
+        instrumentation.record_response(
+            [r.status_code for r in response.history] + [response.status_code],
+            retries=instrumentation.retry_count(response) + attempt,
+            body_bytes=0 if kwargs.get('stream') or method == 'HEAD' else len(response.content),
+        )
+        return response
+
+    def _report_to_rate_limiter(self, response: requests.Response):
+        """Pass the status, latency and Retry-After of a response and its redirects to the rate limiter."""
+        chain = response.history if isinstance(response.history, list) else []
+        for r in chain + [response]:
+            # Responses urllib3 retried internally are only known by their status
+            retried = getattr(getattr(getattr(r, 'raw', None), 'retries', None), 'history', None)
+            if isinstance(retried, tuple):
+                for attempt in retried:
+                    if attempt.status is not None:
+                        self.rate_limiter.record_response(r.url, attempt.status)
+
+            elapsed = getattr(r, 'elapsed', None)
+            retry_after = None
+            if r.status_code in THROTTLE_STATUS_CODES:
+                retry_after = parse_retry_after(r.headers.get('Retry-After'))
+            self.rate_limiter.record_response(
+                r.url, r.status_code,
+                latency=elapsed.total_seconds() if isinstance(elapsed, datetime.timedelta) else None,
+                retry_after=retry_after,
+            )
+
+    def _cached_get(self, url: str, **kwargs) -> requests.Response:
+        meta = self.cache.load(url)
+        if meta is not None and self.cache.is_fresh(meta):
+            response = self.cache.to_response(meta)
+            if response is not None:
+                instrumentation.record_cache_hit()
+                return response
+            meta = None
+
+        if meta is not None:
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers.update(self.cache.conditional_headers(meta))
+            kwargs['headers'] = headers
+
+        response = self._send(url, **kwargs)
+
+        if response.status_code == 304 and meta is not None:
+            cached = self.cache.to_response(meta)
+            if cached is not None:
+                self.cache.refresh(meta)
+                instrumentation.record_cache_hit()
+                return cached
+            # The body was evicted between load and revalidation; fetch it again
+            kwargs['headers'] = {k: v for k, v in kwargs['headers'].items()
+                                 if k not in ('If-None-Match', 'If-Modified-Since')}
+            response = self._send(url, **kwargs)
+
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_default_client: Optional[HttpClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """Return the process-wide client used when a probe is called without one.
+
+    The default client starts at one request every DELAY_BETWEEN_REQUESTS seconds per host
+    and adapts each host's rate to its responses.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(rate_limiter=AdaptiveHostRateLimiter(DELAY_BETWEEN_REQUESTS))
+        return _default_client
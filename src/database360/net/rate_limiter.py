@@ -0,0 +1,349 @@
+"""Per-host rate limiting for outgoing probe requests."""
+
+import email.utils
+import threading
+import time
+import urllib.parse
+from typing import Dict, Optional
+from database360.config.settings import get_setting
+
+# Responses telling the client to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+
+# Defaults for the adaptive limiter, in requests per second per host
+DEFAULT_MIN_REQUEST_RATE = 0.1
+DEFAULT_MAX_REQUEST_RATE = 5.0
+
+# Requests per second added to a host's rate for every second of healthy responses
+DEFAULT_RATE_INCREASE = 0.5
+
+# Factor applied to a host's rate when it throttles or slows down
+DEFAULT_RATE_DECREASE = 0.5
+
+# A host is slowing down when its smoothed latency exceeds its best smoothed latency by this factor
+DEFAULT_LATENCY_FACTOR = 2.0
+
+# Upper bound on a Retry-After pause, so one bad header cannot stall a run
+MAX_RETRY_AFTER = 600  # seconds
+
+# Weight of the latest response in the smoothed latency
+LATENCY_SMOOTHING = 0.2
+
+# Fraction of the gap to the smoothed latency by which the best latency drifts up per response,
+# so a host that became permanently slower is not throttled forever
+BEST_LATENCY_DRIFT = 0.01
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Args:
+        value: Header value
+
+    Returns:
+        Seconds to wait, capped at MAX_RETRY_AFTER, or None if the value is missing or invalid
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, OverflowError):
+            return None
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Tokens refill continuously at ``rate`` tokens per second up to ``capacity``.
+    Each acquire takes one token; when none is available the caller reserves
+    a future token and sleeps until it becomes due, so concurrent callers are
+    spaced out instead of all waking up at once.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """Initialize the token bucket.
+
+        Args:
+            rate: Refill rate in tokens per second
+            capacity: Maximum number of tokens that can accumulate (burst size)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token without sleeping.
+
+        Returns:
+            Number of seconds the caller must wait before using the token
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float):
+        """Change the refill rate; tokens already reserved stay due at the same time.
+
+        Args:
+            rate: New refill rate in tokens per second
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill()
+            if self._tokens < 0:
+                self._tokens *= rate / self.rate
+            self.rate = rate
+
+    def pause(self, seconds: float):
+        """Hand out no token for the next ``seconds``.
+
+        Args:
+            seconds: Length of the pause
+        """
+        with self._lock:
+            self._refill()
+            # The next reservation waits until the deficit has refilled
+            self._tokens = min(self._tokens, 1.0 - seconds * self.rate)
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available.
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host so each host is throttled independently."""
+
+    def __init__(self, min_interval: float, burst: float = 1.0):
+        """Initialize the host rate limiter.
+
+        Args:
+            min_interval: Minimum average number of seconds between requests to the same host.
+                          Zero or negative disables throttling.
+            burst: Number of requests a host may receive back to back before throttling kicks in
+        """
+        self.min_interval = min_interval
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_for(url: str) -> str:
+        """Return the host part of a URL used as the bucket key."""
+        return urllib.parse.urlparse(url).netloc.lower()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = self.host_for(url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(1.0 / self.min_interval, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def reserve(self, url: str) -> float:
+        """Reserve a request slot for the host of ``url`` without sleeping.
+
+        Used by the asyncio backend, which waits with asyncio.sleep instead.
+
+        Args:
+            url: URL about to be requested
+
+        Returns:
+            Number of seconds the caller must wait before sending the request
+        """
+        if self.min_interval <= 0:
+            return 0.0
+        return self._bucket(url).reserve()
+
+    def acquire(self, url: str) -> float:
+        """Wait until a request to the host of ``url`` is allowed.
+
+        Args:
+            url: URL about to be requested
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        if self.min_interval <= 0:
+            return 0.0
+        return self._bucket(url).acquire()
+
+    def record_response(self, url: str, status_code: int, latency: Optional[float] = None,
+                        retry_after: Optional[float] = None):
+        """Report a response from the host of ``url``. Fixed-rate limiters ignore it."""
+
+    def rates(self) -> Dict[str, float]:
+        """Return the current request rate of each host seen, in requests per second."""
+        if self.min_interval <= 0:
+            return {}
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._buckets.items()}
+
+
+class _HostState:
+    """Congestion state of one host."""
+
+    __slots__ = ('latency', 'best_latency', 'hold_until', 'resume_at')
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.best_latency: Optional[float] = None
+        self.hold_until = 0.0
+        self.resume_at = 0.0
+
+
+class AdaptiveHostRateLimiter(HostRateLimiter):
+    """Per-host limiter adjusting each host's rate from its responses (AIMD).
+
+    Each host starts at one request every ``min_interval`` seconds. Healthy
+    responses raise its rate additively, by about ``increase`` requests per
+    second for every second of traffic, up to ``max_rate``. A 429 or 503, or
+    a smoothed latency ``latency_factor`` times above the best seen, cuts the
+    rate by ``decrease`` down to ``min_rate``, at most once per round trip so
+    the responses already in flight do not compound the cut. A Retry-After
+    header pauses the host for the time asked, even when pacing is disabled.
+    """
+
+    def __init__(self, min_interval: float, burst: float = 1.0, min_rate: float = DEFAULT_MIN_REQUEST_RATE,
+                 max_rate: float = DEFAULT_MAX_REQUEST_RATE, increase: float = DEFAULT_RATE_INCREASE,
+                 decrease: float = DEFAULT_RATE_DECREASE, latency_factor: float = DEFAULT_LATENCY_FACTOR):
+        """Initialize the adaptive limiter.
+
+        Args:
+            min_interval: Initial average number of seconds between requests to the same host.
+                          Zero or negative disables pacing; Retry-After is still honored.
+            burst: Number of requests a host may receive back to back before throttling kicks in
+            min_rate: Lowest rate a host is slowed down to, in requests per second
+            max_rate: Highest rate a host is sped up to, in requests per second
+            increase: Requests per second added for every second of healthy responses
+            decrease: Factor applied to the rate when the host throttles or slows down
+            latency_factor: Ratio of smoothed to best latency at which the host is considered slowed down
+        """
+        super().__init__(min_interval, burst)
+        self.min_rate = max(min_rate, 1e-6)
+        self.max_rate = max(max_rate, self.min_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self._states: Dict[str, _HostState] = {}
+
+    @classmethod
+    def from_config(cls, institution_config: Dict, min_interval: float) -> 'AdaptiveHostRateLimiter':
+        """Create a limiter from institution settings.
+
+        Args:
+            institution_config: Dictionary containing institution configuration
+            min_interval: Initial number of seconds between requests to the same host
+
+        Returns:
+            Configured AdaptiveHostRateLimiter
+        """
+        return cls(
+            min_interval,
+            min_rate=get_setting(institution_config, 'min_request_rate', DEFAULT_MIN_REQUEST_RATE, float),
+            max_rate=get_setting(institution_config, 'max_request_rate', DEFAULT_MAX_REQUEST_RATE, float),
+        )
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = self.host_for(url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate = min(self.max_rate, max(self.min_rate, 1.0 / self.min_interval))
+                bucket = self._buckets[host] = TokenBucket(rate, self.burst)
+            return bucket
+
+    def _state(self, host: str) -> _HostState:
+        state = self._states.get(host)
+        if state is None:
+            state = self._states[host] = _HostState()
+        return state
+
+    def _paused_for(self, url: str) -> float:
+        with self._lock:
+            state = self._states.get(self.host_for(url))
+            return max(0.0, state.resume_at - time.monotonic()) if state is not None else 0.0
+
+    def reserve(self, url: str) -> float:
+        if self.min_interval <= 0:
+            return self._paused_for(url)
+        return self._bucket(url).reserve()
+
+    def acquire(self, url: str) -> float:
+        if self.min_interval <= 0:
+            wait = self._paused_for(url)
+            if wait > 0:
+                time.sleep(wait)
+            return wait
+        return self._bucket(url).acquire()
+
+    def record_response(self, url: str, status_code: int, latency: Optional[float] = None,
+                        retry_after: Optional[float] = None):
+        """Adjust the rate of the host of ``url`` from one of its responses.
+
+        Args:
+            url: URL of the response
+            status_code: HTTP status code
+            latency: Seconds until the response arrived, if measured
+            retry_after: Seconds the host asked to wait (from a Retry-After header)
+        """
+        host = self.host_for(url)
+        bucket = self._bucket(url) if self.min_interval > 0 else None
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(host)
+            if latency is not None and latency >= 0:
+                state.latency = latency if state.latency is None else (
+                    LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * state.latency)
+                if state.best_latency is None or state.latency < state.best_latency:
+                    state.best_latency = state.latency
+                else:
+                    state.best_latency += BEST_LATENCY_DRIFT * (state.latency - state.best_latency)
+            if retry_after:
+                state.resume_at = max(state.resume_at, now + retry_after)
+
+            if bucket is None:
+                return
+            slow = (state.latency is not None and state.best_latency
+                    and state.latency > self.latency_factor * state.best_latency)
+            if status_code in THROTTLE_STATUS_CODES or slow:
+                if now < state.hold_until:
+                    rate = None
+                else:
+                    rate = max(self.min_rate, bucket.rate * self.decrease)
+                    # Responses to requests sent before the cut must not cut again
+                    state.hold_until = now + 1.0 / rate + (state.latency or 0.0)
+            elif isinstance(status_code, int) and status_code < 500:
+                rate = min(self.max_rate, bucket.rate + self.increase / bucket.rate)
+            else:
+                rate = None
+
+        if rate is not None and rate != bucket.rate:
+            bucket.set_rate(rate)
+        if retry_after:
+            bucket.pause(retry_after)
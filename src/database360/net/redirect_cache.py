@@ -0,0 +1,157 @@
+"""Persistent cache of the redirect chains followed by PURLs."""
+
+import re
+import threading
+from typing import Dict, Optional
+from database360.config.settings import get_setting
+from database360.shared_cache import SharedCache
+
+# Default seconds a recorded redirect is trusted when its response carries no max-age
+DEFAULT_REDIRECT_TTL = 7 * 24 * 3600
+
+# Longest chain followed through the cache, guarding against recorded loops
+MAX_CACHED_HOPS = 30
+
+# Cache-Control directives deciding how long a redirect may be reused
+MAX_AGE_PATTERN = re.compile(r'(?:^|,)\s*(?:s-)?max-age\s*=\s*"?(\d+)', re.IGNORECASE)
+NO_CACHE_PATTERN = re.compile(r'(?:^|,)\s*(?:no-store|no-cache)\b', re.IGNORECASE)
+
+
+def redirect_ttl(headers, default: float) -> float:
+    """Return the seconds a redirect may be reused, from its Cache-Control header.
+
+    Args:
+        headers: Headers of the redirect response
+        default: TTL of redirects without a max-age directive
+
+    Returns:
+        max-age if given, 0 for no-store / no-cache, the default otherwise
+    """
+    cache_control = headers.get('Cache-Control') or ''
+    if NO_CACHE_PATTERN.search(cache_control):
+        return 0
+    match = MAX_AGE_PATTERN.search(cache_control)
+    return float(match.group(1)) if match else default
+
+
+class RedirectCache:
+    """Record of redirect hops, each with its own expiry, kept in a SharedCache.
+
+    A later run asks resolve() for the last known target of a PURL and
+    requests it directly, skipping the resolver and proxy hops. The chain is
+    only followed again when one of its hops expired or the target stopped
+    working, in which case the caller invalidates it. Hops are stored in the
+    'redirect' namespace, so processes sharing a cache share their PURL targets.
+    """
+
+    # Namespace of the hops in the shared cache
+    NAMESPACE = 'redirect'
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_REDIRECT_TTL,
+                 cache: Optional[SharedCache] = None):
+        """Open or create the redirect cache.
+
+        Args:
+            path: Path of the SQLite database file, when the cache has a file of its own
+            ttl: Seconds a redirect is trusted when its response has no Cache-Control max-age
+            cache: Shared cache holding the hops instead of a file of their own
+        """
+        if cache is None:
+            if path is None:
+                raise ValueError("RedirectCache needs a path or a shared cache")
+            cache = SharedCache(path)
+            self._owns_cache = True
+        else:
+            self._owns_cache = False
+        self.cache = cache
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, institution_config: Dict,
+                    shared_cache: Optional[SharedCache] = None) -> Optional['RedirectCache']:
+        """Create a redirect cache from institution settings.
+
+        Args:
+            institution_config: Dictionary containing institution configuration
+            shared_cache: Shared cache used when 'Redirect Cache File' is not set
+
+        Returns:
+            RedirectCache, or None if neither the 'Redirect Cache File' setting nor a shared cache
+            is set, or if 'Redirect Cache TTL' is 0
+        """
+        path = get_setting(institution_config, 'redirect_cache_file', None, str)
+        ttl = get_setting(institution_config, 'redirect_cache_ttl', DEFAULT_REDIRECT_TTL, float)
+        if (not path and shared_cache is None) or ttl <= 0:
+            return None
+        return cls(path, ttl=ttl) if path else cls(ttl=ttl, cache=shared_cache)
+
+    def resolve(self, url: str) -> Optional[str]:
+        """Follow the recorded hops from a URL.
+
+        Args:
+            url: URL whose chain was recorded, usually a PURL
+
+        Returns:
+            Last known target of the chain, up to its first expired hop, or None if the URL
+            has no recorded redirect or its first hop expired
+        """
+        target = url
+        for _ in range(MAX_CACHED_HOPS):
+            location = self.cache.get(self.NAMESPACE, target)
+            if location is None:
+                break
+            target = location.decode('utf-8')
+        else:
+            target = url
+        with self._lock:
+            if target == url:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return target
+
+    def record(self, response) -> int:
+        """Record the redirects a response went through.
+
+        Args:
+            response: requests.Response or AsyncResponse whose history holds the redirects followed
+
+        Returns:
+            Number of hops recorded
+        """
+        history = response.history if isinstance(response.history, list) else []
+        chain = history + [response]
+        recorded = 0
+        for hop, following in zip(history, chain[1:]):
+            ttl = redirect_ttl(hop.headers, self.ttl)
+            if ttl > 0 and hop.url != following.url:
+                self.cache.set(self.NAMESPACE, hop.url, following.url.encode('utf-8'), ttl)
+                recorded += 1
+        return recorded
+
+    def invalidate(self, url: str):
+        """Forget the recorded chain starting at a URL.
+
+        Args:
+            url: First URL of the chain
+        """
+        target = url
+        for _ in range(MAX_CACHED_HOPS):
+            location = self.cache.get(self.NAMESPACE, target)
+            if location is None:
+                break
+            self.cache.delete(self.NAMESPACE, target)
+            target = location.decode('utf-8')
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of PURLs resolved from the cache (hits) and followed over the network (misses)."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        """Close the database connection, unless the hops live in a shared cache."""
+        if self._owns_cache:
+            self.cache.close()
@@ -0,0 +1,189 @@
+"""Run-scoped coalescing of identical fetches.
+
+Several resources often share a PURL or resolve to the same catalog record.
+A SingleFlight map makes the first probe needing a key do the work while
+concurrent probes wait for it and later probes reuse the completed value.
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Default number of completed values kept for reuse
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class _Call:
+    """One in-flight or completed call."""
+
+    __slots__ = ('done', 'future', 'value', 'error', 'abandoned')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.future = None
+        self.value = None
+        self.error = None
+        # Set when the owner was interrupted; waiters then start a call of their own
+        self.abandoned = False
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class SingleFlight:
+    """Map from a key to the in-flight or completed result of the call computing it.
+
+    Safe to share between worker threads, and between the coroutines of one
+    event loop through do_async. Completed values are kept in an LRU of
+    ``max_entries``; keys registered with expect() are dropped after their
+    last expected use instead. Failures are shared like values, so a URL that
+    failed is not retried by the other resources of the same run.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Initialize an empty map.
+
+        Args:
+            max_entries: Maximum number of completed values kept
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._calls: 'OrderedDict[Hashable, _Call]' = OrderedDict()
+        self._uses: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def expect(self, key: Hashable, uses: int):
+        """Declare how many times a key will be used in the run.
+
+        Args:
+            key: Key of the call
+            uses: Number of expected uses; the value is released after the last one
+        """
+        with self._lock:
+            self._uses[key] = uses
+
+    def expected_uses(self, key: Hashable) -> int:
+        """Return the number of remaining expected uses of a key (0 if none were declared)."""
+        with self._lock:
+            return self._uses.get(key, 0)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return the value for a key, calling fn only if no other call for the key is in flight or done.
+
+        Args:
+            key: Key identifying the work, such as a URL
+            fn: Function computing the value
+
+        Returns:
+            The value computed by fn in this or another thread. Its exception is raised instead if it failed.
+        """
+        while True:
+            call, owner = self._claim(key)
+            if owner:
+                try:
+                    call.value = fn()
+                except Exception as e:
+                    call.error = e
+                except BaseException:
+                    self._forget(key, call)
+                    raise
+                finally:
+                    call.done.set()
+            else:
+                call.done.wait()
+                if call.abandoned:
+                    continue
+            self._release(key)
+            return call.result()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Asynchronous counterpart of do for coroutines running on one event loop.
+
+        Args:
+            key: Key identifying the work, such as a URL
+            fn: Coroutine function computing the value
+
+        Returns:
+            The value computed by fn in this or another coroutine
+        """
+        while True:
+            call, owner = self._claim(key)
+            if owner:
+                call.future = asyncio.get_running_loop().create_future()
+                try:
+                    call.value = await fn()
+                except Exception as e:
+                    call.error = e
+                except BaseException:
+                    self._forget(key, call)
+                    raise
+                finally:
+                    call.done.set()
+                    call.future.set_result(None)
+            else:
+                if not call.done.is_set():
+                    await asyncio.shield(call.future)
+                if call.abandoned:
+                    continue
+            self._release(key)
+            return call.result()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit and miss counters.
+
+        Returns:
+            Dictionary with 'hits' (calls served by another call) and 'misses' (calls that did the work)
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        """Drop every completed value, keeping the counters."""
+        with self._lock:
+            for key in [key for key, call in self._calls.items() if call.done.is_set()]:
+                del self._calls[key]
+            self._uses.clear()
+
+    def _claim(self, key: Hashable):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.hits += 1
+                self._calls.move_to_end(key)
+                return call, False
+            self.misses += 1
+            call = self._calls[key] = _Call()
+            self._evict()
+            return call, True
+
+    def _release(self, key: Hashable):
+        with self._lock:
+            if key in self._uses:
+                self._uses[key] -= 1
+                if self._uses[key] <= 0:
+                    del self._uses[key]
+                    self._calls.pop(key, None)
+
+    def _forget(self, key: Hashable, call: _Call):
+        # An interrupted call is not shared; the next caller starts over
+        call.abandoned = True
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def _evict(self):
+        # Only completed values without expected uses are evicted; in-flight calls must stay visible
+        excess = len(self._calls) - self.max_entries
+        if excess <= 0:
+            return
+        for key in list(self._calls):
+            call = self._calls[key]
+            if call.done.is_set() and key not in self._uses:
+                del self._calls[key]
+                excess -= 1
+                if excess <= 0:
+                    return
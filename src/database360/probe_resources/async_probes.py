@@ -0,0 +1,282 @@
+"""Asynchronous versions of the catalog and PURL probes.
+
+They return the same result dictionaries as probe_resource and probe_purl,
+but issue their requests through an AsyncHttpClient so a single process can
+keep hundreds of probes in flight.
+"""
+
+import asyncio
+import logging
+import urllib.parse
+from typing import Dict, Optional, Pattern, Tuple
+import requests
+from database360.instrumentation import phase
+from database360.net.async_client import AsyncHttpClient, AsyncResponse, ChunkCallback
+from database360.net.redirect_cache import RedirectCache
+from database360.net.single_flight import SingleFlight
+from database360.shared_cache import SharedCache, cached_json_async
+from database360.probe_resources.catalog_index import CatalogIndex
+from database360.probe_resources.link_extractor import LinkExtractor
+from database360.probe_resources.matching import compile_link_pattern
+from database360.probe_resources.parse_pool import prepare_extractor_async
+from database360.probe_resources.probe_catalog import (
+    link_texts, match_database_link, match_purl_link_text, search_cache_key
+)
+from database360.probe_resources.probe_purl import (
+    DEFAULT_MAX_BYTES, TextMatcher, body_contains_text, forget_mismatched_target, purl_key, purl_probe_inputs
+)
+
+# Errors that make a single probe fail without aborting the run
+PROBE_ERRORS = (requests.RequestException, OSError, asyncio.TimeoutError)
+
+logger = logging.getLogger(__name__)
+
+
+async def probe_resource_async(catalog_search_url: str, resource: Dict, client: AsyncHttpClient,
+                               link_matcher: Optional[str] = None,
+                               link_extractor: Optional[LinkExtractor] = None,
+                               catalog_index: Optional[CatalogIndex] = None,
+                               single_flight: Optional[SingleFlight] = None,
+                               shared_cache: Optional[SharedCache] = None) -> Dict:
+    """Probe the catalog for a single resource.
+
+    Args:
+        catalog_search_url: Base URL for the catalog search
+        resource: Dictionary containing resource information including database name and PURL
+        client: Asynchronous HTTP client
+        link_matcher: Optional regex pattern to match catalog links. If not provided, returns first matching link.
+        link_extractor: Optional function yielding (href, text) pairs from a page
+        catalog_index: Optional index of the catalog's listing pages consulted before requesting
+        single_flight: Optional run-scoped map sharing searches and record pages between resources
+        shared_cache: Optional cache sharing the catalog links found and the record pages' links with other processes
+
+    Returns:
+        Dictionary containing probe results (catalog link and PURL link text if found)
+    """
+    database_name = resource.get('database_name')
+    purl = resource.get('purl')
+    results = {}
+
+    if not database_name:
+        return results
+
+    catalog_link = catalog_index.find_record(database_name) if catalog_index is not None else None
+    if catalog_link is None:
+        search_url = catalog_search_url + urllib.parse.quote(database_name)
+        logger.debug("Searching: %s", search_url)
+
+        link_pattern = compile_link_pattern(link_matcher)
+
+        def search():
+            return cached_json_async(
+                shared_cache, 'catalog_search', search_cache_key(search_url, link_matcher),
+                lambda: find_database_link_async(search_url, database_name, client, link_pattern, link_extractor)
+            )
+
+        if single_flight is None:
+            catalog_link = await search()
+        else:
+            catalog_link = await single_flight.do_async(('search', search_url, link_matcher), search)
+    if catalog_link:
+        results['catalog_url_link'] = catalog_link
+        if purl:
+            purl_link_text = None
+            if catalog_index is not None:
+                purl_link_text = catalog_index.find_purl_link_text(catalog_link, purl)
+            if purl_link_text is None and single_flight is None and shared_cache is None:
+                purl_link_text = await find_purl_link_text_async(catalog_link, purl, client, link_extractor)
+            elif purl_link_text is None:
+                def record():
+                    return cached_json_async(shared_cache, 'catalog_record', catalog_link,
+                                             lambda: fetch_link_texts_async(catalog_link, client, link_extractor))
+
+                if single_flight is None:
+                    texts = await record()
+                else:
+                    texts = await single_flight.do_async(('record', catalog_link), record)
+                purl_link_text = texts.get(purl) if texts else None
+            if purl_link_text:
+                results['purl_link_text'] = purl_link_text
+
+    return results
+
+
+async def find_database_link_async(search_url: str, database_name: str, client: AsyncHttpClient,
+                                   link_pattern: Optional[Pattern] = None,
+                                   link_extractor: Optional[LinkExtractor] = None) -> Optional[str]:
+    """Search the catalog page for a link matching the database name and pattern.
+
+    Args:
+        search_url: URL to search for the database
+        database_name: Name of the database to look for
+        client: Asynchronous HTTP client
+        link_pattern: Optional compiled regex pattern to match against links
+        link_extractor: Optional function yielding (href, text) pairs from a page
+
+    Returns:
+        URL of the catalog entry if found, None otherwise
+    """
+    try:
+        with phase('search_fetch'):
+            response = await client.get(search_url, use_cache=True)
+            response.raise_for_status()
+        with phase('search_parse'):
+            extractor = await prepare_extractor_async(response.text, link_extractor)
+            return match_database_link(response.text, search_url, database_name, link_pattern, extractor)
+    except PROBE_ERRORS as e:
+        logger.warning("Error searching for %s: %s", database_name, e)
+        return None
+
+
+async def find_purl_link_text_async(catalog_url: str, purl: str, client: AsyncHttpClient,
+                                    link_extractor: Optional[LinkExtractor] = None) -> Optional[str]:
+    """Find the link text for a PURL in a catalog page.
+
+    Args:
+        catalog_url: URL of the catalog page to search
+        purl: PURL to look for
+        client: Asynchronous HTTP client
+        link_extractor: Optional function yielding (href, text) pairs from a page
+
+    Returns:
+        Link text if found, None otherwise
+    """
+    try:
+        with phase('record_fetch'):
+            response = await client.get(catalog_url, use_cache=True)
+            response.raise_for_status()
+        with phase('record_parse'):
+            extractor = await prepare_extractor_async(response.text, link_extractor)
+            return match_purl_link_text(response.text, purl, extractor)
+    except PROBE_ERRORS as e:
+        logger.warning("Error finding PURL link text: %s", e)
+        return None
+
+
+async def fetch_link_texts_async(url: str, client: AsyncHttpClient,
+                                 link_extractor: Optional[LinkExtractor] = None) -> Optional[Dict[str, str]]:
+    """Asynchronous counterpart of probe_catalog.fetch_link_texts."""
+    try:
+        with phase('record_fetch'):
+            response = await client.get(url, use_cache=True)
+            response.raise_for_status()
+        with phase('record_parse'):
+            extractor = await prepare_extractor_async(response.text, link_extractor)
+            return link_texts(response.text, extractor)
+    except PROBE_ERRORS as e:
+        logger.warning("Error finding PURL link text: %s", e)
+        return None
+
+
+async def open_purl_async(purl: str, client: AsyncHttpClient, chunk_callback: ChunkCallback,
+                          redirect_cache: Optional[RedirectCache] = None, head_first: bool = False) -> AsyncResponse:
+    """Asynchronous counterpart of probe_purl.open_purl, streaming the landing page to chunk_callback."""
+    if redirect_cache is not None:
+        target = redirect_cache.resolve(purl)
+        if target is not None:
+            # Error bodies are not streamed, so the callback has seen nothing if the target fails
+            response = await client.get(target, allow_redirects=True, chunk_callback=chunk_callback)
+            if response.status_code < 400:
+                redirect_cache.record(response)
+                response.from_redirect_cache = True
+                return response
+            redirect_cache.invalidate(purl)
+
+    url = purl
+    if head_first:
+        head = await client.head(purl, allow_redirects=True)
+        if head.status_code < 400:
+            if redirect_cache is not None:
+                redirect_cache.record(head)
+            url = head.url
+
+    response = await client.get(url, allow_redirects=True, chunk_callback=chunk_callback)
+    if redirect_cache is not None and response.status_code < 400:
+        redirect_cache.record(response)
+    return response
+
+
+async def fetch_body_prefix_async(purl: str, client: AsyncHttpClient, max_bytes: int = DEFAULT_MAX_BYTES,
+                                  redirect_cache: Optional[RedirectCache] = None, head_first: bool = False,
+                                  expected_text: Optional[str] = None) -> Tuple[Optional[str], bytes]:
+    """Asynchronous counterpart of probe_purl.fetch_body_prefix."""
+    while True:
+        body = bytearray()
+
+        def collect(response, chunk: bytes) -> bool:
+            body.extend(chunk)
+            return len(body) >= max_bytes
+
+        response = await open_purl_async(purl, client, collect, redirect_cache, head_first)
+        response.raise_for_status()
+        prefix = bytes(body[:max_bytes])
+        if (not expected_text or redirect_cache is None or not getattr(response, 'from_redirect_cache', False)
+                or body_contains_text(prefix, expected_text, response.encoding, max_bytes)):
+            return response.encoding, prefix
+        forget_mismatched_target(purl, redirect_cache)
+
+
+async def probe_purl_async(resource: Dict, client: AsyncHttpClient, max_bytes: int = DEFAULT_MAX_BYTES,
+                           single_flight: Optional[SingleFlight] = None,
+                           redirect_cache: Optional[RedirectCache] = None, head_first: bool = False) -> Dict:
+    """Probe a PURL and check if it leads to a page containing specific text.
+
+    The landing page is searched while it streams in and the connection is
+    closed as soon as the text is found or max_bytes have been read.
+
+    Args:
+        resource: Dictionary containing resource information including 'purl' and
+                 'database_home_page_should_contain_text'
+        client: Asynchronous HTTP client
+        max_bytes: Maximum number of body bytes read while looking for the text
+        single_flight: Optional run-scoped map sharing the landing pages of PURLs declared with expect()
+        redirect_cache: Optional cache of redirect chains; see probe_purl.open_purl
+        head_first: Resolve the redirect chain with HEAD requests before fetching the landing page
+
+    Returns:
+        Dictionary containing probe results, with the same shape as probe_purl
+    """
+    results = {}
+
+    purl, expected_text = purl_probe_inputs(resource)
+    if not purl or not expected_text:
+        return results
+
+    key = purl_key(purl)
+    if single_flight is not None and single_flight.expected_uses(key) > 0:
+        try:
+            with phase('purl_fetch'):
+                encoding, body = await single_flight.do_async(
+                    key, lambda: fetch_body_prefix_async(purl, client, max_bytes, redirect_cache, head_first,
+                                                         expected_text))
+            results['purl_led_to_database'] = body_contains_text(body, expected_text, encoding, max_bytes)
+        except Exception as e:
+            logger.warning("Error checking PURL %s: %s", purl, e)
+            results = {}
+        return results
+
+    matchers = []
+
+    def feed(response, chunk: bytes) -> bool:
+        # The encoding is only known once the final response's headers have arrived
+        if not matchers:
+            matchers.append(TextMatcher(expected_text, response.encoding, max_bytes))
+        return matchers[0].feed(chunk)
+
+    try:
+        while True:
+            with phase('purl_fetch'):
+                response = await open_purl_async(purl, client, feed, redirect_cache, head_first)
+                response.raise_for_status()
+            matcher = matchers[0] if matchers else TextMatcher(expected_text, response.encoding, max_bytes)
+            found = matcher.found or matcher.finish()
+            if found or redirect_cache is None or not getattr(response, 'from_redirect_cache', False):
+                break
+            forget_mismatched_target(purl, redirect_cache)
+            matchers.clear()
+        results['purl_led_to_database'] = found
+    except Exception as e:
+        logger.warning("Error checking PURL %s: %s", purl, e)
+        results = {}
+
+    return results
@@ -0,0 +1,206 @@
+"""Index of catalog records built from bulk listing pages.
+
+Instead of one search per database, the catalog's database listing (for
+example a format facet such as ``/catalog?f[format][]=Database&per_page=100``)
+is crawled once. Every record link on the listing pages is indexed by its
+normalized title, along with the links (usually PURLs) shown next to it, so
+most catalog probes can be answered without a request.
+"""
+
+import logging
+import re
+import threading
+import urllib.parse
+from typing import Dict, Iterable, Optional, Pattern, Tuple
+import requests
+from database360.net.client import HttpClient, get_default_client
+from database360.probe_resources.link_extractor import LinkExtractor, get_link_extractor
+from database360.probe_resources.matching import NameMatcher, normalize_name, normalize_title
+
+logger = logging.getLogger(__name__)
+
+# Record links recognized on listing pages when no 'Valid Catalog Links Match' pattern is set
+DEFAULT_RECORD_LINK_PATTERN = re.compile(r'/catalog/[^/?#]+/?$')
+
+# Default maximum number of listing pages crawled
+DEFAULT_MAX_PAGES = 500
+
+# Text of the link to the next listing page (Blacklight renders "Next »")
+NEXT_PAGE_TEXT = re.compile(r'^\s*next\b', re.IGNORECASE)
+
+# Placeholder replaced by the page number in listing URLs that are paged explicitly
+PAGE_PLACEHOLDER = '{page}'
+
+
+def _as_written(title: str) -> str:
+    return ' '.join(title.casefold().split())
+
+
+class CatalogIndex:
+    """In-memory index from normalized record titles to record URLs and the links listed with them.
+
+    Lookups are thread-safe and counted so a run can report how many
+    catalog searches the index saved.
+    """
+
+    def __init__(self, link_pattern: Optional[Pattern] = None, link_extractor: Optional[LinkExtractor] = None):
+        """Initialize an empty index.
+
+        Args:
+            link_pattern: Optional compiled regex pattern identifying record links.
+                          Defaults to DEFAULT_RECORD_LINK_PATTERN.
+            link_extractor: Optional function yielding (href, text) pairs from a page
+        """
+        self.link_pattern = link_pattern or DEFAULT_RECORD_LINK_PATTERN
+        self.link_extractor = link_extractor or get_link_extractor()
+        self.pages = 0
+        self.hits = 0
+        self.misses = 0
+        self._records: Dict[str, str] = {}
+        self._titles: Dict[str, str] = {}
+        self._links: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add_page(self, html: str, page_url: str) -> Tuple[int, Optional[str]]:
+        """Index the records listed on one page.
+
+        Links following a record link, up to the next record link, are taken to
+        belong to that record and are kept by their raw href, as
+        match_purl_link_text compares them.
+
+        Args:
+            html: HTML of the listing page
+            page_url: URL of the page, used to resolve relative links
+
+        Returns:
+            Tuple of (number of new records, absolute URL of the next page or None)
+        """
+        added = 0
+        next_url = None
+        record_links = None
+        for href, text in self.link_extractor(html):
+            if not href:
+                continue
+            if NEXT_PAGE_TEXT.match(text):
+                next_url = next_url or urllib.parse.urljoin(page_url, href)
+                continue
+
+            title = normalize_title(text)
+            if title and self.link_pattern.search(href):
+                record_links = None
+                if title not in self._records:
+                    # The first record with a title wins, as with a search
+                    url = urllib.parse.urljoin(page_url, href)
+                    self._records[title] = url
+                    self._titles[title] = _as_written(text)
+                    record_links = self._links.setdefault(url, {})
+                    added += 1
+            elif record_links is not None:
+                record_links.setdefault(href, text.strip())
+        self.pages += 1
+        return added, next_url
+
+    def find_record(self, database_name: str) -> Optional[str]:
+        """Look up the record URL of a database.
+
+        Names that normalize_name rejects, such as 'C++', must equal the
+        listed title as written, ignoring case and spacing.
+
+        Args:
+            database_name: Name of the database
+
+        Returns:
+            Absolute URL of the catalog record, or None if the title is not indexed
+        """
+        title = normalize_title(database_name)
+        url = self._records.get(title)
+        if url is not None and not normalize_name(database_name) \
+                and self._titles.get(title) != _as_written(database_name):
+            url = None
+        with self._lock:
+            if url is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return url
+
+    def add_contained_names(self, names: Iterable[str]) -> int:
+        """Resolve names that are not an indexed title to the first title containing them.
+
+        Like a catalog search, which returns the first result whose title
+        contains the database name, a name is matched to the first listed
+        title containing it as whole words. All names are matched in one pass
+        over the titles, and the matches are added so find_record answers them.
+
+        Args:
+            names: Database names of the run
+
+        Returns:
+            Number of names added
+        """
+        missing = [name for name in names if name and normalize_title(name) not in self._records]
+        matcher = NameMatcher(missing, whole_words=True)
+        if not len(matcher):
+            return 0
+        found = matcher.match_links([(url, title) for title, url in self._records.items()])
+        for name, url in found.items():
+            self._records.setdefault(normalize_title(name), url)
+        return len(found)
+
+    def find_purl_link_text(self, record_url: str, purl: str) -> Optional[str]:
+        """Look up the text of a PURL link listed with a record.
+
+        Args:
+            record_url: URL of the catalog record
+            purl: PURL to look for
+
+        Returns:
+            Stripped link text, or None if the listing did not show the PURL with the record
+        """
+        return self._links.get(record_url, {}).get(purl)
+
+    @classmethod
+    def build(cls, listing_url: str, client: Optional[HttpClient] = None, link_pattern: Optional[Pattern] = None,
+              link_extractor: Optional[LinkExtractor] = None, max_pages: int = DEFAULT_MAX_PAGES) -> 'CatalogIndex':
+        """Crawl a catalog listing and index its records.
+
+        Listing URLs containing ``{page}`` are requested with page numbers 1, 2, ...
+        until a page adds no records. Otherwise the "Next" link of each page is followed.
+
+        Args:
+            listing_url: URL of the first listing page, or a template containing {page}
+            client: Optional HTTP client. Defaults to the shared client.
+            link_pattern: Optional compiled regex pattern identifying record links
+            link_extractor: Optional function yielding (href, text) pairs from a page
+            max_pages: Maximum number of pages crawled
+
+        Returns:
+            The index. Pages that fail to load end the crawl; what was indexed so far is kept.
+        """
+        index = cls(link_pattern, link_extractor)
+        client = client or get_default_client()
+        paged = PAGE_PLACEHOLDER in listing_url
+        url = listing_url.replace(PAGE_PLACEHOLDER, '1') if paged else listing_url
+        seen = set()
+        for page in range(1, max_pages + 1):
+            if url is None or url in seen:
+                break
+            seen.add(url)
+            logger.info("Indexing catalog listing: %s", url)
+            try:
+                response = client.get(url, use_cache=True)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                logger.warning("Error loading catalog listing %s: %s", url, e)
+                break
+
+            added, next_url = index.add_page(response.text, url)
+            if paged:
+                url = listing_url.replace(PAGE_PLACEHOLDER, str(page + 1)) if added else None
+            else:
+                url = next_url
+        logger.info("Indexed %d catalog records from %d listing pages", len(index), index.pages)
+        return index
@@ -0,0 +1,134 @@
+"""Extraction of (href, text) pairs from the anchors of an HTML page."""
+
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# An extractor takes a page's HTML and yields (href, text) for each <a> tag in document order
+LinkExtractor = Callable[[str], Iterator[Tuple[Optional[str], str]]]
+
+# Number of characters fed to the streaming parser at a time
+FEED_SIZE = 16 * 1024
+
+# Elements that never have an end tag
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+
+
+class _AnchorParser(HTMLParser):
+    """HTMLParser that records anchors without building a document tree."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # Anchors in start-tag order: [href, text parts, closed, element depth]
+        self._anchors: List[list] = []
+        self._open: List[list] = []
+        # Names of the currently open non-anchor elements
+        self._elements: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            anchor = [dict(attrs).get('href'), [], False, len(self._elements)]
+            self._anchors.append(anchor)
+            self._open.append(anchor)
+        elif tag not in VOID_ELEMENTS:
+            self._elements.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'a':
+            self._anchors.append([dict(attrs).get('href'), [], True, len(self._elements)])
+
+    def handle_endtag(self, tag):
+        if tag == 'a':
+            if self._open:
+                self._open.pop()[2] = True
+            return
+
+        # Closing an enclosing element implicitly closes anchors opened inside it
+        for depth in range(len(self._elements) - 1, -1, -1):
+            if self._elements[depth] == tag:
+                del self._elements[depth:]
+                while self._open and self._open[-1][3] > depth:
+                    self._open.pop()[2] = True
+                break
+
+    def handle_data(self, data):
+        # Text belongs to every enclosing anchor, as with BeautifulSoup's .text
+        for anchor in self._open:
+            anchor[1].append(data)
+
+    def pop_completed(self, flush: bool = False) -> List[Tuple[Optional[str], str]]:
+        """Remove and return the leading anchors whose end tag has been seen.
+
+        Args:
+            flush: Also return anchors that are still open (end of document)
+        """
+        completed = 0
+        while completed < len(self._anchors) and (flush or self._anchors[completed][2]):
+            completed += 1
+        links = [(anchor[0], ''.join(anchor[1])) for anchor in self._anchors[:completed]]
+        del self._anchors[:completed]
+        if flush:
+            self._open = []
+        return links
+
+
+def iter_links_htmlparser(html: str) -> Iterator[Tuple[Optional[str], str]]:
+    """Yield (href, text) for each anchor using a streaming html.parser.HTMLParser.
+
+    The page is fed in slices and anchors are yielded as soon as they are
+    closed, so a caller that stops iterating early skips parsing the rest of the page.
+
+    Args:
+        html: Page HTML
+
+    Yields:
+        Tuples of the anchor's href (None if missing) and its text content
+    """
+    parser = _AnchorParser()
+    for start in range(0, len(html), FEED_SIZE):
+        parser.feed(html[start:start + FEED_SIZE])
+        yield from parser.pop_completed()
+    parser.close()
+    yield from parser.pop_completed(flush=True)
+
+
+def iter_links_bs4(html: str) -> Iterator[Tuple[Optional[str], str]]:
+    """Yield (href, text) for each anchor using a full BeautifulSoup parse.
+
+    Args:
+        html: Page HTML
+
+    Yields:
+        Tuples of the anchor's href (None if missing) and its text content
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for link in soup.find_all('a'):
+        yield link.get('href'), link.text
+
+
+# Available extractors, selectable with the 'Link Extractor' institution setting
+LINK_EXTRACTORS: Dict[str, LinkExtractor] = {
+    'htmlparser': iter_links_htmlparser,
+    'bs4': iter_links_bs4,
+}
+
+DEFAULT_LINK_EXTRACTOR = 'htmlparser'
+
+
+def get_link_extractor(name: Optional[str] = None) -> LinkExtractor:
+    """Look up a link extractor by name.
+
+    Args:
+        name: Extractor name. Defaults to DEFAULT_LINK_EXTRACTOR.
+
+    Returns:
+        The extractor function
+    """
+    name = (name or DEFAULT_LINK_EXTRACTOR).strip().lower()
+    try:
+        return LINK_EXTRACTORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown link extractor '{name}', expected one of {sorted(LINK_EXTRACTORS)}")
@@ -0,0 +1,166 @@
+"""Title normalization and precompiled matchers for catalog links and database names."""
+
+import functools
+import re
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+# Characters removed from titles before they are compared
+PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a title for index lookups.
+
+    Unicode compatibility forms are folded, case is ignored, '&' is read as 'and'
+    and punctuation and runs of whitespace collapse to a single space.
+
+    Args:
+        title: Database name or link text
+
+    Returns:
+        Normalized title
+    """
+    title = unicodedata.normalize('NFKC', title).casefold().replace('&', ' and ')
+    return ' '.join(PUNCTUATION.sub(' ', title).split())
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a database name, unless normalizing would lose most of it.
+
+    Names made mostly of punctuation (such as 'C++' or 'C#') collapse to a few
+    letters that occur in countless unrelated titles, so they are only ever
+    compared as written.
+
+    Args:
+        name: Database name
+
+    Returns:
+        Normalized name, or an empty string if it kept no more than half of the name's characters
+    """
+    normalized = normalize_title(name)
+    written = ''.join(name.split())
+    if len(normalized.replace(' ', '')) * 2 <= len(written):
+        return ''
+    return normalized
+
+
+@functools.lru_cache(maxsize=64)
+def compile_link_pattern(link_matcher: Optional[str]) -> Optional[Pattern]:
+    """Compile a 'Valid Catalog Links Match' pattern once per process.
+
+    Args:
+        link_matcher: Regular expression matched against link hrefs, or None
+
+    Returns:
+        Compiled pattern, or None if no pattern is set
+    """
+    return re.compile(link_matcher) if link_matcher else None
+
+
+class NameMatcher:
+    """Aho-Corasick automaton finding which of many database names a text contains.
+
+    Names are compared after normalize_name and texts after normalize_title.
+    Scanning a text costs time proportional to its length plus the number of
+    names found, however many names the automaton holds, so matching N names
+    against M links is a single pass over the links instead of an N x M scan.
+    """
+
+    def __init__(self, names: Iterable[str], whole_words: bool = False):
+        """Build the automaton.
+
+        Args:
+            names: Database names; duplicates and names that normalize_name reduces to an empty string are ignored
+            whole_words: Only match names at word boundaries of the text
+        """
+        self.names: List[str] = []
+        self.whole_words = whole_words
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for name in dict.fromkeys(names):
+            key = normalize_name(name)
+            if not key:
+                continue
+            node = 0
+            for char in self._pad(key):
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            self._out[node].append(len(self.names))
+            self.names.append(name)
+        self._link_failures()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _pad(self, normalized: str) -> str:
+        # Normalized titles are single-space separated words, so padding marks word boundaries
+        return f' {normalized} ' if self.whole_words else normalized
+
+    def _link_failures(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                # Children of the root fall back to the root itself
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> List[str]:
+        """Return the names contained in a text, in the order they end in it.
+
+        Args:
+            text: Text to scan, such as a link text; it is normalized first
+
+        Returns:
+            Matching names, each at most once
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        found = []
+        seen = set()
+        node = 0
+        for char in self._pad(normalize_title(text)):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                if index not in seen:
+                    seen.add(index)
+                    found.append(self.names[index])
+        return found
+
+    def match_links(self, links: Iterable[Tuple[Optional[str], str]],
+                    link_pattern: Optional[Pattern] = None) -> Dict[str, str]:
+        """Find, for every name, the first link whose text contains it.
+
+        Args:
+            links: (href, text) pairs in page order, as yielded by a link extractor
+            link_pattern: Optional compiled pattern the href must match
+
+        Returns:
+            Dictionary mapping each matched name to the raw href of its first link
+        """
+        matches = {}
+        for href, text in links:
+            if len(matches) == len(self.names):
+                break
+            if not href:
+                continue
+            if link_pattern is not None and not link_pattern.search(href):
+                continue
+            for name in self.find(text):
+                matches.setdefault(name, href)
+        return matches
@@ -0,0 +1,176 @@
+"""Link extraction in worker processes, decoupled from the threads and tasks fetching pages.
+
+A ParsePool is a LinkExtractor: the probes hand it a page's HTML as they
+would any extractor, and it parses the page in a ProcessPoolExecutor and
+returns the compact list of (href, text) pairs. Matching the links against
+the resource stays with the caller. A bounded number of pages may wait for a
+worker; fetchers block when it is reached, so a burst of large pages cannot
+pile up in memory while the parsers catch up.
+
+Used as an extractor, the pool is synchronous: the fetching thread waits for
+its page's links, because it needs them to finish the probe. submit returns
+a future instead, for callers that can collect the links later.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from database360.config.settings import get_setting
+from database360.probe_resources.link_extractor import LinkExtractor, get_link_extractor
+
+# Pages that may wait for a parse worker, per worker, when 'Parse Queue Size' is not set
+DEFAULT_QUEUE_PER_WORKER = 2
+
+
+def extract_links(html: str, link_extractor: LinkExtractor) -> List[Tuple[Optional[str], str]]:
+    """Run a link extractor over a whole page; executed in the worker processes.
+
+    Args:
+        html: Page HTML
+        link_extractor: Module-level extractor function, pickled by reference
+
+    Returns:
+        (href, text) pairs in document order
+    """
+    return list(link_extractor(html))
+
+
+class ParsePool:
+    """Process pool extracting links from catalog pages on every core."""
+
+    def __init__(self, workers: int, link_extractor: Optional[LinkExtractor] = None,
+                 queue_size: Optional[int] = None):
+        """Initialize the pool; the worker processes start with the first page.
+
+        Args:
+            workers: Number of worker processes
+            link_extractor: Module-level extractor run in the workers. Defaults to the streaming html.parser extractor.
+            queue_size: Maximum number of pages submitted and not yet parsed.
+                        Defaults to DEFAULT_QUEUE_PER_WORKER pages per worker.
+        """
+        self.workers = max(1, workers)
+        self.link_extractor = link_extractor or get_link_extractor()
+        self.queue_size = max(1, queue_size or DEFAULT_QUEUE_PER_WORKER * self.workers)
+        self.pages = 0
+        self.queue_wait = 0.0
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, institution_config: Dict,
+                    link_extractor: Optional[LinkExtractor] = None) -> Optional['ParsePool']:
+        """Create a parse pool from institution settings.
+
+        Args:
+            institution_config: Dictionary containing institution configuration
+            link_extractor: Extractor run in the workers
+
+        Returns:
+            ParsePool, or None if 'Parse Workers' is not set or 0, in which case pages
+            are parsed by the thread or task that fetched them
+        """
+        workers = get_setting(institution_config, 'parse_workers', 0, int)
+        if workers <= 0:
+            return None
+        return cls(workers, link_extractor,
+                   queue_size=get_setting(institution_config, 'parse_queue_size', None, int))
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a process that runs fetch threads can copy a held lock into the child
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def submit(self, html: str) -> Future:
+        """Queue a page for a worker process, waiting only for a queue slot.
+
+        The slot is released as soon as the page is parsed, whether or not
+        anyone has collected the result yet, so callers that keep the future
+        and move on do not hold up other fetchers.
+
+        Args:
+            html: Page HTML
+
+        Returns:
+            Future resolving to the (href, text) pairs in document order
+        """
+        started = time.perf_counter()
+        self._slots.acquire()
+        waited = time.perf_counter() - started
+        try:
+            future = self._pool().submit(extract_links, html, self.link_extractor)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self.pages += 1
+            self.queue_wait += waited
+        return future
+
+    def extract(self, html: str) -> List[Tuple[Optional[str], str]]:
+        """Parse a page in a worker process and wait for its links.
+
+        This is synchronous: a thread probing a resource needs the page's
+        links before it can match them, so it waits here for the result the
+        same as it would wait for an in-thread parse. The parse still runs on
+        another core, off the GIL. Callers that have other work to do should
+        use submit and collect the future later.
+
+        Args:
+            html: Page HTML
+
+        Returns:
+            (href, text) pairs in document order
+        """
+        return self.submit(html).result()
+
+    async def extract_async(self, html: str) -> List[Tuple[Optional[str], str]]:
+        """Counterpart of extract for the asyncio backend, keeping the event loop free while waiting.
+
+        Only the wait for a queue slot runs in a thread; the parse itself is
+        awaited without holding one.
+        """
+        future = await asyncio.get_running_loop().run_in_executor(None, self.submit, html)
+        return await asyncio.wrap_future(future)
+
+    def __call__(self, html: str) -> Iterator[Tuple[Optional[str], str]]:
+        return iter(self.extract(html))
+
+    def stats(self) -> Dict:
+        """Return the pages parsed and the seconds fetchers waited for a queue slot."""
+        with self._lock:
+            return {'workers': self.workers, 'pages': self.pages, 'queue_wait': round(self.queue_wait, 6)}
+
+    def close(self):
+        """Stop the worker processes; the next page starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+async def prepare_extractor_async(html: str, link_extractor: Optional[LinkExtractor]) -> Optional[LinkExtractor]:
+    """Parse a page ahead of matching when the extractor is a ParsePool.
+
+    The async probes match links on the event loop, where waiting for a worker
+    process would block every other probe. The page is parsed here instead and
+    the returned extractor replays its links.
+
+    Args:
+        html: Page HTML
+        link_extractor: Extractor the probe was given
+
+    Returns:
+        An extractor yielding the parsed links, or link_extractor itself if it is not a ParsePool
+    """
+    if not isinstance(link_extractor, ParsePool):
+        return link_extractor
+    links = await link_extractor.extract_async(html)
+    return lambda page: iter(links)
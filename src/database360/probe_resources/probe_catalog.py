@@ -1,27 +1,40 @@
 """Functions for probing the catalog."""
 
+import logging
 import urllib.parse
-import time
-import re
-from typing import Dict, List, Optional, Tuple, Pattern
+from typing import Dict, Optional, Pattern
 import requests
-from bs4 import BeautifulSoup
-
-# Constants for rate limiting
-DELAY_BETWEEN_REQUESTS = 2  # seconds between requests
-
-# Headers for requests
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
-}
-
-def probe_resource(catalog_search_url: str, resource: Dict, link_matcher: Optional[str] = None) -> Dict:
+from database360.instrumentation import phase
+from database360.net.client import HttpClient, get_default_client
+from database360.net.single_flight import SingleFlight
+from database360.probe_resources.catalog_index import CatalogIndex
+from database360.probe_resources.link_extractor import LinkExtractor, get_link_extractor
+from database360.probe_resources.matching import compile_link_pattern, normalize_name, normalize_title
+from database360.shared_cache import SharedCache, cached_json
+
+logger = logging.getLogger(__name__)
+
+def probe_resource(catalog_search_url: str, resource: Dict, link_matcher: Optional[str] = None,
+                   client: Optional[HttpClient] = None, link_extractor: Optional[LinkExtractor] = None,
+                   catalog_index: Optional[CatalogIndex] = None,
+                   single_flight: Optional[SingleFlight] = None,
+                   shared_cache: Optional[SharedCache] = None) -> Dict:
     """Probe the catalog for a single resource.
 
     Args:
         catalog_search_url: Base URL for the catalog search
         resource: Dictionary containing resource information including database name and PURL
         link_matcher: Optional regex pattern to match catalog links. If not provided, returns first matching link.
+        client: Optional HTTP client. Defaults to a shared client allowing one request
+                every net.client.DELAY_BETWEEN_REQUESTS seconds per host.
+        link_extractor: Optional function yielding (href, text) pairs from a page.
+                        Defaults to the streaming html.parser extractor.
+        catalog_index: Optional index of the catalog's listing pages consulted before
+                       searching the catalog and fetching the record page
+        single_flight: Optional run-scoped map sharing searches and record pages between
+                       resources with the same name or catalog record
+        shared_cache: Optional cache sharing the catalog links found and the record pages'
+                      links with other processes
 
     Returns:
         Dictionary containing probe results (catalog link and PURL link text if found)
@@ -33,72 +46,189 @@ def probe_resource(catalog_search_url: str, resource: Dict, link_matcher: Option
     if not database_name:
         return results
 
-    search_url = catalog_search_url + urllib.parse.quote(database_name)
-    print(f"Searching: {search_url}")
+    if client is None:
+        client = get_default_client()
+
+    catalog_link = catalog_index.find_record(database_name) if catalog_index is not None else None
+    if catalog_link is None:
+        search_url = catalog_search_url + urllib.parse.quote(database_name)
+        logger.debug("Searching: %s", search_url)
+
+        # The pattern is compiled once per process, not once per resource
+        link_pattern = compile_link_pattern(link_matcher)
 
-    # Compile the regex pattern if provided
-    link_pattern = re.compile(link_matcher) if link_matcher else None
+        def search():
+            return cached_json(shared_cache, 'catalog_search', search_cache_key(search_url, link_matcher),
+                               lambda: find_database_link(search_url, database_name, link_pattern, client=client,
+                                                          link_extractor=link_extractor))
 
-    catalog_link = find_database_link(search_url, database_name, link_pattern)
+        if single_flight is None:
+            catalog_link = search()
+        else:
+            catalog_link = single_flight.do(('search', search_url, link_matcher), search)
     if catalog_link:
         results['catalog_url_link'] = catalog_link
         if purl:
-            purl_link_text = find_purl_link_text(catalog_link, purl)
+            purl_link_text = None
+            if catalog_index is not None:
+                purl_link_text = catalog_index.find_purl_link_text(catalog_link, purl)
+            if purl_link_text is None and single_flight is None and shared_cache is None:
+                purl_link_text = find_purl_link_text(catalog_link, purl, client=client,
+                                                     link_extractor=link_extractor)
+            elif purl_link_text is None:
+                # Keep every link of the record page so resources sharing the record share the fetch
+                def record():
+                    return cached_json(shared_cache, 'catalog_record', catalog_link,
+                                       lambda: fetch_link_texts(catalog_link, client, link_extractor))
+
+                link_texts = record() if single_flight is None else single_flight.do(('record', catalog_link), record)
+                purl_link_text = link_texts.get(purl) if link_texts else None
             if purl_link_text:
                 results['purl_link_text'] = purl_link_text
 
-    time.sleep(DELAY_BETWEEN_REQUESTS)
     return results
 
-def find_database_link(search_url: str, database_name: str, link_pattern: Optional[Pattern] = None) -> Optional[str]:
+def search_cache_key(search_url: str, link_matcher: Optional[str]) -> str:
+    """Key of a search's catalog link in the shared cache; the link depends on the pattern too."""
+    return f"{search_url}\n{link_matcher or ''}"
+
+def find_database_link(search_url: str, database_name: str, link_pattern: Optional[Pattern] = None,
+                       client: Optional[HttpClient] = None,
+                       link_extractor: Optional[LinkExtractor] = None) -> Optional[str]:
     """Search the catalog page for a link matching the database name and pattern.
 
     Args:
         search_url: URL to search for the database
         database_name: Name of the database to look for
         link_pattern: Optional compiled regex pattern to match against links. If not provided, returns first matching link.
+        client: Optional HTTP client. Defaults to the shared client.
+        link_extractor: Optional function yielding (href, text) pairs from a page
 
     Returns:
         URL of the catalog entry if found, None otherwise
     """
     try:
-        response = requests.get(search_url, headers=HEADERS)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'html.parser')
+        with phase('search_fetch'):
+            response = (client or get_default_client()).get(search_url, use_cache=True)
+            response.raise_for_status()
 
-        for link in soup.find_all('a'):
-            href = link.get('href')
-            if href and database_name.lower() in link.text.lower():
-                # If we have a pattern, check if the href matches
-                if link_pattern is None or link_pattern.search(href):
-                    # Get the absolute URL
-                    print(f"Found link: {href}")
-                    return urllib.parse.urljoin(search_url, href)
+        with phase('search_parse'):
+            return match_database_link(response.text, search_url, database_name, link_pattern, link_extractor)
 
     except requests.RequestException as e:
-        print(f"Error searching for {database_name}: {e}")
+        logger.warning("Error searching for %s: %s", database_name, e)
         return None
 
-def find_purl_link_text(catalog_url: str, purl: str) -> Optional[str]:
+def match_database_link(html: str, search_url: str, database_name: str, link_pattern: Optional[Pattern] = None,
+                        link_extractor: Optional[LinkExtractor] = None) -> Optional[str]:
+    """Find the first link on a search results page matching the database name and pattern.
+
+    The link text must contain the name as written, ignoring case. Failing
+    that, it may contain the name once both are normalized, unless the name is
+    mostly punctuation and normalize_name rejects it.
+
+    Args:
+        html: HTML of the search results page
+        search_url: URL of the page, used to resolve relative links
+        database_name: Name of the database to look for
+        link_pattern: Optional compiled regex pattern to match against links
+        link_extractor: Optional function yielding (href, text) pairs from a page
+
+    Returns:
+        Absolute URL of the catalog entry if found, None otherwise
+    """
+    written = database_name.casefold().strip()
+    if not written:
+        return None
+    name = normalize_name(database_name)
+    for href, text in (link_extractor or get_link_extractor())(html):
+        if href and (written in text.casefold() or (name and name in normalize_title(text))):
+            # If we have a pattern, check if the href matches
+            if link_pattern is None or link_pattern.search(href):
+                # Get the absolute URL
+                logger.debug("Found link: %s", href)
+                return urllib.parse.urljoin(search_url, href)
+    return None
+
+def find_purl_link_text(catalog_url: str, purl: str, client: Optional[HttpClient] = None,
+                        link_extractor: Optional[LinkExtractor] = None) -> Optional[str]:
     """Find the link text for a PURL in a catalog page.
 
     Args:
         catalog_url: URL of the catalog page to search
         purl: PURL to look for
+        client: Optional HTTP client. Defaults to the shared client.
+        link_extractor: Optional function yielding (href, text) pairs from a page
 
     Returns:
         Link text if found, None otherwise
     """
     try:
-        response = requests.get(catalog_url, headers=HEADERS)
-        response.raise_for_status()
+        with phase('record_fetch'):
+            response = (client or get_default_client()).get(catalog_url, use_cache=True)
+            response.raise_for_status()
+
+        with phase('record_parse'):
+            return match_purl_link_text(response.text, purl, link_extractor)
+
+    except requests.RequestException as e:
+        logger.warning("Error finding PURL link text: %s", e)
+        return None
+
+def fetch_link_texts(url: str, client: Optional[HttpClient] = None,
+                     link_extractor: Optional[LinkExtractor] = None) -> Optional[Dict[str, str]]:
+    """Fetch a catalog page and collect the text of its links.
+
+    Args:
+        url: URL of the catalog page
+        client: Optional HTTP client. Defaults to the shared client.
+        link_extractor: Optional function yielding (href, text) pairs from a page
+
+    Returns:
+        Dictionary mapping each href to the stripped text of its first link, or None if the page failed to load
+    """
+    try:
+        with phase('record_fetch'):
+            response = (client or get_default_client()).get(url, use_cache=True)
+            response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        for link in soup.find_all('a'):
-            if link.get('href') == purl:
-                return link.text.strip()
+        with phase('record_parse'):
+            return link_texts(response.text, link_extractor)
 
     except requests.RequestException as e:
-        print(f"Error finding PURL link text: {e}")
+        logger.warning("Error finding PURL link text: %s", e)
         return None
+
+def link_texts(html: str, link_extractor: Optional[LinkExtractor] = None) -> Dict[str, str]:
+    """Map each href on a page to the stripped text of its first link.
+
+    Looking up a PURL in the result gives the same answer as match_purl_link_text.
+
+    Args:
+        html: HTML of the page
+        link_extractor: Optional function yielding (href, text) pairs from a page
+
+    Returns:
+        Dictionary mapping hrefs to link texts
+    """
+    texts = {}
+    for href, text in (link_extractor or get_link_extractor())(html):
+        if href is not None and href not in texts:
+            texts[href] = text.strip()
+    return texts
+
+def match_purl_link_text(html: str, purl: str, link_extractor: Optional[LinkExtractor] = None) -> Optional[str]:
+    """Find the text of the first link to a PURL on a catalog record page.
+
+    Args:
+        html: HTML of the catalog record page
+        purl: PURL to look for
+        link_extractor: Optional function yielding (href, text) pairs from a page
+
+    Returns:
+        Stripped link text if found, None otherwise
+    """
+    for href, text in (link_extractor or get_link_extractor())(html):
+        if href == purl:
+            return text.strip()
+    return None
@@ -1,15 +1,37 @@
 """Functions for probing PURLs and checking their content."""
 
+import codecs
+import logging
 import requests
-from typing import Dict
-import math
+from typing import Dict, Optional, Tuple
+from database360 import instrumentation
+from database360.config.records import Resource, clean_text
+from database360.net.client import HttpClient, get_default_client
+from database360.net.redirect_cache import RedirectCache
+from database360.net.single_flight import SingleFlight
 
-def probe_purl(resource: Dict) -> Dict:
+# Stop reading a landing page after this many bytes
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+# Size of the chunks read from the response stream
+CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+def probe_purl(resource: Dict, client: Optional[HttpClient] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+               single_flight: Optional[SingleFlight] = None, redirect_cache: Optional[RedirectCache] = None,
+               head_first: bool = False) -> Dict:
     """Probe a PURL and check if it leads to a page containing specific text.
 
     Args:
         resource: Dictionary containing resource information including 'purl' and
                  'database_home_page_should_contain_text'
+        client: Optional HTTP client. Defaults to the shared client.
+        max_bytes: Maximum number of body bytes read while looking for the text
+        single_flight: Optional run-scoped map. PURLs declared with single_flight.expect(purl_key(purl), uses)
+                       are fetched once and their first max_bytes kept for the other resources using them.
+        redirect_cache: Optional cache of redirect chains; see open_purl
+        head_first: Resolve the redirect chain with HEAD requests before fetching the landing page
 
     Returns:
         Dictionary containing probe results. Will contain 'purl_led_to_database' key
@@ -18,41 +40,267 @@ def probe_purl(resource: Dict) -> Dict:
     """
     results = {}
 
-    # Handle NaN values from pandas DataFrame
-    purl = resource.get('purl', '')
-    expected_text = resource.get('database_home_page_should_contain_text', '')
-
-    # Convert NaN to empty string
-    if isinstance(purl, float) and math.isnan(purl):
-        purl = ''
-    if isinstance(expected_text, float) and math.isnan(expected_text):
-        expected_text = ''
-
-    # Strip strings
-    purl = str(purl).strip()
-    expected_text = str(expected_text).strip()
-
+    purl, expected_text = purl_probe_inputs(resource)
     if not purl or not expected_text:
         return results
 
-    try:
-        # Use a session to handle redirects
-        session = requests.Session()
+    if client is None:
+        client = get_default_client()
 
-        # Set headers to mimic a browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
-        }
+    key = purl_key(purl)
+    try:
+        with instrumentation.phase('purl_fetch'):
+            if single_flight is not None and single_flight.expected_uses(key) > 0:
+                encoding, body = single_flight.do(key, lambda: fetch_body_prefix(
+                    purl, client, max_bytes, redirect_cache=redirect_cache, head_first=head_first,
+                    expected_text=expected_text))
+                results['purl_led_to_database'] = body_contains_text(body, expected_text, encoding, max_bytes)
+                return results
 
-        # Make the request and follow redirects
-        response = session.get(purl, headers=headers, allow_redirects=True, timeout=30)
-        response.raise_for_status()
+            while True:
+                # Make the request and follow redirects, without downloading the body yet
+                response = open_purl(purl, client, redirect_cache, head_first)
+                try:
+                    response.raise_for_status()
 
-        # Check if the expected text is in the page content
-        results['purl_led_to_database'] = expected_text.lower() in response.text.lower()
+                    # Check if the expected text is in the page content
+                    found = stream_contains_text(response, expected_text, max_bytes)
+                finally:
+                    # Release the connection even if the body was not read to the end
+                    response.close()
+                if found or redirect_cache is None or not getattr(response, 'from_redirect_cache', False):
+                    break
+                forget_mismatched_target(purl, redirect_cache)
+            results['purl_led_to_database'] = found
 
     except (requests.RequestException, Exception) as e:
-        print(f"Error checking PURL {purl}: {str(e)}")
+        logger.warning("Error checking PURL %s: %s", purl, e)
         results = {}
 
     return results
+
+def purl_key(purl: str) -> Tuple[str, str]:
+    """Return the SingleFlight key under which the landing page of a PURL is shared."""
+    return ('purl', purl)
+
+def forget_mismatched_target(purl: str, redirect_cache: RedirectCache):
+    """Forget the cached target of a PURL whose page lacks the expected text, so its chain is followed again.
+
+    The target may have become a proxy login page, or the vendor may have moved the database.
+    """
+    logger.info("Cached target of %s lacks the expected text; following its redirects again", purl)
+    redirect_cache.invalidate(purl)
+
+def open_purl(purl: str, client: HttpClient, redirect_cache: Optional[RedirectCache] = None,
+              head_first: bool = False) -> requests.Response:
+    """Request the landing page of a PURL with a streamed body.
+
+    With a redirect cache, a PURL whose chain was recorded before is requested
+    at its last known target, skipping the resolver and proxy hops, and the
+    response is marked with a true ``from_redirect_cache`` attribute. The chain
+    is followed again from the PURL when one of its hops expired or the target
+    answers with an error; callers also drop the target with
+    forget_mismatched_target when its page lacks the expected text. With head_first, the chain is followed with HEAD
+    requests, so the bodies of the intermediate responses are never downloaded,
+    and only the landing page is fetched with GET; servers rejecting HEAD are
+    followed with GET as usual.
+
+    Args:
+        purl: PURL to request
+        client: HTTP client
+        redirect_cache: Optional cache of redirect chains, updated with the chains followed
+        head_first: Resolve the redirect chain with HEAD requests first
+
+    Returns:
+        The streamed response of the landing page; the caller must close it
+    """
+    if redirect_cache is not None:
+        target = redirect_cache.resolve(purl)
+        if target is not None:
+            response = client.get(target, allow_redirects=True, stream=True)
+            if response.status_code < 400:
+                # The target may have moved on; record where it leads now
+                redirect_cache.record(response)
+                response.from_redirect_cache = True
+                return response
+            response.close()
+            redirect_cache.invalidate(purl)
+
+    url = purl
+    if head_first:
+        head = client.head(purl, allow_redirects=True)
+        head.close()
+        if head.status_code < 400:
+            if redirect_cache is not None:
+                redirect_cache.record(head)
+            url = head.url
+
+    response = client.get(url, allow_redirects=True, stream=True)
+    if redirect_cache is not None and response.status_code < 400:
+        redirect_cache.record(response)
+    return response
+
+def fetch_body_prefix(purl: str, client: HttpClient, max_bytes: int = DEFAULT_MAX_BYTES,
+                      chunk_size: int = CHUNK_SIZE, redirect_cache: Optional[RedirectCache] = None,
+                      head_first: bool = False, expected_text: Optional[str] = None) -> Tuple[Optional[str], bytes]:
+    """Follow a PURL and read the start of its landing page.
+
+    Args:
+        purl: PURL to request
+        client: HTTP client
+        max_bytes: Maximum number of body bytes read
+        chunk_size: Number of bytes read per chunk
+        redirect_cache: Optional cache of redirect chains; see open_purl
+        head_first: Resolve the redirect chain with HEAD requests first
+        expected_text: Optional text the landing page should contain. A cached target
+                       whose page lacks it is forgotten and the chain followed again.
+
+    Returns:
+        Tuple of (response encoding, first max_bytes of the body)
+
+    Raises:
+        requests.RequestException: If the request fails or returns an error status
+    """
+    while True:
+        response = open_purl(purl, client, redirect_cache, head_first)
+        try:
+            response.raise_for_status()
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                body += chunk
+                if len(body) >= max_bytes:
+                    break
+            instrumentation.record_bytes(len(body))
+            encoding, body = response.encoding, bytes(body[:max_bytes])
+        finally:
+            response.close()
+        if (not expected_text or redirect_cache is None or not getattr(response, 'from_redirect_cache', False)
+                or body_contains_text(body, expected_text, encoding, max_bytes)):
+            return encoding, body
+        forget_mismatched_target(purl, redirect_cache)
+
+def body_contains_text(body: bytes, text: str, encoding: Optional[str] = None,
+                       max_bytes: int = DEFAULT_MAX_BYTES) -> bool:
+    """Check case-insensitively whether a body read by fetch_body_prefix contains some text.
+
+    Args:
+        body: Body bytes
+        text: Text to look for
+        encoding: Body encoding. Defaults to UTF-8.
+        max_bytes: Maximum number of body bytes to search
+
+    Returns:
+        True if the text was found within the first max_bytes of the body
+    """
+    matcher = TextMatcher(text, encoding, max_bytes)
+    matcher.feed(body)
+    return matcher.found or matcher.finish()
+
+def purl_probe_inputs(resource: Dict) -> Tuple[str, str]:
+    """Return the stripped PURL and expected text of a resource.
+
+    Args:
+        resource: Resource loaded from the Resources sheet, or a dictionary with the same keys
+
+    Returns:
+        Tuple of (purl, expected_text); missing, empty and NaN values become empty strings
+    """
+    # Loaded resources are normalized once by the loader
+    if isinstance(resource, Resource):
+        return resource.purl or '', resource.database_home_page_should_contain_text or ''
+
+    purl = clean_text(resource.get('purl'))
+    expected_text = clean_text(resource.get('database_home_page_should_contain_text'))
+    return purl or '', expected_text or ''
+
+class TextMatcher:
+    """Incremental case-insensitive search for a text in a stream of body bytes.
+
+    The body is decoded incrementally and searched chunk by chunk; the tail of
+    each chunk is carried over so matches spanning a chunk boundary are found.
+    """
+
+    def __init__(self, text: str, encoding: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Initialize the matcher.
+
+        Args:
+            text: Text to look for
+            encoding: Body encoding. Defaults to UTF-8.
+            max_bytes: Maximum number of body bytes to search
+        """
+        self.needle = text.lower()
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.found = not self.needle
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._overlap = len(self.needle) - 1
+        self._tail = ''
+
+    @property
+    def done(self) -> bool:
+        """True once the text was found or max_bytes have been searched."""
+        return self.found or self.bytes_read >= self.max_bytes
+
+    def feed(self, chunk: bytes) -> bool:
+        """Search the next chunk of the body.
+
+        Args:
+            chunk: Raw body bytes
+
+        Returns:
+            True if no more data needs to be read (see done)
+        """
+        if self.done or not chunk:
+            return self.done
+        if self.bytes_read + len(chunk) > self.max_bytes:
+            chunk = chunk[:self.max_bytes - self.bytes_read]
+        self.bytes_read += len(chunk)
+        self._search(self._decoder.decode(chunk))
+        return self.done
+
+    def finish(self) -> bool:
+        """Flush the decoder at the end of the body.
+
+        Returns:
+            True if the text was found
+        """
+        if not self.found:
+            self._search(self._decoder.decode(b'', final=True))
+        return self.found
+
+    def _search(self, decoded: str):
+        window = self._tail + decoded.lower()
+        if self.needle in window:
+            self.found = True
+        self._tail = window[-self._overlap:] if self._overlap else ''
+
+
+def stream_contains_text(response: requests.Response, text: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                         chunk_size: int = CHUNK_SIZE) -> bool:
+    """Check case-insensitively whether a streamed response body contains some text.
+
+    Reading stops as soon as the text is found or max_bytes have been read.
+
+    Args:
+        response: Response opened with stream=True
+        text: Text to look for
+        max_bytes: Maximum number of body bytes to read
+        chunk_size: Number of bytes read per chunk
+
+    Returns:
+        True if the text was found within the first max_bytes of the body
+    """
+    matcher = TextMatcher(text, response.encoding, max_bytes)
+    if matcher.done:
+        return matcher.found
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if matcher.feed(chunk):
+                return matcher.found
+        return matcher.finish()
+    finally:
+        instrumentation.record_bytes(matcher.bytes_read)
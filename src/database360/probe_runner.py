@@ -1,54 +1,629 @@
 """Main module for Database 360."""
 
-from typing import Dict, List
-from database360.config.loader import ConfigurationLoader
+import asyncio
+import logging
+from collections import Counter, deque
+from collections.abc import Collection
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from database360.checkpoint import Checkpoint
+from database360.config.settings import PROBE_BACKENDS, get_setting
+from database360.instrumentation import ProbeHook, ProbeMetrics, RunSummary, log_summary
+from database360.net.async_client import AsyncHttpClient
+from database360.net.client import HttpClient, DELAY_BETWEEN_REQUESTS
+from database360.net.rate_limiter import AdaptiveHostRateLimiter, HostRateLimiter
+from database360.net.redirect_cache import RedirectCache
+from database360.net.single_flight import SingleFlight
+from database360.probe_resources.async_probes import probe_resource_async, probe_purl_async
+from database360.probe_resources.catalog_index import CatalogIndex, DEFAULT_MAX_PAGES
+from database360.probe_resources.link_extractor import get_link_extractor
+from database360.probe_resources.matching import compile_link_pattern
+from database360.probe_resources.parse_pool import ParsePool
 from database360.probe_resources.probe_catalog import probe_resource
-from database360.probe_resources.probe_purl import probe_purl
+from database360.probe_resources.probe_purl import probe_purl, purl_key, purl_probe_inputs, DEFAULT_MAX_BYTES
+from database360.result_sinks import ResultSink
+from database360.result_store import ResultStore, institution_fingerprint, resource_fingerprint
+from database360.scheduler import ProbeScheduler
+from database360.shared_cache import SharedCache
+
+# Default maximum age of a stored result that may be reused by an incremental run
+DEFAULT_MAX_RESULT_AGE_HOURS = 24
+
+# Resources taken from the input per worker thread when 'Resource Window' is not set; the
+# asyncio backend takes as many as the requests it may keep in flight
+DEFAULT_WINDOW_PER_WORKER = 2
+
+logger = logging.getLogger(__name__)
+
+
+def _of(total: Optional[int]):
+    """Total shown in progress messages, '?' while a streamed input is still being read."""
+    return '?' if total is None else total
 
 class ProbeRunner:
     """Manages and executes various probes on resources."""
 
-    def __init__(self, institution_config: Dict[str, str]):
+    def __init__(self, institution_config: Dict[str, str], max_workers: Optional[int] = None,
+                 result_store: Optional[ResultStore] = None, checkpoint: Optional[Checkpoint] = None,
+                 hooks: Optional[List[ProbeHook]] = None, client: Optional[HttpClient] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None, shared_cache: Optional[SharedCache] = None):
         """Initialize the ProbeRunner.
 
         Args:
             institution_config: Dictionary containing institution configuration
+            max_workers: Number of resources probed concurrently. Defaults to the
+                         'Max Workers' institution setting, or 1 (sequential) if unset.
+            result_store: Optional store of previous results. When given, resources whose inputs
+                          are unchanged and whose stored result is younger than the
+                          'Max Result Age Hours' setting are not probed again.
+            checkpoint: Optional checkpoint recording each completed result so that an
+                        interrupted run can be resumed
+            hooks: Optional hooks notified of each result and of the run summary
+            client: Optional HTTP client shared with other runners, such as those of a batch.
+                    Defaults to a client built from the institution settings.
+            rate_limiter: Optional per-host rate limiter shared with other runners.
+                          Defaults to one built from the institution settings.
+            shared_cache: Optional cache shared with other processes on the host. Defaults to
+                          the 'Shared Cache File' setting, if set.
         """
         self.institution_config = institution_config
         self.results = []
+        self.result_store = result_store
+        self.checkpoint = checkpoint
+        self.hooks = list(hooks or [])
+        self.max_result_age = 3600 * get_setting(institution_config, 'max_result_age_hours',
+                                                 DEFAULT_MAX_RESULT_AGE_HOURS, float)
+
+        if max_workers is None:
+            max_workers = get_setting(institution_config, 'max_workers', 1, int)
+        self.max_workers = max(1, max_workers)
+
+        # One adaptive token bucket per host: the catalog host stays polite while
+        # PURLs on different vendor domains can be probed in parallel, and each
+        # host's rate follows how fast it answers between 'Min/Max Request Rate'
+        if rate_limiter is None:
+            host_request_interval = get_setting(institution_config, 'host_request_interval',
+                                                DELAY_BETWEEN_REQUESTS, float)
+            rate_limiter = AdaptiveHostRateLimiter.from_config(institution_config, host_request_interval)
+        self.rate_limiter = rate_limiter
+
+        # 'threads' probes with max_workers threads, 'asyncio' keeps many requests in flight on one thread
+        self.backend = get_setting(institution_config, 'probe_backend', 'threads', str).lower()
+        if self.backend not in PROBE_BACKENDS:
+            raise ValueError(f"Unknown probe backend '{self.backend}', expected one of {PROBE_BACKENDS}")
+
+        # Parser used to pull (href, text) pairs out of catalog pages. With 'Parse Workers' set, pages
+        # are parsed in worker processes while the fetching threads or tasks go on with other requests.
+        self.link_extractor = get_link_extractor(get_setting(institution_config, 'link_extractor', None, str))
+        self.parse_pool = ParsePool.from_config(institution_config, self.link_extractor)
+        if self.parse_pool is not None:
+            self.link_extractor = self.parse_pool
+
+        # Index of the catalog's database listing, built on the first run when a listing URL is set
+        self.catalog_index: Optional[CatalogIndex] = None
+
+        # Coalesces identical searches, record pages and PURL fetches; replaced at the start of each run
+        self.single_flight = SingleFlight()
+
+        # Priority order and deadline of the current run, when one is set
+        self.scheduler: Optional[ProbeScheduler] = None
+
+        # Resources taken from the input and not yet yielded, bounding memory when resources are streamed
+        self.resource_window = get_setting(institution_config, 'resource_window', None, int)
+
+        # Aggregated metrics of the current run, and the summary of the last finished run
+        self._run_summary = RunSummary()
+        self.summary: Optional[Dict] = None
+
+        # Upper bound on the bytes read from a PURL landing page
+        self.purl_max_bytes = get_setting(institution_config, 'purl_max_bytes', DEFAULT_MAX_BYTES, int)
 
-    def run_probes(self, resources: List[Dict]) -> List[Dict]:
+        # Catalog links, record pages and PURL redirect chains learned by other processes on the host
+        self.shared_cache = shared_cache or SharedCache.from_config(institution_config)
+
+        # PURL redirect chains remembered between runs, and whether chains are followed with HEAD first
+        self.redirect_cache = RedirectCache.from_config(institution_config, self.shared_cache)
+        self.purl_head_first = get_setting(institution_config, 'purl_head_first', False, bool)
+
+        # Shared keep-alive client injected into every probe
+        self.client = client or HttpClient.from_config(institution_config, self.max_workers, self.rate_limiter)
+
+        # Client for the asyncio backend, sharing the per-host rate limits
+        self.async_client = AsyncHttpClient.from_config(institution_config, self.rate_limiter)
+
+    def run_probes(self, resources: Iterable[Dict], full: bool = False,
+                   sink: Optional[ResultSink] = None, resume: bool = False,
+                   deadline: Optional[float] = None) -> List[Dict]:
         """Run all probes on the provided resources.
 
         Args:
-            resources: List of resource dictionaries to probe
+            resources: Resource dictionaries to probe, as a list or streamed by an iterator;
+                       see iter_probes
+            full: Probe every resource even if the result store holds a fresh result for it
+            sink: Optional sink receiving each result as soon as it is available
+            resume: Reuse the results recorded in the checkpoint by an interrupted run
+            deadline: Optional Unix time by which the run should be done; see iter_probes
 
         Returns:
             List of dictionaries containing probe results for each resource
         """
+        if self.backend == 'asyncio':
+            self.results = asyncio.run(self.run_probes_async(resources, full=full, sink=sink, resume=resume,
+                                                             deadline=deadline))
+            return self.results
+
         self.results = []
+        for result in self.iter_probes(resources, full=full, resume=resume, deadline=deadline):
+            if sink is not None:
+                sink.write(result)
+            self.results.append(result)
+        return self.results
+
+    def iter_probes(self, resources: Iterable[Dict], full: bool = False, resume: bool = False,
+                    deadline: Optional[float] = None) -> Iterator[Dict]:
+        """Run all probes on the provided resources, yielding each result in input order.
+
+        Unlike run_probes, results are not kept on the runner, so memory stays flat
+        when the caller writes them to a sink instead of collecting them. Resources
+        are taken from the input as probes finish, at most 'Resource Window' ahead
+        of the result yielded next, so an iterator such as
+        ConfigurationLoader.iter_resources is probed while it is still being read.
+        Its PURLs shared by several resources are not known in advance, and
+        'Catalog Listing Partial Titles' only applies to lists.
+
+        With a deadline, or the 'Time Budget Minutes' or 'Prioritize Probes' settings,
+        resources are probed and yielded in priority order instead, and those whose
+        probe would not finish before the deadline are deferred to the next run; see
+        ProbeScheduler.
+
+        Args:
+            resources: Resource dictionaries to probe, as a list or streamed by an iterator
+            full: Probe every resource even if the result store holds a fresh result for it
+            resume: Reuse the results recorded in the checkpoint by an interrupted run
+            deadline: Optional Unix time by which the run should be done
+
+        Yields:
+            Dictionary containing probe results for each resource; deferred resources
+            get their stored result, or an empty one, marked 'deferred'
+        """
+        if self.backend == 'asyncio':
+            yield from self._iter_probes_on_loop(resources, full, resume, deadline)
+            return
+
+        completed = self.start_run(resources, resume, deadline)
+        ordered = self._probe_order(resources)
+        total = self._total(resources)
+
+        logger.info("Probing resources...")
+        try:
+            if self.max_workers > 1:
+                # Futures are yielded in input order regardless of completion order
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    pending: Deque = deque()
+                    try:
+                        for i, resource in ordered:
+                            pending.append(executor.submit(self.run_resource, i, total, resource, full, completed))
+                            if len(pending) >= self._window_size():
+                                result = pending.popleft().result()
+                                self.notify_resource(result)
+                                yield result
+                        while pending:
+                            result = pending.popleft().result()
+                            self.notify_resource(result)
+                            yield result
+                    finally:
+                        for future in pending:
+                            future.cancel()
+            else:
+                for i, resource in ordered:
+                    result = self.run_resource(i, total, resource, full, completed)
+                    self.notify_resource(result)
+                    yield result
+        finally:
+            self.finish_run()
+
+    async def run_probes_async(self, resources: Iterable[Dict], full: bool = False,
+                               sink: Optional[ResultSink] = None, resume: bool = False,
+                               deadline: Optional[float] = None) -> List[Dict]:
+        """Run all probes on the provided resources with the asyncio backend.
+
+        Resources are probed concurrently; the number of requests in flight is
+        bounded by the 'Max In Flight' setting and each host by its rate limit.
+        Results have the same shape as those of run_probes and are returned in input order,
+        or in priority order when scheduled. Probes still running at the deadline are
+        cancelled and deferred.
+
+        Args:
+            resources: Resource dictionaries to probe, as a list or streamed by an iterator
+            full: Probe every resource even if the result store holds a fresh result for it
+            sink: Optional sink receiving each result, in input order, as soon as it is available
+            resume: Reuse the results recorded in the checkpoint by an interrupted run
+            deadline: Optional Unix time by which the run should be done
+
+        Returns:
+            List of dictionaries containing probe results for each resource
+        """
+        results = []
+        async for result in self.iter_probes_async(resources, full=full, resume=resume, deadline=deadline):
+            if sink is not None:
+                sink.write(result)
+            results.append(result)
+        return results
+
+    async def iter_probes_async(self, resources: Iterable[Dict], full: bool = False, resume: bool = False,
+                                deadline: Optional[float] = None) -> AsyncIterator[Dict]:
+        """Asynchronous counterpart of iter_probes, with at most 'Resource Window' resources in flight.
+
+        Args:
+            resources: Resource dictionaries to probe, as a list or streamed by an iterator
+            full: Probe every resource even if the result store holds a fresh result for it
+            resume: Reuse the results recorded in the checkpoint by an interrupted run
+            deadline: Optional Unix time by which the run should be done
+
+        Yields:
+            Dictionary containing probe results for each resource
+        """
+        completed = self.start_run(resources, resume, deadline)
+        ordered = self._probe_order(resources)
+        total = self._total(resources)
+
+        logger.info("Probing resources...")
+        tasks: Deque[asyncio.Future] = deque()
+        try:
+            for i, resource in ordered:
+                tasks.append(asyncio.ensure_future(self._run_resource_async(i, total, resource, full, completed)))
+                if len(tasks) >= self._window_size():
+                    result = await tasks.popleft()
+                    self.notify_resource(result)
+                    yield result
+            while tasks:
+                result = await tasks.popleft()
+                self.notify_resource(result)
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            # The aiohttp session belongs to this run's event loop
+            await self.async_client.close()
+            self.finish_run()
+
+    def _iter_probes_on_loop(self, resources: Iterable[Dict], full: bool, resume: bool,
+                             deadline: Optional[float]) -> Iterator[Dict]:
+        """Drive iter_probes_async on a private event loop, yielding each result as it is awaited.
+
+        The loop only runs while the next result is awaited, so probes in flight
+        pause while the caller handles a result.
+        """
+        loop = asyncio.new_event_loop()
+        results = self.iter_probes_async(resources, full=full, resume=resume, deadline=deadline)
+        try:
+            while True:
+                try:
+                    result = loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield result
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def start_run(self, resources: Iterable[Dict], resume: bool = False,
+                  deadline: Optional[float] = None) -> Dict[str, Dict]:
+        """Prepare the run-scoped state: summary, schedule, checkpoint, catalog index and shared fetches.
+
+        iter_probes drives a run itself. Callers dispatching resources on their own,
+        such as batch mode, call start_run, then run_resource for every resource from
+        any thread, notify_resource with each result in input order and finish_run once.
+
+        Args:
+            resources: Resources of the run. The shared PURLs and the names contained in
+                       listed titles are only looked up in a list, which can be read twice.
+            resume: Reuse the results recorded by an interrupted run
+            deadline: Optional Unix time by which the run should be done
+
+        Returns:
+            Checkpoint entries recorded by the interrupted run, by database name
+        """
+        listed = isinstance(resources, Collection)
+        self._run_summary = RunSummary(len(resources) if listed else 0)
+        self.scheduler = ProbeScheduler.from_config(self.institution_config, self.result_store, deadline)
+        completed = self._start_checkpoint(resume)
+        self._build_catalog_index()
+        if listed:
+            self._match_contained_names(resources)
+            self._start_single_flight(resources)
+        else:
+            self.single_flight = SingleFlight()
+        return completed
+
+    def _probe_order(self, resources: Iterable[Dict]) -> Iterable[Tuple[int, Dict]]:
+        """Return (1-based position, resource) pairs in the order they are probed.
+
+        Without a scheduler, the pairs are produced as the input is read and the run's
+        total grows with them when the input has no length. The scheduler sorts the
+        whole input first.
+        """
+        if self.scheduler is not None:
+            resources = resources if isinstance(resources, Collection) else list(resources)
+            self._run_summary.total = len(resources)
+            return self.scheduler.order(resources)
+        return self._enumerate(resources)
 
-        print("\nProbing resources...")
+    def _enumerate(self, resources: Iterable[Dict]) -> Iterator[Tuple[int, Dict]]:
+        """Number the resources from 1 as they are read, counting them in the run summary."""
         for i, resource in enumerate(resources, 1):
-            database_name = resource.get('database_name', 'Unknown')
-            print(f"\nProcessing {i}/{len(resources)}: {database_name}")
+            if i > self._run_summary.total:
+                self._run_summary.total = i
+            yield i, resource
+
+    def _total(self, resources: Iterable[Dict]) -> Optional[int]:
+        """Number of resources in the run as shown in the log, or None while a stream is being read."""
+        if isinstance(resources, Collection) or self.scheduler is not None:
+            return self._run_summary.total
+        return None
+
+    def _window_size(self) -> int:
+        """Resources in flight before the oldest is awaited: 'Resource Window', or a default per worker."""
+        if self.resource_window is not None:
+            return max(1, self.resource_window)
+        if self.backend == 'asyncio':
+            return max(1, self.async_client.max_in_flight)
+        return DEFAULT_WINDOW_PER_WORKER * self.max_workers
+
+    def _start_checkpoint(self, resume: bool) -> Dict[str, Dict]:
+        """Open the checkpoint for a run.
+
+        Args:
+            resume: Reuse the results recorded by an interrupted run
+
+        Returns:
+            Checkpoint entries recorded by the interrupted run for this configuration, by database name
+        """
+        completed = {}
+        if self.checkpoint is not None:
+            config_id = institution_fingerprint(self.institution_config)
+            if resume:
+                completed = self.checkpoint.load(config_id)
+                logger.info("Resuming run with %d completed resources", len(completed))
+            # A checkpoint of another configuration is replaced rather than appended to
+            self.checkpoint.start(resume=resume and bool(completed), config_id=config_id)
+        return completed
+
+    def _start_single_flight(self, resources: List[Dict]):
+        """Start a fresh run-scoped SingleFlight and declare the PURLs shared by several resources."""
+        self.single_flight = SingleFlight()
+        uses = Counter(purl for purl, expected_text in map(purl_probe_inputs, resources) if purl and expected_text)
+        for purl, count in uses.items():
+            if count > 1:
+                self.single_flight.expect(purl_key(purl), count)
+
+    def finish_run(self):
+        """Close the checkpoint, summarize the run into summary and notify the hooks; see start_run."""
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+        stats = self.single_flight.stats()
+        logger.info("Shared fetches: %d hits, %d misses", stats['hits'], stats['misses'])
+        self.single_flight.clear()
+
+        extra = {'backend': self.backend, 'shared_fetches': stats, 'host_rates': self.rate_limiter.rates()}
+        if self.catalog_index is not None:
+            extra['catalog_index'] = {'records': len(self.catalog_index), 'pages': self.catalog_index.pages,
+                                      'hits': self.catalog_index.hits, 'misses': self.catalog_index.misses}
+        if self.redirect_cache is not None:
+            extra['redirect_cache'] = self.redirect_cache.stats()
+        if self.shared_cache is not None:
+            extra['shared_cache'] = self.shared_cache.stats()
+        if self.scheduler is not None:
+            extra['schedule'] = self.scheduler.stats()
+        if self.parse_pool is not None:
+            extra['parse_pool'] = self.parse_pool.stats()
+            self.parse_pool.close()
+        self.summary = self._run_summary.as_dict(**extra)
+        log_summary(self.summary)
+        for hook in self.hooks:
+            hook.run_finished(self.summary)
+
+    def notify_resource(self, result: Dict):
+        """Pass a result to the hooks; see start_run."""
+        for hook in self.hooks:
+            hook.resource_finished(result)
+
+    def _build_catalog_index(self):
+        """Crawl the 'Catalog Listing URL' into the catalog index, once per runner."""
+        listing_url = get_setting(self.institution_config, 'catalog_listing_url', None, str)
+        if listing_url is None or self.catalog_index is not None:
+            return
+
+        link_matcher = get_setting(self.institution_config, 'valid_catalog_links_match', None, str)
+        self.catalog_index = CatalogIndex.build(
+            listing_url,
+            client=self.client,
+            link_pattern=compile_link_pattern(link_matcher),
+            link_extractor=self.link_extractor,
+            max_pages=get_setting(self.institution_config, 'catalog_listing_max_pages', DEFAULT_MAX_PAGES, int),
+        )
+
+    def _match_contained_names(self, resources: List[Dict]):
+        """Resolve names contained in a listed title when 'Catalog Listing Partial Titles' is set."""
+        if self.catalog_index is None or not get_setting(self.institution_config, 'catalog_listing_partial_titles',
+                                                         False, bool):
+            return
+        names = [resource.get('database_name') for resource in resources]
+        added = self.catalog_index.add_contained_names(name for name in names if isinstance(name, str))
+        logger.info("Matched %d more databases to listed titles containing their name", added)
+
+    def run_resource(self, index: int, total: Optional[int], resource: Dict, full: bool = False,
+                     completed: Optional[Dict[str, Dict]] = None) -> Dict:
+        """Probe one resource unless it was completed before a resume, and checkpoint its result.
+
+        Safe to call from several threads between start_run and finish_run.
+
+        Args:
+            index: 1-based position of the resource in the run
+            total: Total number of resources in the run, or None while a streamed input is read
+            resource: Resource dictionary to probe
+            full: Ignore stored results
+            completed: Checkpoint entries recorded by the interrupted run, by database name,
+                       as returned by start_run
+
+        Returns:
+            Dictionary containing the combined probe results for the resource
+        """
+        replayed = self._replay_completed(index, total, resource, completed)
+        if replayed is not None:
+            return replayed
+
+        # Deferred resources are neither checkpointed nor stored, so the next run probes them
+        if self.scheduler is not None and not self.scheduler.admit(resource):
+            return self.scheduler.defer(resource)
+
+        result = self._probe_resource(index, total, resource, full)
+        self._record_probed(resource, result)
+        return result
+
+    async def _run_resource_async(self, index: int, total: Optional[int], resource: Dict, full: bool,
+                                  completed: Dict[str, Dict]) -> Dict:
+        """Asynchronous counterpart of run_resource."""
+        replayed = self._replay_completed(index, total, resource, completed)
+        if replayed is not None:
+            return replayed
+
+        if self.scheduler is None:
+            result = await self._probe_resource_async(index, total, resource, full)
+        elif not self.scheduler.admit(resource):
+            return self.scheduler.defer(resource)
+        else:
+            time_left = self.scheduler.time_left()
+            try:
+                result = await asyncio.wait_for(self._probe_resource_async(index, total, resource, full),
+                                                timeout=time_left)
+            except asyncio.TimeoutError:
+                return self.scheduler.defer(resource)
+        self._record_probed(resource, result)
+        return result
+
+    def _replay_completed(self, index: int, total: Optional[int], resource: Dict,
+                          completed: Dict[str, Dict]) -> Optional[Dict]:
+        """Return the checkpointed result of a resource if it was recorded for the same inputs."""
+        if not completed:
+            return None
+        database_name = resource.get('database_name', 'Unknown')
+        entry = completed.get(database_name)
+        if entry is None:
+            return None
+        if entry['fingerprint'] != resource_fingerprint(resource, self.institution_config):
+            logger.info("Probing %s again: its inputs changed since it was checkpointed", database_name)
+            return None
+        logger.info("Already completed %d/%s: %s", index, _of(total), database_name)
+        self._run_summary.add_reused()
+        # Metrics recorded by the interrupted run are not measurements of this one
+        return {key: value for key, value in entry['result'].items() if key != 'metrics'}
+
+    def _record_probed(self, resource: Dict, result: Dict):
+        """Checkpoint a result and pass the outcome of a fresh probe to the scheduler."""
+        if self.checkpoint is not None:
+            self.checkpoint.record(result, resource_fingerprint(resource, self.institution_config))
+        if self.scheduler is not None and 'metrics' in result:
+            self.scheduler.probed(result)
 
+    def _probe_resource(self, index: int, total: Optional[int], resource: Dict, full: bool = False) -> Dict:
+        """Run all probes on a single resource, or reuse its stored result if still valid.
+
+        Args:
+            index: 1-based position of the resource in the run
+            total: Total number of resources in the run, or None while a streamed input is read
+            resource: Resource dictionary to probe
+            full: Ignore stored results
+
+        Returns:
+            Dictionary containing the combined probe results for the resource. Only
+            resources probed in this run carry a 'metrics' entry with their timings
+            and HTTP counters; the result store does not keep it.
+        """
+        database_name = resource.get('database_name', 'Unknown')
+        fingerprint, stored = self._lookup_stored(index, total, resource, full)
+        if stored is not None:
+            self._run_summary.add_reused()
+            return stored
+
+        logger.info("Processing %d/%s: %s", index, _of(total), database_name)
+
+        metrics = ProbeMetrics()
+        with metrics.activate():
             # Run catalog probe
             catalog_result = self._run_catalog_probe(resource)
 
             # Run PURL probe
             purl_result = self._run_purl_probe(resource)
 
-            # Combine results
-            resource_results = {
-                'database_name': database_name,
-                'catalog_probe': catalog_result,
-                'purl_probe': purl_result
-            }
+        # Combine results
+        resource_results = {
+            'database_name': database_name,
+            'catalog_probe': catalog_result,
+            'purl_probe': purl_result,
+            'metrics': metrics.as_dict()
+        }
+        self._run_summary.add_probed(resource_results, metrics)
+        self._store_result(fingerprint, resource_results)
+        return resource_results
 
-            self.results.append(resource_results)
+    async def _probe_resource_async(self, index: int, total: Optional[int], resource: Dict, full: bool = False) -> Dict:
+        """Asynchronous counterpart of _probe_resource, running the catalog and PURL probes concurrently."""
+        database_name = resource.get('database_name', 'Unknown')
+        fingerprint, stored = self._lookup_stored(index, total, resource, full)
+        if stored is not None:
+            self._run_summary.add_reused()
+            return stored
 
-        return self.results
+        logger.info("Processing %d/%s: %s", index, _of(total), database_name)
+
+        # gather copies the current context into both tasks, so they report to the same collector
+        metrics = ProbeMetrics()
+        with metrics.activate():
+            catalog_result, purl_result = await asyncio.gather(
+                self._run_catalog_probe_async(resource),
+                probe_purl_async(resource, self.async_client, max_bytes=self.purl_max_bytes,
+                                 single_flight=self.single_flight, redirect_cache=self.redirect_cache,
+                                 head_first=self.purl_head_first)
+            )
+
+        resource_results = {
+            'database_name': database_name,
+            'catalog_probe': catalog_result,
+            'purl_probe': purl_result,
+            'metrics': metrics.as_dict()
+        }
+        self._run_summary.add_probed(resource_results, metrics)
+        self._store_result(fingerprint, resource_results)
+        return resource_results
+
+    def _lookup_stored(self, index: int, total: Optional[int], resource: Dict, full: bool):
+        """Look up a reusable result in the result store.
+
+        Returns:
+            Tuple of (fingerprint, stored result); the result is None if the resource must be probed
+        """
+        if self.result_store is None:
+            return None, None
+
+        database_name = resource.get('database_name', 'Unknown')
+        fingerprint = resource_fingerprint(resource, self.institution_config)
+        if full:
+            return fingerprint, None
+
+        stored = self.result_store.get_fresh(database_name, fingerprint, self.max_result_age)
+        if stored is not None:
+            logger.info("Skipping %d/%s: %s (unchanged)", index, _of(total), database_name)
+            # The stored metrics describe the run that probed it; the scheduler keeps reading them from the store
+            stored.pop('metrics', None)
+        return fingerprint, stored
+
+    def _store_result(self, fingerprint: Optional[str], resource_results: Dict):
+        """Record a fresh result in the result store."""
+        # Failed probes are not stored so the next run retries them
+        if self.result_store is not None and 'error' not in resource_results['catalog_probe']:
+            self.result_store.put(resource_results['database_name'], fingerprint, resource_results)
 
     def _run_catalog_probe(self, resource: Dict) -> Dict:
         """Run the catalog probe on a single resource.
@@ -62,9 +637,26 @@ class ProbeRunner:
         try:
             catalog_search_url = self.institution_config['catalog_search_url']
             link_matcher = self.institution_config.get('valid_catalog_links_match')
-            return probe_resource(catalog_search_url, resource, link_matcher=link_matcher)
+            return probe_resource(catalog_search_url, resource, link_matcher=link_matcher,
+                                  client=self.client, link_extractor=self.link_extractor,
+                                  catalog_index=self.catalog_index, single_flight=self.single_flight,
+                                  shared_cache=self.shared_cache)
+        except Exception as e:
+            logger.warning("Error in catalog probe for %s: %s", resource.get('database_name', 'Unknown'), e)
+            return {'error': str(e)}
+
+    async def _run_catalog_probe_async(self, resource: Dict) -> Dict:
+        """Asynchronous counterpart of _run_catalog_probe."""
+        try:
+            catalog_search_url = self.institution_config['catalog_search_url']
+            link_matcher = self.institution_config.get('valid_catalog_links_match')
+            return await probe_resource_async(catalog_search_url, resource, self.async_client,
+                                              link_matcher=link_matcher, link_extractor=self.link_extractor,
+                                              catalog_index=self.catalog_index,
+                                              single_flight=self.single_flight,
+                                              shared_cache=self.shared_cache)
         except Exception as e:
-            print(f"Error in catalog probe for {resource.get('database_name', 'Unknown')}: {e}")
+            logger.warning("Error in catalog probe for %s: %s", resource.get('database_name', 'Unknown'), e)
             return {'error': str(e)}
 
     def _run_purl_probe(self, resource: Dict) -> Dict:
@@ -76,34 +668,16 @@ class ProbeRunner:
         Returns:
             Dictionary containing PURL probe results
         """
-        print("Running PURL probe...")
-        return probe_purl(resource)
+        logger.debug("Running PURL probe...")
+        return probe_purl(resource, client=self.client, max_bytes=self.purl_max_bytes,
+                          single_flight=self.single_flight, redirect_cache=self.redirect_cache,
+                          head_first=self.purl_head_first)
 
 def main():
-    """Main entry point for the application."""
-    # Get configuration source
-    config_source = "https://docs.google.com/spreadsheets/d/1VbcDF6cndXZVD186GqjV8qPabl6v3PQH/edit?gid=671040191#gid=671040191"
-
-    # Initialize configuration loader
-    config_loader = ConfigurationLoader(config_source)
-
-    # Load configurations
-    institution_config = config_loader.load_institution_config()
-    resources = config_loader.load_resources()
-
-    print("\nInstitution Configuration:")
-    print(f"Catalog Search URL: {institution_config['catalog_search_url']}\n")
-
-    print("Resources Configuration:")
-    for resource in resources:
-        print(resource)
-
-    # Initialize and run probes
-    probe_runner = ProbeRunner(institution_config)
-    results = probe_runner.run_probes(resources)
+    """Main entry point for the application. Kept for compatibility; see database360.main."""
+    from database360.main import main as probe_main
 
-    # Here you might want to save the results to a file
-    return results
+    return probe_main()
 
 if __name__ == "__main__":
     main()
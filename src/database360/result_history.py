@@ -0,0 +1,235 @@
+"""History of probe results across runs, and the diff between two runs."""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from database360.instrumentation import ProbeHook
+from database360.result_sinks import FLAT_FIELDS, flatten_result
+
+# Result fields kept for every run and compared by the diff
+TRACKED_FIELDS = tuple(column for column, _ in FLAT_FIELDS if column != 'database_name')
+
+# Rows buffered between commits while a run is recorded
+COMMIT_EVERY = 100
+
+
+def _row_values(row) -> Dict:
+    values = dict(zip(TRACKED_FIELDS, row))
+    if values['purl_led_to_database'] is not None:
+        values['purl_led_to_database'] = bool(values['purl_led_to_database'])
+    return values
+
+
+def is_regression(before: Dict, after: Dict) -> bool:
+    """Whether a resource got worse between two runs.
+
+    A PURL that stopped leading to its database, a catalog link that vanished
+    and a new catalog error are regressions. Drifting link texts and links
+    moving to another record are changes, but not regressions.
+
+    Args:
+        before: Tracked fields in the baseline run
+        after: Tracked fields in the latest run
+
+    Returns:
+        True if the resource regressed
+    """
+    return bool(
+        (before.get('purl_led_to_database') and not after.get('purl_led_to_database'))
+        or (before.get('catalog_url_link') and not after.get('catalog_url_link'))
+        or (after.get('catalog_error') and not before.get('catalog_error'))
+    )
+
+
+class ResultHistory:
+    """SQLite-backed history keeping the tracked fields of every resource for every run.
+
+    Rows are keyed by (run_id, database_name), and indexed by (database_name,
+    run_id) for the history of a single resource, so a diff is two indexed
+    joins streamed row by row, whatever the number of runs kept.
+    """
+
+    def __init__(self, path: str):
+        """Open or create the history.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        columns = ', '.join(f"{field}" for field in TRACKED_FIELDS)
+        self._conn.executescript(f'''
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                summary TEXT
+            );
+            CREATE TABLE IF NOT EXISTS run_results (
+                run_id INTEGER NOT NULL,
+                database_name TEXT NOT NULL,
+                {columns},
+                PRIMARY KEY (run_id, database_name)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS run_results_by_name ON run_results (database_name, run_id);
+        ''')
+        self._conn.commit()
+
+    def start_run(self) -> int:
+        """Open a new run.
+
+        Returns:
+            Identifier of the run
+        """
+        with self._lock:
+            cursor = self._conn.execute('INSERT INTO runs (started_at) VALUES (?)', (time.time(),))
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def record(self, run_id: int, result: Dict):
+        """Record the tracked fields of one result; rows are committed in batches.
+
+        Args:
+            run_id: Run the result belongs to
+            result: Combined probe result
+        """
+        row = flatten_result(result)
+        placeholders = ', '.join('?' for _ in range(len(TRACKED_FIELDS) + 2))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO run_results (run_id, database_name, {', '.join(TRACKED_FIELDS)}) "
+                f"VALUES ({placeholders})",
+                [run_id, str(row['database_name']), *(row[field] for field in TRACKED_FIELDS)]
+            )
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+
+    def finish_run(self, run_id: int, summary: Optional[Dict] = None):
+        """Mark a run complete; only complete runs are diffed by default.
+
+        Args:
+            run_id: Run to close
+            summary: Optional run summary kept with the run
+        """
+        with self._lock:
+            self._conn.execute('UPDATE runs SET finished_at = ?, summary = ? WHERE run_id = ?',
+                               (time.time(), json.dumps(summary, default=str) if summary else None, run_id))
+            self._conn.commit()
+            self._pending = 0
+
+    def finished_runs(self, limit: int = 2) -> List[int]:
+        """Return the identifiers of the latest complete runs, newest first.
+
+        Args:
+            limit: Maximum number of runs returned
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT run_id FROM runs WHERE finished_at IS NOT NULL ORDER BY run_id DESC LIMIT ?', (limit,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def resource_history(self, database_name: str) -> Iterator[Dict]:
+        """Yield the tracked fields of one resource in every run that probed it, oldest first.
+
+        Args:
+            database_name: Name of the database
+        """
+        cursor = self._conn.execute(
+            f"SELECT run_id, {', '.join(TRACKED_FIELDS)} FROM run_results WHERE database_name = ? ORDER BY run_id",
+            (database_name,)
+        )
+        for row in cursor:
+            yield {'run_id': row[0], **_row_values(row[1:])}
+
+    def iter_changes(self, baseline: int, latest: int) -> Iterator[Dict]:
+        """Stream the resources whose tracked fields differ between two runs.
+
+        Args:
+            baseline: Run compared against
+            latest: Run being checked
+
+        Yields:
+            Dictionaries with the database name, a status ('changed', 'added' or
+            'removed'), the changed fields as {field: [before, after]} and whether
+            the change is a regression
+        """
+        fields = ', '.join(TRACKED_FIELDS)
+        before = ', '.join(f"b.{field}" for field in TRACKED_FIELDS)
+        after = ', '.join(f"l.{field}" for field in TRACKED_FIELDS)
+        differs = ' OR '.join(f"b.{field} IS NOT l.{field}" for field in TRACKED_FIELDS)
+        width = len(TRACKED_FIELDS)
+
+        cursor = self._conn.execute(
+            f"SELECT b.database_name, l.database_name IS NULL, {before}, {after} FROM run_results b "
+            f"LEFT JOIN run_results l ON l.run_id = ? AND l.database_name = b.database_name "
+            f"WHERE b.run_id = ? AND (l.database_name IS NULL OR {differs}) ORDER BY b.database_name",
+            (latest, baseline)
+        )
+        for row in cursor:
+            name, removed = row[0], row[1]
+            old = _row_values(row[2:2 + width])
+            if removed:
+                yield {'database_name': name, 'status': 'removed', 'changes': {}, 'regression': False}
+                continue
+            new = _row_values(row[2 + width:])
+            changes = {field: [old[field], new[field]] for field in TRACKED_FIELDS if old[field] != new[field]}
+            yield {'database_name': name, 'status': 'changed', 'changes': changes,
+                   'regression': is_regression(old, new)}
+
+        cursor = self._conn.execute(
+            f"SELECT database_name, {fields} FROM run_results l WHERE run_id = ? AND NOT EXISTS "
+            f"(SELECT 1 FROM run_results b WHERE b.run_id = ? AND b.database_name = l.database_name) "
+            f"ORDER BY database_name",
+            (latest, baseline)
+        )
+        for row in cursor:
+            new = _row_values(row[1:])
+            changes = {field: [None, value] for field, value in new.items() if value is not None}
+            yield {'database_name': row[0], 'status': 'added', 'changes': changes, 'regression': False}
+
+    def close(self):
+        """Commit pending rows and close the database connection."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+class HistoryRecorder(ProbeHook):
+    """Records every result of a run, reused ones included, into a ResultHistory."""
+
+    def __init__(self, history: ResultHistory):
+        """Initialize the recorder.
+
+        Args:
+            history: History receiving the runs
+        """
+        self.history = history
+        self.run_id: Optional[int] = None
+
+    def resource_finished(self, result: Dict):
+        if self.run_id is None:
+            self.run_id = self.history.start_run()
+        self.history.record(self.run_id, result)
+
+    def run_finished(self, summary: Dict):
+        if self.run_id is None:
+            self.run_id = self.history.start_run()
+        self.history.finish_run(self.run_id, summary)
+        self.run_id = None
+
+
+def format_change(change: Dict) -> str:
+    """Format a change yielded by ResultHistory.iter_changes as one line of the report."""
+    label = 'REGRESSION' if change['regression'] else change['status'].upper()
+    details = '; '.join(f"{field} {before!r} -> {after!r}" for field, (before, after) in change['changes'].items())
+    return f"{label} {change['database_name']}" + (f": {details}" if details else '')
@@ -0,0 +1,171 @@
+"""Sinks that write probe results as soon as each resource completes."""
+
+import csv
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict
+
+# Columns written by the CSV and SQLite sinks, as paths into the result dictionary
+FLAT_FIELDS = (
+    ('database_name', ('database_name',)),
+    ('catalog_url_link', ('catalog_probe', 'catalog_url_link')),
+    ('purl_link_text', ('catalog_probe', 'purl_link_text')),
+    ('catalog_error', ('catalog_probe', 'error')),
+    ('purl_led_to_database', ('purl_probe', 'purl_led_to_database')),
+)
+
+
+def flatten_result(result: Dict) -> Dict:
+    """Flatten a combined probe result into the FLAT_FIELDS columns.
+
+    Args:
+        result: Combined probe result as returned by ProbeRunner
+
+    Returns:
+        Dictionary mapping column names to values (None when missing)
+    """
+    row = {}
+    for column, path in FLAT_FIELDS:
+        value = result
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        row[column] = value
+    return row
+
+
+class ResultSink:
+    """Base class for result sinks.
+
+    Subclasses implement write(); every write is flushed so that finished
+    work survives a crash and the output can be tailed while a run is going.
+    """
+
+    def write(self, result: Dict):
+        """Write the result of one resource."""
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and release the underlying file or connection."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class JsonlSink(ResultSink):
+    """Writes one JSON object per line."""
+
+    def __init__(self, path: str, append: bool = False):
+        """Open the output file.
+
+        Args:
+            path: Output file path
+            append: Append to an existing file instead of truncating it
+        """
+        self.path = Path(path)
+        self._file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, result: Dict):
+        self._file.write(json.dumps(result, default=str) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CsvSink(ResultSink):
+    """Writes one flattened row per resource with the FLAT_FIELDS columns."""
+
+    def __init__(self, path: str, append: bool = False):
+        """Open the output file and write the header unless appending to existing data.
+
+        Args:
+            path: Output file path
+            append: Append to an existing file instead of truncating it
+        """
+        self.path = Path(path)
+        write_header = not (append and self.path.exists() and self.path.stat().st_size > 0)
+        self._file = open(self.path, 'a' if append else 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=[column for column, _ in FLAT_FIELDS])
+        if write_header:
+            self._writer.writeheader()
+
+    def write(self, result: Dict):
+        self._writer.writerow(flatten_result(result))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class SQLiteSink(ResultSink):
+    """Inserts one row per resource into a SQLite table.
+
+    The FLAT_FIELDS columns are stored for easy querying, along with the full
+    result as JSON. Each write is committed immediately.
+    """
+
+    def __init__(self, path: str, table: str = 'probe_results', append: bool = False):
+        """Open the database and create the table if needed.
+
+        Args:
+            path: SQLite database path
+            table: Name of the results table
+            append: Keep rows from previous runs instead of clearing the table
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.path = Path(path)
+        self.table = table
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        columns = ', '.join(f"{column}" for column, _ in FLAT_FIELDS)
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns}, recorded_at REAL, result TEXT)")
+        if not append:
+            self._conn.execute(f"DELETE FROM {table}")
+        self._conn.commit()
+
+    def write(self, result: Dict):
+        row = flatten_result(result)
+        placeholders = ', '.join('?' for _ in range(len(row) + 2))
+        self._conn.execute(
+            f"INSERT INTO {self.table} ({', '.join(row)}, recorded_at, result) VALUES ({placeholders})",
+            [*row.values(), time.time(), json.dumps(result, default=str)]
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+# Sink classes by file extension
+SINKS_BY_EXTENSION = {
+    '.jsonl': JsonlSink,
+    '.ndjson': JsonlSink,
+    '.csv': CsvSink,
+    '.sqlite': SQLiteSink,
+    '.sqlite3': SQLiteSink,
+    '.db': SQLiteSink,
+}
+
+
+def open_sink(path: str, append: bool = False) -> ResultSink:
+    """Open a result sink, choosing the format from the file extension.
+
+    Args:
+        path: Output path ending in .jsonl, .ndjson, .csv, .sqlite, .sqlite3 or .db
+        append: Keep existing results instead of starting a fresh output
+
+    Returns:
+        The opened sink
+    """
+    suffix = Path(path).suffix.lower()
+    try:
+        sink_class = SINKS_BY_EXTENSION[suffix]
+    except KeyError:
+        raise ValueError(f"Unsupported result file extension '{suffix}', expected one of {sorted(SINKS_BY_EXTENSION)}")
+    return sink_class(path, append=append)
@@ -0,0 +1,193 @@
+"""Persistent store of the latest probe result for each resource."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from database360.config.records import clean_text
+
+# Resource fields whose change invalidates a stored result
+FINGERPRINT_RESOURCE_FIELDS = ('database_name', 'purl', 'database_home_page_should_contain_text')
+
+# Institution settings whose change invalidates every stored result
+FINGERPRINT_INSTITUTION_SETTINGS = ('catalog_search_url', 'valid_catalog_links_match', 'purl_max_bytes')
+
+
+def _normalize(value):
+    return clean_text(value) or ''
+
+
+def resource_fingerprint(resource: Dict, institution_config: Dict) -> str:
+    """Compute a fingerprint of everything that determines a resource's probe result.
+
+    Args:
+        resource: Resource dictionary
+        institution_config: Dictionary containing institution configuration
+
+    Returns:
+        Hex digest identifying the probe inputs
+    """
+    inputs = {
+        'resource': [_normalize(resource.get(field)) for field in FINGERPRINT_RESOURCE_FIELDS],
+        'institution': [_normalize(institution_config.get(key)) for key in FINGERPRINT_INSTITUTION_SETTINGS],
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def institution_fingerprint(institution_config: Dict) -> str:
+    """Compute a fingerprint of the institution settings that determine every probe result.
+
+    Args:
+        institution_config: Dictionary containing institution configuration
+
+    Returns:
+        Hex digest identifying the institution's probe inputs
+    """
+    inputs = [_normalize(institution_config.get(key)) for key in FINGERPRINT_INSTITUTION_SETTINGS]
+    return hashlib.sha256(json.dumps(inputs).encode('utf-8')).hexdigest()
+
+
+def probe_succeeded(result: Dict) -> bool:
+    """Whether a result found the catalog record and, if the PURL was probed, the database's home page."""
+    catalog = result.get('catalog_probe', {})
+    purl = result.get('purl_probe', {})
+    return 'catalog_url_link' in catalog and 'error' not in catalog and (not purl or bool(purl.get('purl_led_to_database')))
+
+
+class ResultStore:
+    """SQLite-backed store keeping the latest result and input fingerprint per database name."""
+
+    def __init__(self, path: str):
+        """Open or create the result store.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS latest_results (
+                database_name TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                probed_at REAL NOT NULL,
+                result TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS probe_schedule (
+                database_name TEXT PRIMARY KEY,
+                last_success_at REAL,
+                last_failure_at REAL,
+                deferred_runs INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self._conn.commit()
+
+    def get(self, database_name: str) -> Optional[Tuple[str, float, Dict]]:
+        """Look up the latest stored result for a resource.
+
+        Args:
+            database_name: Name of the database
+
+        Returns:
+            Tuple of (fingerprint, probed_at timestamp, result), or None if not stored
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT fingerprint, probed_at, result FROM latest_results WHERE database_name = ?',
+                (database_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def get_fresh(self, database_name: str, fingerprint: str, max_age: float) -> Optional[Dict]:
+        """Return the stored result if its inputs are unchanged and it is recent enough.
+
+        Args:
+            database_name: Name of the database
+            fingerprint: Fingerprint of the resource's current inputs
+            max_age: Maximum age of the stored result in seconds
+
+        Returns:
+            The stored result, or None if the resource needs probing
+        """
+        stored = self.get(database_name)
+        if stored is None:
+            return None
+        stored_fingerprint, probed_at, result = stored
+        if stored_fingerprint != fingerprint or time.time() - probed_at > max_age:
+            return None
+        return result
+
+    def put(self, database_name: str, fingerprint: str, result: Dict, probed_at: Optional[float] = None):
+        """Store the latest result for a resource.
+
+        Args:
+            database_name: Name of the database
+            fingerprint: Fingerprint of the inputs the result was computed from
+            result: Combined probe result
+            probed_at: Timestamp of the probe. Defaults to now.
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO latest_results (database_name, fingerprint, probed_at, result) '
+                'VALUES (?, ?, ?, ?)',
+                (database_name, fingerprint, probed_at if probed_at is not None else time.time(),
+                 json.dumps(result, default=str))
+            )
+            self._conn.commit()
+
+    def schedule_states(self) -> Dict[str, Tuple[Optional[float], Optional[float], int]]:
+        """Return the scheduling state of every resource probed or deferred before.
+
+        Returns:
+            Dictionary mapping database names to (last_success_at, last_failure_at, deferred_runs)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT database_name, last_success_at, last_failure_at, deferred_runs FROM probe_schedule'
+            ).fetchall()
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def record_outcome(self, database_name: str, succeeded: bool, at: Optional[float] = None):
+        """Record that a resource was probed, and whether the probe succeeded.
+
+        Args:
+            database_name: Name of the database
+            succeeded: Whether the catalog record was found and the PURL worked
+            at: Timestamp of the probe. Defaults to now.
+        """
+        column = 'last_success_at' if succeeded else 'last_failure_at'
+        with self._lock:
+            self._conn.execute(
+                f'INSERT INTO probe_schedule (database_name, {column}, deferred_runs) VALUES (?, ?, 0) '
+                f'ON CONFLICT (database_name) DO UPDATE SET {column} = excluded.{column}, deferred_runs = 0',
+                (database_name, at if at is not None else time.time())
+            )
+            self._conn.commit()
+
+    def record_deferral(self, database_name: str):
+        """Record that a resource was deferred to the next run.
+
+        Args:
+            database_name: Name of the database
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO probe_schedule (database_name, deferred_runs) VALUES (?, 1) '
+                'ON CONFLICT (database_name) DO UPDATE SET deferred_runs = deferred_runs + 1',
+                (database_name,)
+            )
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,177 @@
+"""Priority ordering of a run's probes and deferral of those that would miss its deadline."""
+
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from database360.config.settings import get_setting
+from database360.result_store import ResultStore, probe_succeeded
+
+# Score per unit of the Resources sheet's Priority column
+PRIORITY_WEIGHT = 100
+
+# Score of a resource whose last probe failed, so that broken PURLs are checked first
+FAILURE_BONUS = 50
+
+# Score per day since the last successful probe, counted up to MAX_STALE_DAYS
+STALE_DAY_WEIGHT = 1
+MAX_STALE_DAYS = 30
+
+# Score per run a resource was deferred, so that deferred resources are not starved
+DEFERRAL_BONUS = 10
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeScheduler:
+    """Orders the resources of a run by priority and admits probes while they fit before a deadline.
+
+    The score of a resource adds its Priority column, a bonus if its last probe
+    failed, the days since its last success and the runs it was deferred. The
+    state behind the last three lives in the result store. A probe is only
+    started if the time it took last run, or the mean of this run's probes,
+    still fits before the deadline; lower priority probes that are quicker may
+    still be started after a slow one was deferred.
+    """
+
+    def __init__(self, result_store: Optional[ResultStore] = None, deadline: Optional[float] = None):
+        """Initialize the scheduler.
+
+        Args:
+            result_store: Optional store holding the previous results and scheduling state
+            deadline: Optional Unix time by which the run should be done
+        """
+        self.result_store = result_store
+        self.deadline = deadline
+        self.deferred = 0
+        self._states = result_store.schedule_states() if result_store is not None else {}
+        self._probed = 0
+        self._probe_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, institution_config: Dict, result_store: Optional[ResultStore] = None,
+                    deadline: Optional[float] = None) -> Optional['ProbeScheduler']:
+        """Create the scheduler of a run.
+
+        Args:
+            institution_config: Dictionary containing institution configuration
+            result_store: Optional store holding the previous results and scheduling state
+            deadline: Optional Unix time by which the run should be done. Defaults to the
+                      'Time Budget Minutes' setting counted from now.
+
+        Returns:
+            ProbeScheduler, or None if there is no deadline and 'Prioritize Probes' is not set,
+            in which case resources are probed in spreadsheet order
+        """
+        if deadline is None:
+            budget = get_setting(institution_config, 'time_budget_minutes', None, float)
+            if budget is not None:
+                deadline = time.time() + 60 * budget
+        if deadline is None and not get_setting(institution_config, 'prioritize_probes', False, bool):
+            return None
+        return cls(result_store, deadline)
+
+    def score(self, resource: Dict, now: Optional[float] = None) -> float:
+        """Compute the priority score of a resource; higher scores are probed first.
+
+        Args:
+            resource: Resource dictionary
+            now: Current Unix time. Defaults to now.
+
+        Returns:
+            Priority score
+        """
+        now = time.time() if now is None else now
+        try:
+            priority = float(resource.get('priority') or 0)
+        except (TypeError, ValueError):
+            priority = 0.0
+        if math.isnan(priority):
+            priority = 0.0
+
+        last_success_at, last_failure_at, deferred_runs = self._states.get(
+            str(resource.get('database_name')), (None, None, 0))
+        failed = last_failure_at is not None and (last_success_at is None or last_failure_at > last_success_at)
+        stale_days = MAX_STALE_DAYS if last_success_at is None else min(MAX_STALE_DAYS, (now - last_success_at) / 86400)
+        return (PRIORITY_WEIGHT * priority + (FAILURE_BONUS if failed else 0)
+                + STALE_DAY_WEIGHT * stale_days + DEFERRAL_BONUS * deferred_runs)
+
+    def order(self, resources: List[Dict]) -> List[Tuple[int, Dict]]:
+        """Sort resources by decreasing score, keeping spreadsheet order between equal scores.
+
+        Args:
+            resources: Resources of the run
+
+        Returns:
+            List of (1-based position in the spreadsheet, resource) pairs in probe order
+        """
+        now = time.time()
+        scores = [self.score(resource, now) for resource in resources]
+        return sorted(enumerate(resources, 1), key=lambda item: -scores[item[0] - 1])
+
+    def time_left(self) -> Optional[float]:
+        """Seconds until the deadline, or None without a deadline."""
+        return None if self.deadline is None else self.deadline - time.time()
+
+    def estimate(self, resource: Dict) -> float:
+        """Estimate how long probing a resource takes, from its last probe or this run's mean."""
+        if self.result_store is not None:
+            stored = self.result_store.get(str(resource.get('database_name')))
+            seconds = (stored[2].get('metrics') or {}).get('seconds') if stored is not None else None
+            if isinstance(seconds, (int, float)):
+                return float(seconds)
+        with self._lock:
+            return self._probe_seconds / self._probed if self._probed else 0.0
+
+    def admit(self, resource: Dict) -> bool:
+        """Whether a probe of the resource is expected to finish before the deadline.
+
+        Args:
+            resource: Resource about to be probed
+
+        Returns:
+            True if the probe should be started now
+        """
+        time_left = self.time_left()
+        return time_left is None or (time_left > 0 and self.estimate(resource) <= time_left)
+
+    def probed(self, result: Dict):
+        """Record the outcome and duration of a probe of this run.
+
+        Args:
+            result: Combined probe result with its 'metrics' entry
+        """
+        with self._lock:
+            self._probed += 1
+            self._probe_seconds += result.get('metrics', {}).get('seconds', 0.0)
+        if self.result_store is not None:
+            self.result_store.record_outcome(str(result.get('database_name')), probe_succeeded(result))
+
+    def defer(self, resource: Dict) -> Dict:
+        """Defer a resource to the next run, where it gets a higher score.
+
+        Args:
+            resource: Resource that is not probed in this run
+
+        Returns:
+            Its stored result marked 'deferred', or an empty result if it was never probed
+        """
+        database_name = resource.get('database_name', 'Unknown')
+        with self._lock:
+            self.deferred += 1
+        stored = None
+        if self.result_store is not None:
+            self.result_store.record_deferral(str(database_name))
+            stored = self.result_store.get(str(database_name))
+        logger.info("Deferring %s to the next run", database_name)
+        if stored is not None:
+            # Without its metrics, the stored result is not taken for a probe of this run
+            result = {key: value for key, value in stored[2].items() if key != 'metrics'}
+            return dict(result, deferred=True)
+        return {'database_name': database_name, 'catalog_probe': {}, 'purl_probe': {}, 'deferred': True}
+
+    def stats(self) -> Dict:
+        """Return the number of resources deferred and the deadline of the run."""
+        return {'deferred': self.deferred, 'deadline': self.deadline}
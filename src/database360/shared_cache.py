@@ -0,0 +1,218 @@
+"""Key/value cache shared by every database360 process on a host.
+
+Cron jobs probing different institutions, or the catalog and PURL probes of
+one institution, each start from nothing unless they share what they learned.
+A SharedCache is a single SQLite file in WAL mode, so readers never block the
+writer and any number of processes can use it at once. Entries live in
+namespaces ('config', 'catalog_search', 'catalog_record', 'redirect'), may
+carry an expiry, and the least recently used entries are evicted once the
+values exceed max_bytes.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+from database360.config.settings import get_setting
+
+# Default total size of the cached values before least recently used entries are evicted
+DEFAULT_SHARED_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Default seconds catalog searches and record pages are reused by other processes
+DEFAULT_SHARED_CACHE_TTL = 3600
+
+# Writes between two checks of the cache size
+PRUNE_EVERY = 100
+
+
+class SharedCache:
+    """SQLite-backed cache with per-entry expiry, LRU eviction and hit-rate statistics."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_SHARED_CACHE_MAX_BYTES,
+                 ttl: float = DEFAULT_SHARED_CACHE_TTL):
+        """Open or create the cache.
+
+        Args:
+            path: Path of the SQLite database file
+            max_bytes: Maximum total size of the cached values
+            ttl: Seconds the probes reuse the catalog results of other processes
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS entries_by_access ON entries (accessed_at);
+        ''')
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, institution_config: Dict) -> Optional['SharedCache']:
+        """Create a shared cache from institution settings.
+
+        Args:
+            institution_config: Dictionary containing institution configuration
+
+        Returns:
+            SharedCache, or None if the 'Shared Cache File' setting is not set
+        """
+        path = get_setting(institution_config, 'shared_cache_file', None, str)
+        if not path:
+            return None
+        return cls(
+            path,
+            max_bytes=get_setting(institution_config, 'shared_cache_max_bytes', DEFAULT_SHARED_CACHE_MAX_BYTES, int),
+            ttl=get_setting(institution_config, 'shared_cache_ttl', DEFAULT_SHARED_CACHE_TTL, float),
+        )
+
+    def _count(self, namespace: str, outcome: str):
+        counts = self._counts.setdefault(namespace, {'hits': 0, 'misses': 0})
+        counts[outcome] += 1
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        """Look up a value and mark it as recently used.
+
+        Args:
+            namespace: Kind of value, such as 'catalog_search'
+            key: Key within the namespace
+
+        Returns:
+            The value, or None if it is missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?',
+                                     (namespace, key)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                self._count(namespace, 'misses')
+                return None
+            self._conn.execute('UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?',
+                               (now, namespace, key))
+            self._conn.commit()
+            self._count(namespace, 'hits')
+            return bytes(row[0])
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None):
+        """Store a value.
+
+        Args:
+            namespace: Kind of value
+            key: Key within the namespace
+            value: Value to store
+            ttl: Seconds the value may be used, or None to keep it until it is evicted
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (namespace, key, value, size, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (namespace, key, sqlite3.Binary(value), len(value), None if ttl is None else now + ttl, now)
+            )
+            self._conn.commit()
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def delete(self, namespace: str, key: str):
+        """Remove a value, if present.
+
+        Args:
+            namespace: Kind of value
+            key: Key within the namespace
+        """
+        with self._lock:
+            self._conn.execute('DELETE FROM entries WHERE namespace = ? AND key = ?', (namespace, key))
+            self._conn.commit()
+
+    def get_json(self, namespace: str, key: str) -> Any:
+        """Look up a value stored with set_json; None if missing or expired."""
+        value = self.get(namespace, key)
+        return None if value is None else json.loads(value.decode('utf-8'))
+
+    def set_json(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a JSON-serializable value; see set."""
+        self.set(namespace, key, json.dumps(value).encode('utf-8'), ttl)
+
+    def prune(self):
+        """Evict expired entries, then least recently used entries until under max_bytes."""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),))
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total > self.max_bytes:
+                # Evict down to 90% so a full cache does not prune on every write
+                excess = total - self.max_bytes * 0.9
+                victims = []
+                for namespace, key, size in self._conn.execute(
+                        'SELECT namespace, key, size FROM entries ORDER BY accessed_at'):
+                    if excess <= 0:
+                        break
+                    victims.append((namespace, key))
+                    excess -= size
+                self._conn.executemany('DELETE FROM entries WHERE namespace = ? AND key = ?', victims)
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Return this process's hits and misses, overall and by namespace, and the hit rate."""
+        with self._lock:
+            namespaces = {namespace: dict(counts) for namespace, counts in self._counts.items()}
+        hits = sum(counts['hits'] for counts in namespaces.values())
+        misses = sum(counts['misses'] for counts in namespaces.values())
+        return {'hits': hits, 'misses': misses, 'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                'namespaces': namespaces}
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def cached_json(cache: Optional[SharedCache], namespace: str, key: str, compute: Callable[[], Any]) -> Any:
+    """Return a value from the shared cache, or compute it and store it for cache.ttl seconds.
+
+    Args:
+        cache: Shared cache, or None to always compute
+        namespace: Kind of value
+        key: Key within the namespace
+        compute: Function computing the JSON-serializable value on a miss
+
+    Returns:
+        The cached or computed value; None results, such as failed fetches, are not stored
+    """
+    if cache is None:
+        return compute()
+    value = cache.get_json(namespace, key)
+    if value is None:
+        value = compute()
+        if value is not None:
+            cache.set_json(namespace, key, value, cache.ttl)
+    return value
+
+
+async def cached_json_async(cache: Optional[SharedCache], namespace: str, key: str,
+                            compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Asynchronous counterpart of cached_json."""
+    if cache is None:
+        return await compute()
+    value = cache.get_json(namespace, key)
+    if value is None:
+        value = await compute()
+        if value is not None:
+            cache.set_json(namespace, key, value, cache.ttl)
+    return value
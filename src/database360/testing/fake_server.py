@@ -0,0 +1,290 @@
+"""In-process stand-in for a Blacklight catalog and the PURLs it links to.
+
+Used by the tests and the benchmark so the probe pipeline can be exercised
+offline. Synthetic databases are named ``Synthetic Database 00042`` and are
+resolved statelessly from their number, so any count can be served.
+
+Routes:
+    /catalog?q=NAME     Search results page with up to ``page_size`` documents
+    /catalog?f[format][]=Database&page=N
+                        Page N of the listing of the first ``listing_count`` databases
+    /catalog/ID         Record page linking to the database's PURL
+    /purl/ID            Start of a chain of ``redirect_hops`` redirects
+    /resolver/ID?hop=N  Intermediate redirect
+    /vendor/ID          Database landing page, or a "moved" notice once ``landing_route`` is changed
+
+Every route also answers HEAD requests, with the headers of its GET response.
+"""
+
+import random
+import re
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from typing import Dict, List, Optional
+
+SYNTHETIC_NAME_PATTERN = re.compile(r'synthetic database (\d+)', re.IGNORECASE)
+
+
+def synthetic_name(number: int) -> str:
+    """Return the name of a synthetic database."""
+    return f"Synthetic Database {number:05d}"
+
+
+def synthetic_home_page_text(number: int) -> str:
+    """Return the text found on the landing page of a synthetic database."""
+    return f"Welcome to {synthetic_name(number)}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: '_Server'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        fake = self.server.fake
+        parsed = urllib.parse.urlsplit(self.path)
+        route = parsed.path.strip('/').split('/')[0] or 'root'
+        fake._count(route, self.command)
+
+        if fake.latency > 0:
+            time.sleep(fake.latency)
+        if fake._should_fail():
+            self._send(503, b'Service Unavailable', content_type='text/plain')
+            return
+
+        query = urllib.parse.parse_qs(parsed.query)
+        parts = parsed.path.strip('/').split('/')
+        if parsed.path == '/catalog' and 'q' not in query and 'f[format][]' in query:
+            self._send(200, fake.listing_page(int(query.get('page', ['1'])[0])))
+        elif parsed.path == '/catalog':
+            self._send(200, fake.search_page(query.get('q', [''])[0]))
+        elif len(parts) == 2 and parts[1].isdigit() and parts[0] == 'catalog':
+            self._send(200, fake.record_page(int(parts[1])))
+        elif len(parts) == 2 and parts[1].isdigit() and parts[0] in ('purl', 'resolver'):
+            number = int(parts[1])
+            hop = int(query.get('hop', ['0'])[0]) + 1
+            if hop <= fake.redirect_hops:
+                location = f"/resolver/{number}?hop={hop}"
+            else:
+                location = f"/{fake.landing_route}/{number}"
+            self._redirect(location)
+        elif len(parts) == 2 and parts[1].isdigit() and parts[0] == fake.landing_route:
+            self._send(200, fake.landing_page(int(parts[1])))
+        elif len(parts) == 2 and parts[1].isdigit() and parts[0] == 'vendor':
+            self._send(200, fake.moved_page(int(parts[1])))
+        else:
+            self._send(404, b'Not Found', content_type='text/plain')
+
+    def _redirect(self, location: str):
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _send(self, status: int, body: bytes, content_type: str = 'text/html; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, fake: 'FakeCatalogServer'):
+        self.fake = fake
+        super().__init__(address, _Handler)
+
+
+class FakeCatalogServer:
+    """Local HTTP server imitating a Blacklight catalog, its record pages and PURL redirect chains.
+
+    Example:
+        with FakeCatalogServer(latency=0.01) as server:
+            config = {'catalog_search_url': server.catalog_search_url}
+            resources = server.resources(100)
+    """
+
+    def __init__(self, latency: float = 0.0, page_size: int = 10, padding_bytes: int = 0,
+                 error_rate: float = 0.0, redirect_hops: int = 1, listing_count: int = 0, seed: int = 0):
+        """Configure the server.
+
+        Args:
+            latency: Seconds each request is delayed before it is answered
+            page_size: Number of documents on a search results page
+            padding_bytes: Extra markup added to every page, to simulate heavier pages
+            error_rate: Fraction of requests answered with 503 Service Unavailable
+            redirect_hops: Number of intermediate redirects between a PURL and its landing page
+            listing_count: Number of databases in the database format listing
+            seed: Seed for the random error injection
+        """
+        self.latency = latency
+        self.page_size = max(1, page_size)
+        self.padding_bytes = padding_bytes
+        self.error_rate = error_rate
+        self.redirect_hops = redirect_hops
+        self.listing_count = listing_count
+        # Route of the landing pages; set another one to simulate a vendor moving its databases
+        self.landing_route = 'vendor'
+        self.request_counts: Counter = Counter()
+        self.head_counts: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server."""
+        if self._server is None:
+            raise RuntimeError("Server is not running")
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def catalog_search_url(self) -> str:
+        """Catalog search URL to use as the 'Catalog Search URL' institution setting."""
+        return f"{self.base_url}/catalog?search_field=all_fields&q="
+
+    @property
+    def listing_url(self) -> str:
+        """URL of the database format listing, to use as the 'Catalog Listing URL' institution setting."""
+        return f"{self.base_url}/catalog?f%5Bformat%5D%5B%5D=Database"
+
+    def purl(self, number: int) -> str:
+        """Return the PURL of a synthetic database."""
+        return f"{self.base_url}/purl/{number}"
+
+    def resources(self, count: int, start: int = 1) -> List[Dict]:
+        """Build resource dictionaries for synthetic databases served by this server.
+
+        Args:
+            count: Number of resources
+            start: Number of the first synthetic database
+
+        Returns:
+            List of resource dictionaries, as loaded from the Resources sheet
+        """
+        return [
+            {
+                'database_name': synthetic_name(number),
+                'purl': self.purl(number),
+                'database_home_page_should_contain_text': synthetic_home_page_text(number),
+            }
+            for number in range(start, start + count)
+        ]
+
+    def start(self) -> 'FakeCatalogServer':
+        """Start serving on a free local port in a background thread."""
+        if self._server is None:
+            self._server = _Server(('127.0.0.1', 0), self)
+            self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server and release its port."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self) -> 'FakeCatalogServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _count(self, route: str, method: str = 'GET'):
+        with self._lock:
+            self.request_counts[route] += 1
+            if method == 'HEAD':
+                self.head_counts[route] += 1
+
+    def _should_fail(self) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def _page(self, title: str, content: str) -> bytes:
+        padding = ''
+        if self.padding_bytes > 0:
+            filler = '<li><a href="/catalog?f%5Bformat%5D%5B%5D=Database">Database</a></li>'
+            padding = f'<ul class="facet-values">{filler * (self.padding_bytes // len(filler) + 1)}</ul>'
+        return (
+            f'<!DOCTYPE html><html lang="en"><head><title>{escape(title)}</title></head><body>'
+            f'<nav class="navbar"><a href="/">Catalog</a> <a href="/bookmarks">Bookmarks</a></nav>'
+            f'<div id="sidebar">{padding}</div>'
+            f'<main id="main-container">{content}</main></body></html>'
+        ).encode('utf-8')
+
+    def search_page(self, query: str) -> bytes:
+        """Render a search results page; names of synthetic databases rank first."""
+        match = SYNTHETIC_NAME_PATTERN.search(query)
+        numbers = []
+        if match:
+            number = int(match.group(1))
+            numbers = [number] + [number + offset for offset in range(100000, 100000 + self.page_size - 1)]
+        documents = ''.join(
+            f'<article class="document document-position-{position}">'
+            f'<h3 class="index_title document-title-heading">'
+            f'<a href="/catalog/{number}">{escape(synthetic_name(number))}</a></h3>'
+            f'<dl class="document-metadata"><dt>Format:</dt><dd>Database</dd></dl></article>'
+            for position, number in enumerate(numbers, 1)
+        )
+        return self._page(f"{query} - Search Results",
+                          f'<div id="documents" class="documents-list">{documents}</div>'
+                          f'<span class="page-entries"><strong>{len(numbers)}</strong> results</span>')
+
+    def listing_page(self, page: int) -> bytes:
+        """Render one page of the database format listing, with a PURL link for each record."""
+        first = (page - 1) * self.page_size + 1
+        numbers = range(max(1, first), min(self.listing_count, first + self.page_size - 1) + 1)
+        documents = ''.join(
+            f'<article class="document document-position-{number}">'
+            f'<h3 class="index_title document-title-heading">'
+            f'<a href="/catalog/{number}">{escape(synthetic_name(number))}</a></h3>'
+            f'<dl class="document-metadata"><dt>Online:</dt>'
+            f'<dd><a href="{self.purl(number)}">Access {escape(synthetic_name(number))}</a></dd></dl></article>'
+            for number in numbers
+        )
+        pagination = ''
+        if first + self.page_size <= self.listing_count:
+            pagination = (f'<ul class="pagination"><li class="page-item">'
+                          f'<a class="page-link" rel="next" href="/catalog?f%5Bformat%5D%5B%5D=Database'
+                          f'&amp;page={page + 1}">Next &raquo;</a></li></ul>')
+        return self._page("Database - Search Results",
+                          f'<div id="documents" class="documents-list">{documents}</div>{pagination}')
+
+    def record_page(self, number: int) -> bytes:
+        """Render the catalog record of a synthetic database."""
+        name = escape(synthetic_name(number))
+        return self._page(
+            name,
+            f'<h1 itemprop="name">{name}</h1>'
+            f'<dl class="document-metadata"><dt>Online:</dt>'
+            f'<dd><a href="{self.purl(number)}">Access {name}</a></dd></dl>'
+        )
+
+    def landing_page(self, number: int) -> bytes:
+        """Render the vendor landing page of a synthetic database."""
+        return self._page(synthetic_name(number), f'<h1>{escape(synthetic_home_page_text(number))}</h1>')
+
+    def moved_page(self, number: int) -> bytes:
+        """Render the page left at a landing page's old address after the vendor moved it."""
+        return self._page('Moved', '<p>This resource has moved to our new platform.</p>')
@@ -1,6 +1,7 @@
 """Tests for configuration loader."""
 
 import pytest
+import pandas as pd
 from database360.config.loader import ConfigurationLoader
 
 def test_config_loader_initialization(config_file):
@@ -28,3 +29,130 @@ def test_first_resource_record(config_file):
     assert 'database_name' in first_record, "First record should have 'database_name' field"
     assert first_record['database_name'] == 'ARTbibliographies Modern', \
         "First database should be 'ARTbibliographies Modern'"
+
+def test_workbook_parsed_once(workbook_file, mocker):
+    """Test that both sheets are read from a single parse of the workbook."""
+    excel_file = mocker.spy(pd, 'ExcelFile')
+    loader = ConfigurationLoader(workbook_file)
+
+    config = loader.load_institution_config()
+    records = loader.load_resources()
+
+    assert config['catalog_search_url'] == 'https://catalog.example.edu/catalog?q='
+    assert [r['database_name'] for r in records] == ['Test DB 1', 'Test DB 2']
+    assert excel_file.call_count == 1
+
+def test_parsed_snapshot_reused(workbook_file, tmp_path, mocker):
+    """Test that a second loader with the same cache dir skips parsing the workbook."""
+    cache_dir = tmp_path / 'cache'
+    first = ConfigurationLoader(workbook_file, cache_dir=str(cache_dir)).load_resources()
+    assert list(cache_dir.glob('parsed-*.pickle'))
+
+    excel_file = mocker.spy(pd, 'ExcelFile')
+    loader = ConfigurationLoader(workbook_file, cache_dir=str(cache_dir))
+    records = loader.load_resources()
+    assert [r['database_name'] for r in records] == [r['database_name'] for r in first]
+    assert records[0]['purl'] == 'https://resolver.example.edu/1'
+    assert loader.load_institution_config()['valid_catalog_links_match'] == '/catalog/'
+    assert excel_file.call_count == 0
+
+def test_parsed_snapshot_in_shared_cache(workbook_file, tmp_path, mocker):
+    """Test that loaders sharing a cache parse an unchanged workbook once."""
+    from database360.shared_cache import SharedCache
+
+    cache = SharedCache(tmp_path / 'shared.sqlite')
+    ConfigurationLoader(workbook_file, shared_cache=cache).load_resources()
+
+    excel_file = mocker.spy(pd, 'ExcelFile')
+    loader = ConfigurationLoader(workbook_file, cache_dir=str(tmp_path / 'cache'), shared_cache=cache)
+    assert loader.load_institution_config()['valid_catalog_links_match'] == '/catalog/'
+    assert excel_file.call_count == 0
+    assert not (tmp_path / 'cache').exists()
+    assert cache.stats()['namespaces']['config'] == {'hits': 1, 'misses': 1}
+    cache.close()
+
+def test_url_download_revalidated(workbook_file, tmp_path, mocker):
+    """Test that a cached download is revalidated with its ETag and reused on 304."""
+    with open(workbook_file, 'rb') as f:
+        content = f.read()
+
+    full_response = mocker.Mock(status_code=200, content=content, headers={'ETag': '"v1"'})
+    not_modified = mocker.Mock(status_code=304, content=b'', headers={})
+    mock_get = mocker.patch('requests.get', side_effect=[full_response, not_modified])
+
+    url = 'https://docs.google.com/spreadsheets/d/abc123/edit#gid=0'
+    first = ConfigurationLoader(url, cache_dir=str(tmp_path))
+    second = ConfigurationLoader(url, cache_dir=str(tmp_path))
+
+    assert first.config_file == second.config_file
+    assert mock_get.call_args_list[0].args[0] == 'https://docs.google.com/spreadsheets/d/abc123/export?format=xlsx'
+    assert mock_get.call_args_list[1].kwargs['headers'] == {'If-None-Match': '"v1"'}
+    assert second.load_resources()[0]['database_name'] == 'Test DB 1'
+
+def test_openpyxl_engine_matches_pandas(workbook_file, tmp_path, mocker):
+    """Test that the openpyxl engine loads the same settings and records without pandas."""
+    expected = ConfigurationLoader(workbook_file, cache_dir=str(tmp_path / 'pandas'))
+    expected_config = expected.load_institution_config()
+    expected_records = expected.load_resources()
+
+    excel_file = mocker.spy(pd, 'ExcelFile')
+    loader = ConfigurationLoader(workbook_file, cache_dir=str(tmp_path / 'openpyxl'), engine='openpyxl')
+
+    assert loader.load_institution_config() == expected_config
+    records = loader.load_resources()
+    assert records == expected_records == [
+        {'database_name': 'Test DB 1', 'purl': 'https://resolver.example.edu/1',
+         'database_home_page_should_contain_text': 'Test Database One'},
+        {'database_name': 'Test DB 2', 'purl': None, 'database_home_page_should_contain_text': None},
+    ]
+    assert excel_file.call_count == 0
+
+def test_unknown_engine_rejected(workbook_file):
+    """Test that an unknown engine name is an error."""
+    with pytest.raises(ValueError, match="Unknown configuration engine"):
+        ConfigurationLoader(workbook_file, engine='xlrd')
+
+def test_snake_case_columns_vectorized():
+    """Test that the vectorized column conversion matches to_snake_case."""
+    columns = pd.Index(['Database Name', ' PURL ', 'Database Home-Page  Should Contain Text', 'A__B', 7])
+
+    assert ConfigurationLoader.snake_case_columns(columns) == [
+        ConfigurationLoader.to_snake_case(str(column)) for column in columns
+    ]
+
+def test_resources_normalized_at_load(workbook_file):
+    """Test that empty cells of the Resources sheet are None instead of NaN."""
+    records = ConfigurationLoader(workbook_file).load_resources()
+
+    assert records[1].purl is None
+    assert records[1]['database_home_page_should_contain_text'] is None
+
+def test_stream_resources_reads_rows_lazily(workbook_file, mocker):
+    """Test that streamed resources are read row by row, after only the Institution sheet."""
+    excel_file = mocker.spy(pd, 'ExcelFile')
+    loader = ConfigurationLoader(workbook_file, stream_resources=True)
+
+    assert loader.load_institution_config()['catalog_search_url'] == 'https://catalog.example.edu/catalog?q='
+    resources = loader.iter_resources()
+    assert next(resources)['database_name'] == 'Test DB 1'
+    assert [r['database_name'] for r in resources] == ['Test DB 2']
+    assert loader._parsed is None
+    assert excel_file.call_count == 1
+    assert loader.load_resources() == ConfigurationLoader(workbook_file).load_resources()
+
+def test_resources_csv_replaces_sheet(workbook_file, tmp_path):
+    """Test that a resources CSV file is read with the sheet's headers and empty cells as None."""
+    csv_file = tmp_path / 'resources.csv'
+    csv_file.write_text('Database Name,PURL,Database Home Page Should Contain Text,Subject\n'
+                        'CSV DB,https://resolver.example.edu/9,CSV Database,\n'
+                        ',,,\n')
+    loader = ConfigurationLoader(workbook_file, engine='openpyxl', resources_file=str(csv_file))
+
+    assert loader.load_institution_config()['valid_catalog_links_match'] == '/catalog/'
+    records = list(loader.iter_resources())
+    assert records == [{'database_name': 'CSV DB', 'purl': 'https://resolver.example.edu/9',
+                        'database_home_page_should_contain_text': 'CSV Database', 'subject': None}]
+    assert loader.load_resources() == records
+
+    with pytest.raises(FileNotFoundError):
+        ConfigurationLoader(workbook_file, resources_file=str(tmp_path / 'missing.csv'))
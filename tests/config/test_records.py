@@ -0,0 +1,37 @@
+"""Tests for resource records."""
+
+import pickle
+import pytest
+from database360.config.records import Resource
+
+def test_values_normalized_once():
+    """Test that NaN, empty and padded cells are normalized when the resource is created."""
+    resource = Resource(database_name=' Test DB ', purl=float('nan'), database_home_page_should_contain_text='  ',
+                        notes=float('nan'))
+
+    assert resource.database_name == 'Test DB'
+    assert resource.purl is None
+    assert resource.database_home_page_should_contain_text is None
+    assert resource['notes'] is None
+
+def test_mapping_compatible_with_dicts():
+    """Test that a resource reads and compares like the dictionary it replaces."""
+    resource = Resource.from_row(['database_name', 'purl', 'vendor'], ['Test DB', 'https://resolver.example.edu/1',
+                                                                       'Acme'])
+
+    assert resource == {'database_name': 'Test DB', 'purl': 'https://resolver.example.edu/1',
+                        'database_home_page_should_contain_text': None, 'vendor': 'Acme'}
+    assert resource['purl'] == 'https://resolver.example.edu/1'
+    assert resource.get('missing', 'default') == 'default'
+    assert list(resource) == ['database_name', 'purl', 'database_home_page_should_contain_text', 'vendor']
+    assert dict(resource, purl=None)['purl'] is None
+    with pytest.raises(KeyError):
+        resource['missing']
+
+def test_compact_and_picklable():
+    """Test that resources have no per-instance dictionary and survive the parsed snapshot."""
+    resource = Resource(database_name='Test DB', purl='https://resolver.example.edu/1')
+
+    assert not hasattr(resource, '__dict__')
+    assert resource.extra is None
+    assert pickle.loads(pickle.dumps(resource)) == resource
@@ -0,0 +1,69 @@
+"""Tests for configuration validation."""
+
+from database360.config.validation import ERROR, WARNING, validate_configuration
+
+VALID_CONFIG = {
+    'catalog_search_url': 'https://catalog.example.edu/catalog?q=',
+    'valid_catalog_links_match': '/catalog/',
+}
+
+VALID_RESOURCES = [
+    {'database_name': 'Test DB 1', 'purl': 'https://resolver.example.edu/1',
+     'database_home_page_should_contain_text': 'Test Database One'},
+    {'database_name': 'Test DB 2', 'purl': None, 'database_home_page_should_contain_text': None},
+]
+
+def test_valid_configuration():
+    """Test that a valid configuration has no problems."""
+    assert validate_configuration(VALID_CONFIG, VALID_RESOURCES) == []
+
+def test_institution_settings_checked():
+    """Test that URLs, the link regex, numbers and choices of the Institution sheet are checked."""
+    config = {
+        'catalog_search_url': 'catalog.example.edu',
+        'catalog_listing_url': 'ftp://catalog.example.edu/list',
+        'valid_catalog_links_match': '/catalog/(',
+        'max_workers': 'eight',
+        'request_timeout': 30,
+        'probe_backend': 'processes',
+        'link_extractor': 'regex',
+    }
+
+    problems = validate_configuration(config, VALID_RESOURCES)
+
+    assert [level for level, _ in problems] == [ERROR] * 6
+    messages = ' '.join(message for _, message in problems)
+    assert "'Catalog Search URL' is not an http(s) URL" in messages
+    assert "'Catalog Listing URL' is not an http(s) URL" in messages
+    assert "'Valid Catalog Links Match' is not a valid regular expression" in messages
+    assert "Setting 'max_workers' is not a number: 'eight'" in messages
+    assert "'Probe Backend' must be one of" in messages
+    assert "'Link Extractor' must be one of" in messages
+
+def test_missing_search_url():
+    """Test that a configuration without a catalog search URL is an error."""
+    assert validate_configuration({}, VALID_RESOURCES) == [
+        (ERROR, "The Institution sheet is empty or missing"),
+        (ERROR, "'Catalog Search URL' is not set"),
+    ]
+
+def test_resource_rows_checked():
+    """Test that empty names, bad PURLs, incomplete PURL probes and duplicates are reported by row."""
+    resources = VALID_RESOURCES + [
+        {'database_name': None, 'purl': None, 'database_home_page_should_contain_text': None},
+        {'database_name': 'Test DB 3', 'purl': 'resolver/3', 'database_home_page_should_contain_text': 'Three'},
+        {'database_name': 'Test DB 4', 'purl': 'https://resolver.example.edu/4',
+         'database_home_page_should_contain_text': float('nan')},
+        {'database_name': 'Test DB 1', 'purl': None, 'database_home_page_should_contain_text': None},
+    ]
+
+    assert validate_configuration(VALID_CONFIG, resources) == [
+        (ERROR, "Resources row 4: 'Database Name' is empty"),
+        (ERROR, "Resources row 5: 'PURL' is not an http(s) URL: 'resolver/3'"),
+        (WARNING, "Resources row 6: the PURL probe needs both 'PURL' and 'Database Home Page Should Contain Text'"),
+        (WARNING, "'Test DB 1' is listed 2 times in the Resources sheet"),
+    ]
+
+def test_empty_resources_warned():
+    """Test that an empty Resources sheet is only a warning."""
+    assert validate_configuration(VALID_CONFIG, []) == [(WARNING, "The Resources sheet has no resources")]
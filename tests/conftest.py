@@ -7,3 +7,32 @@ from pathlib import Path
 def config_file() -> str:
     """Return the path to the test configuration file."""
     return str(Path(__file__).parent.parent / 'institution_data' / 'Configuration.xlsx')
+
+@pytest.fixture
+def workbook_file(tmp_path) -> str:
+    """Write a small configuration workbook and return its path."""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    institution = workbook.active
+    institution.title = 'Institution'
+    institution.append(['Setting', 'Value'])
+    institution.append(['Catalog Search URL', 'https://catalog.example.edu/catalog?q='])
+    institution.append(['Valid Catalog Links Match', '/catalog/'])
+
+    resources = workbook.create_sheet('Resources')
+    resources.append(['Database Name', 'PURL', 'Database Home Page Should Contain Text'])
+    resources.append(['Test DB 1', 'https://resolver.example.edu/1', 'Test Database One'])
+    resources.append(['Test DB 2', None, None])
+
+    path = tmp_path / 'Configuration.xlsx'
+    workbook.save(path)
+    return str(path)
+
+@pytest.fixture
+def fake_catalog():
+    """Run the fake catalog server for the duration of a test."""
+    from database360.testing.fake_server import FakeCatalogServer
+
+    with FakeCatalogServer() as server:
+        yield server
@@ -0,0 +1,178 @@
+"""Tests for the asynchronous HTTP client and probes."""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from database360.net.async_client import AsyncHttpClient
+from database360.net.rate_limiter import AdaptiveHostRateLimiter
+from database360.probe_resources.async_probes import probe_resource_async, probe_purl_async
+from database360.probe_runner import ProbeRunner
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves a tiny catalog, a PURL redirect and a few edge cases."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type='text/html; charset=utf-8', chunked=False):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(0, len(body), 7):
+                piece = body[i:i + 7]
+                self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_GET(self):
+        host = f"http://{self.headers['Host']}"
+        if self.path.startswith('/catalog?q='):
+            self.send_body(200, b'<a href="/catalog/1">Test DB</a>')
+        elif self.path == '/catalog/1':
+            self.send_body(200, f'<a href="{host}/purl/1">Access Test DB</a>'.encode())
+        elif self.path == '/purl/1':
+            self.send_response(302)
+            self.send_header('Location', '/vendor/1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/vendor/1':
+            self.send_body(200, 'Welcome to the Test Database — café'.encode('utf-8'), chunked=True)
+        elif self.path == '/busy':
+            self.send_response(429)
+            self.send_header('Retry-After', '7')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/latin1':
+            self.send_body(200, 'Base de données'.encode('latin-1'), content_type='text/html; charset=iso-8859-1')
+        else:
+            self.send_body(500, b'error')
+
+@pytest.fixture
+def server_url():
+    """Run the test server on a free local port."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def test_stdlib_client_follows_redirects_and_chunks(server_url):
+    """Test that the stdlib backend follows redirects and decodes chunked bodies."""
+    client = AsyncHttpClient(use_aiohttp=False)
+    response = asyncio.run(client.get(server_url + '/purl/1'))
+
+    assert response.status_code == 200
+    assert response.url == server_url + '/vendor/1'
+    assert [r.status_code for r in response.history] == [302]
+    assert 'Test Database — café' in response.text
+
+def test_stdlib_client_retries_then_raises_for_status(server_url):
+    """Test that server errors are retried and surface through raise_for_status."""
+    client = AsyncHttpClient(retries=1, backoff_factor=0, use_aiohttp=False)
+    response = asyncio.run(client.get(server_url + '/missing'))
+
+    assert response.status_code == 500
+    with pytest.raises(requests.HTTPError):
+        response.raise_for_status()
+
+def test_probe_purl_async(server_url):
+    """Test that the async PURL probe streams and matches like probe_purl."""
+    client = AsyncHttpClient(use_aiohttp=False)
+
+    async def run():
+        return await asyncio.gather(
+            probe_purl_async({'purl': server_url + '/purl/1',
+                              'database_home_page_should_contain_text': 'test database — CAFÉ'}, client),
+            probe_purl_async({'purl': server_url + '/latin1',
+                              'database_home_page_should_contain_text': 'données'}, client),
+            probe_purl_async({'purl': server_url + '/purl/1',
+                              'database_home_page_should_contain_text': 'Other'}, client),
+            probe_purl_async({'purl': server_url + '/missing',
+                              'database_home_page_should_contain_text': 'Test'}, client),
+            probe_purl_async({'purl': '', 'database_home_page_should_contain_text': 'Test'}, client),
+        )
+
+    client.retries = 0
+    assert asyncio.run(run()) == [
+        {'purl_led_to_database': True},
+        {'purl_led_to_database': True},
+        {'purl_led_to_database': False},
+        {},
+        {},
+    ]
+
+def test_probe_resource_async(server_url):
+    """Test that the async catalog probe finds the record and PURL link text."""
+    client = AsyncHttpClient(use_aiohttp=False)
+    resource = {'database_name': 'Test DB', 'purl': server_url + '/purl/1'}
+
+    result = asyncio.run(probe_resource_async(server_url + '/catalog?q=', resource, client,
+                                              link_matcher='/catalog/'))
+    assert result == {'catalog_url_link': server_url + '/catalog/1', 'purl_link_text': 'Access Test DB'}
+
+def test_runner_asyncio_backend_matches_threads(server_url):
+    """Test that both backends return identical results in input order."""
+    resources = [
+        {'database_name': 'Test DB', 'purl': server_url + '/purl/1',
+         'database_home_page_should_contain_text': 'Test Database'},
+        {'database_name': 'Missing DB'},
+    ]
+    config = {'catalog_search_url': server_url + '/catalog?q=', 'host_request_interval': 0,
+              'request_retries': 0}
+
+    threaded = ProbeRunner(dict(config)).run_probes(resources)
+    runner = ProbeRunner(dict(config, probe_backend='asyncio'))
+    runner.async_client.use_aiohttp = False
+    results = runner.run_probes(resources)
+
+    # Timings differ between runs; the HTTP counters must not
+    def without_timings(result):
+        metrics = result.pop('metrics')
+        return result, metrics['status_codes'], metrics['requests'], metrics['redirects']
+
+    assert [without_timings(r) for r in results] == [without_timings(r) for r in threaded]
+    assert threaded[0]['purl_probe'] == {'purl_led_to_database': True}
+
+def test_retry_after_pauses_the_host(server_url):
+    """Test that a 429 with Retry-After holds back the next request to the host."""
+    limiter = AdaptiveHostRateLimiter(min_interval=0)
+    client = AsyncHttpClient(retries=0, rate_limiter=limiter)
+    client.use_aiohttp = False
+
+    response = asyncio.run(client.get(server_url + '/busy'))
+    assert response.status_code == 429
+    assert limiter.reserve(server_url + '/catalog/1') == pytest.approx(7, abs=1)
+
+def test_session_of_previous_loop_closed(server_url, mocker):
+    """Test that a session opened on an earlier event loop is closed before the next loop's requests."""
+    client = AsyncHttpClient(use_aiohttp=False)
+    stale = mocker.Mock(close=mocker.AsyncMock())
+    client._session = stale
+    client._loop = object()
+
+    asyncio.run(client.get(server_url + '/purl/1'))
+
+    stale.close.assert_awaited_once()
+    assert client._session is None
+
+def test_runner_closes_async_client(server_url, mocker):
+    """Test that an asyncio run closes the client's session when it finishes."""
+    runner = ProbeRunner({'catalog_search_url': server_url + '/catalog?q=', 'host_request_interval': 0,
+                          'request_retries': 0, 'probe_backend': 'asyncio'})
+    runner.async_client.use_aiohttp = False
+    close = mocker.patch.object(runner.async_client, 'close', mocker.AsyncMock())
+
+    runner.run_probes([{'database_name': 'Test DB'}])
+    assert close.await_count == 1
+    list(runner.iter_probes([{'database_name': 'Test DB'}]))
+    assert close.await_count == 2
@@ -0,0 +1,98 @@
+"""Tests for the on-disk HTTP response cache."""
+
+import os
+import time
+import pytest
+import requests
+from database360.net.cache import ResponseCache
+from database360.net.client import HttpClient
+
+def make_response(status_code=200, content=b'', headers=None, url='https://catalog.example.edu/catalog/1'):
+    """Build a requests.Response without touching the network."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    response.url = url
+    response.encoding = 'utf-8'
+    return response
+
+@pytest.fixture
+def cached_client(tmp_path, mocker):
+    """Return a client with a cache and a mocked session.get."""
+    client = HttpClient(cache=ResponseCache(tmp_path, ttl=0))
+    mock_get = mocker.patch.object(client.session, 'get')
+    return client, mock_get
+
+def test_cache_revalidates_with_validators(cached_client):
+    """Test that a second fetch sends validators and serves the cached body on 304."""
+    client, mock_get = cached_client
+    url = 'https://catalog.example.edu/catalog/1'
+    mock_get.side_effect = [
+        make_response(200, b'<a href="/purl">Record</a>',
+                      {'ETag': '"abc"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}),
+        make_response(304),
+    ]
+
+    first = client.get(url, use_cache=True)
+    second = client.get(url, use_cache=True)
+
+    assert first.text == second.text == '<a href="/purl">Record</a>'
+    assert second.status_code == 200
+    assert second.from_cache
+    headers = mock_get.call_args_list[1].kwargs['headers']
+    assert headers['If-None-Match'] == '"abc"'
+    assert headers['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+def test_cache_serves_fresh_entries_without_network(tmp_path, mocker):
+    """Test that entries younger than the TTL are served without a request."""
+    client = HttpClient(cache=ResponseCache(tmp_path, ttl=3600))
+    mock_get = mocker.patch.object(client.session, 'get', return_value=make_response(200, b'page'))
+
+    client.get('https://catalog.example.edu/catalog/1', use_cache=True)
+    response = client.get('https://catalog.example.edu/catalog/1', use_cache=True)
+
+    assert response.content == b'page'
+    assert mock_get.call_count == 1
+
+def test_cache_is_shared_between_instances(tmp_path):
+    """Test that a second cache on the same directory sees stored entries."""
+    url = 'https://catalog.example.edu/catalog/1'
+    ResponseCache(tmp_path).store(url, make_response(200, b'page', {'ETag': '"v1"'}))
+
+    other = ResponseCache(tmp_path)
+    meta = other.load(url)
+    assert meta['etag'] == '"v1"'
+    assert other.to_response(meta).content == b'page'
+
+def test_cache_ignores_errors_and_uncached_requests(cached_client):
+    """Test that error responses and requests without use_cache are not stored."""
+    client, mock_get = cached_client
+    mock_get.side_effect = [make_response(500, b'error'), make_response(200, b'page')]
+
+    client.get('https://catalog.example.edu/catalog/1', use_cache=True)
+    client.get('https://catalog.example.edu/catalog/2')
+
+    assert client.cache.load('https://catalog.example.edu/catalog/1') is None
+    assert client.cache.load('https://catalog.example.edu/catalog/2') is None
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the cache evicts old entries once max_bytes is exceeded."""
+    cache = ResponseCache(tmp_path, max_bytes=250)
+    for i in range(3):
+        url = f'https://catalog.example.edu/catalog/{i}'
+        cache.store(url, make_response(200, b'x' * 100, url=url))
+        _, body_path = cache._paths(url)
+        os.utime(body_path, (time.time() - 100 + i, time.time() - 100 + i))
+    cache.prune()
+
+    assert cache.load('https://catalog.example.edu/catalog/0') is None
+    assert cache.load('https://catalog.example.edu/catalog/2') is not None
+
+def test_cache_from_config(tmp_path):
+    """Test that the cache is only enabled when a directory is configured."""
+    assert ResponseCache.from_config({}) is None
+
+    cache = ResponseCache.from_config({'http_cache_dir': str(tmp_path), 'http_cache_ttl': 60})
+    assert cache.directory == tmp_path
+    assert cache.ttl == 60
@@ -0,0 +1,83 @@
+"""Tests for the shared HTTP client."""
+
+import pytest
+import requests
+from database360.net.client import HttpClient, HEADERS, DEFAULT_TIMEOUT, get_default_client
+from database360.net.rate_limiter import AdaptiveHostRateLimiter
+
+def test_client_defaults():
+    """Test that the client sends browser headers and mounts pooled adapters."""
+    client = HttpClient()
+    assert client.session.headers['User-Agent'] == HEADERS['User-Agent']
+    assert client.timeout == DEFAULT_TIMEOUT
+
+    adapter = client.session.get_adapter('https://catalog.example.edu/')
+    assert adapter.max_retries.total == 3
+    assert 500 in adapter.max_retries.status_forcelist
+    assert 429 not in adapter.max_retries.status_forcelist
+    assert client.session.get_adapter('http://catalog.example.edu/') is adapter
+
+def test_client_from_config():
+    """Test that timeouts, retries and pool size come from the institution config."""
+    config = {'request_timeout': 5, 'request_retries': 1.0, 'connections_per_host': float('nan')}
+    client = HttpClient.from_config(config, max_workers=16)
+
+    assert client.timeout == 5
+    adapter = client.session.get_adapter('https://catalog.example.edu/')
+    assert adapter.max_retries.total == 1
+    assert adapter._pool_maxsize == 16
+
+def test_client_get_applies_timeout_and_rate_limit(mocker):
+    """Test that get() throttles by host and applies the default timeout."""
+    limiter = mocker.Mock()
+    client = HttpClient(timeout=7, rate_limiter=limiter)
+    mock_get = mocker.patch.object(client.session, 'get')
+
+    client.get('https://catalog.example.edu/catalog/1')
+    client.get('https://catalog.example.edu/catalog/2', timeout=1)
+
+    limiter.acquire.assert_any_call('https://catalog.example.edu/catalog/1')
+    assert mock_get.call_args_list[0].kwargs['timeout'] == 7
+    assert mock_get.call_args_list[1].kwargs['timeout'] == 1
+
+def test_default_client_is_shared():
+    """Test that probes called without a client share one default client."""
+    assert get_default_client() is get_default_client()
+    assert get_default_client().rate_limiter is not None
+
+def test_client_reports_throttling_to_rate_limiter(mocker):
+    """Test that a 429 halves the host's rate and its Retry-After pauses the host."""
+    limiter = AdaptiveHostRateLimiter(min_interval=0.25)
+    client = HttpClient(retries=0, rate_limiter=limiter)
+    response = requests.Response()
+    response.status_code = 429
+    response.url = 'https://catalog.example.edu/catalog/1'
+    response.headers['Retry-After'] = '5'
+    response._content = b''
+    mocker.patch.object(client.session, 'get', return_value=response)
+
+    client.get('https://catalog.example.edu/catalog/1')
+
+    assert limiter.rates() == {'catalog.example.edu': 2}
+    assert limiter.reserve('https://catalog.example.edu/catalog/2') == pytest.approx(5, abs=0.5)
+
+def test_client_retries_throttled_requests_through_rate_limiter(mocker):
+    """Test that each retry of a 429 or 503 waits for the rate limiter and is reported to it."""
+    limiter = AdaptiveHostRateLimiter(min_interval=0.01)
+    acquire = mocker.spy(limiter, 'acquire')
+    client = HttpClient(retries=2, backoff_factor=0, rate_limiter=limiter)
+    responses = []
+    for status_code in (429, 503, 200):
+        response = requests.Response()
+        response.status_code = status_code
+        response.url = 'https://catalog.example.edu/catalog/1'
+        response._content = b'ok'
+        responses.append(response)
+    mock_get = mocker.patch.object(client.session, 'get', side_effect=responses)
+
+    response = client.get('https://catalog.example.edu/catalog/1')
+
+    assert response.status_code == 200
+    assert mock_get.call_count == 3
+    assert acquire.call_count == 3
+    assert limiter.rates()['catalog.example.edu'] < 2
@@ -0,0 +1,124 @@
+"""Tests for per-host rate limiting."""
+
+import email.utils
+import time
+import pytest
+from database360.net.rate_limiter import (
+    AdaptiveHostRateLimiter, TokenBucket, HostRateLimiter, MAX_RETRY_AFTER, parse_retry_after
+)
+
+def test_token_bucket_allows_burst_then_waits(mocker):
+    """Test that the bucket hands out its burst immediately and then spaces requests."""
+    mock_sleep = mocker.patch('time.sleep')
+    bucket = TokenBucket(rate=1.0, capacity=2)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    wait = bucket.acquire()
+    assert wait == pytest.approx(1.0, abs=0.05)
+    mock_sleep.assert_called_once()
+
+def test_token_bucket_rejects_invalid_rate():
+    """Test that a non-positive rate is rejected."""
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+def test_host_rate_limiter_is_per_host(mocker):
+    """Test that different hosts do not throttle each other."""
+    mocker.patch('time.sleep')
+    limiter = HostRateLimiter(min_interval=10)
+
+    assert limiter.acquire('https://catalog.example.edu/search?q=a') == 0
+    assert limiter.acquire('https://vendor-one.example.com/db') == 0
+    assert limiter.acquire('https://vendor-two.example.com/db') == 0
+    assert limiter.acquire('https://catalog.example.edu/catalog/1') > 9
+
+def test_host_rate_limiter_disabled(mocker):
+    """Test that a zero interval disables throttling."""
+    mock_sleep = mocker.patch('time.sleep')
+    limiter = HostRateLimiter(min_interval=0)
+
+    for _ in range(5):
+        assert limiter.acquire('https://catalog.example.edu/') == 0
+    mock_sleep.assert_not_called()
+
+def test_token_bucket_set_rate_keeps_reserved_tokens_due(mocker):
+    """Test that a rate change does not move reservations already handed out."""
+    mocker.patch('time.monotonic', return_value=100.0)
+    bucket = TokenBucket(rate=1.0)
+    bucket.reserve()
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    bucket.set_rate(2.0)
+    # The reserved token stays due in 1s; the next one follows at the new rate
+    assert bucket.reserve() == pytest.approx(1.5)
+
+def test_token_bucket_pause(mocker):
+    """Test that a paused bucket hands out no token before the pause ends."""
+    mocker.patch('time.monotonic', return_value=100.0)
+    bucket = TokenBucket(rate=10.0)
+    bucket.pause(5)
+    assert bucket.reserve() == pytest.approx(5.0)
+
+def test_parse_retry_after():
+    """Test that Retry-After is read in seconds or as an HTTP date, and invalid values are ignored."""
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after('100000') == MAX_RETRY_AFTER
+    assert parse_retry_after(email.utils.formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+def test_adaptive_limiter_ramps_up_on_healthy_responses():
+    """Test that healthy responses raise a host's rate additively up to the maximum."""
+    limiter = AdaptiveHostRateLimiter(min_interval=1, max_rate=3, increase=1)
+    url = 'https://catalog.example.edu/catalog/1'
+    rates = []
+    for _ in range(10):
+        limiter.record_response(url, 200, latency=0.1)
+        rates.append(limiter.rates()['catalog.example.edu'])
+
+    assert rates[0] == pytest.approx(2.0)
+    assert rates == sorted(rates)
+    assert rates[-1] == 3
+
+def test_adaptive_limiter_backs_off_once_per_round_trip():
+    """Test that a 429 halves the rate and the responses already in flight do not cut it again."""
+    limiter = AdaptiveHostRateLimiter(min_interval=0.25, min_rate=1)
+    url = 'https://catalog.example.edu/catalog/1'
+    limiter.record_response(url, 429)
+    limiter.record_response(url, 429)
+    assert limiter.rates()['catalog.example.edu'] == 2
+
+    limiter.record_response(url, 503)
+    for _ in range(3):
+        limiter._states['catalog.example.edu'].hold_until = 0
+        limiter.record_response(url, 503)
+    assert limiter.rates()['catalog.example.edu'] == 1
+
+def test_adaptive_limiter_backs_off_when_latency_rises():
+    """Test that a host whose latency climbs well above its best is slowed down."""
+    limiter = AdaptiveHostRateLimiter(min_interval=0.5, max_rate=2)
+    url = 'https://catalog.example.edu/catalog/1'
+    limiter.record_response(url, 200, latency=0.1)
+    assert limiter.rates()['catalog.example.edu'] == 2
+    for _ in range(10):
+        limiter.record_response(url, 200, latency=2.0)
+    assert limiter.rates()['catalog.example.edu'] == 1
+
+def test_adaptive_limiter_honors_retry_after(mocker):
+    """Test that Retry-After pauses the host, even when pacing is disabled, and not other hosts."""
+    mock_sleep = mocker.patch('time.sleep')
+    for interval in (0, 1):
+        limiter = AdaptiveHostRateLimiter(min_interval=interval)
+        limiter.record_response('https://catalog.example.edu/catalog/1', 429, retry_after=30)
+
+        assert limiter.acquire('https://catalog.example.edu/catalog/2') == pytest.approx(30, abs=1)
+        assert limiter.reserve('https://vendor.example.com/db') == 0
+    assert mock_sleep.call_count == 2
+
+def test_adaptive_limiter_from_config():
+    """Test that the rate bounds come from the Institution sheet and bound the initial rate."""
+    limiter = AdaptiveHostRateLimiter.from_config({'min_request_rate': 1, 'max_request_rate': 4}, 0.1)
+    assert (limiter.min_rate, limiter.max_rate) == (1, 4)
+    limiter.reserve('https://catalog.example.edu/')
+    assert limiter.rates() == {'catalog.example.edu': 4}
@@ -0,0 +1,162 @@
+"""Tests for the PURL redirect chain cache."""
+
+import asyncio
+import time
+import pytest
+import requests
+from database360.net.async_client import AsyncHttpClient
+from database360.net.client import HttpClient
+from database360.net.redirect_cache import RedirectCache, redirect_ttl
+from database360.probe_resources.async_probes import probe_purl_async
+from database360.probe_resources.probe_purl import probe_purl
+from database360.testing.fake_server import FakeCatalogServer
+
+def make_chain(urls, headers=None):
+    """Build a final response whose history redirects through the given URLs."""
+    responses = []
+    for url in urls:
+        response = requests.Response()
+        response.url = url
+        response.status_code = 302
+        response.headers.update(headers or {})
+        responses.append(response)
+    final = responses.pop()
+    final.status_code = 200
+    final.history = responses
+    return final
+
+@pytest.fixture
+def cache(tmp_path):
+    """Return an empty redirect cache."""
+    cache = RedirectCache(tmp_path / 'redirects.sqlite', ttl=60)
+    yield cache
+    cache.close()
+
+def test_resolve_follows_recorded_hops(cache):
+    """Test that a recorded chain resolves to its last target and unknown URLs do not."""
+    chain = make_chain(['https://purl.example.edu/1', 'https://proxy.example.edu/login?url=1',
+                        'https://vendor.example.com/db'])
+
+    assert cache.record(chain) == 2
+    assert cache.resolve('https://purl.example.edu/1') == 'https://vendor.example.com/db'
+    assert cache.resolve('https://proxy.example.edu/login?url=1') == 'https://vendor.example.com/db'
+    assert cache.resolve('https://vendor.example.com/db') is None
+    assert cache.stats() == {'hits': 2, 'misses': 1}
+
+def test_expired_hop_and_invalidate(cache, mocker):
+    """Test that a chain is only resolved up to its first expired hop and that invalidate forgets it."""
+    cache.record(make_chain(['https://purl.example.edu/1', 'https://proxy.example.edu/1',
+                             'https://vendor.example.com/db']))
+    cache.record(make_chain(['https://proxy.example.edu/1', 'https://vendor.example.com/db'],
+                            headers={'Cache-Control': 'max-age=5'}))
+
+    now = time.time()
+    mocker.patch('database360.shared_cache.time.time', return_value=now + 10)
+    assert cache.resolve('https://purl.example.edu/1') == 'https://proxy.example.edu/1'
+    assert cache.resolve('https://proxy.example.edu/1') is None
+
+    mocker.stopall()
+    cache.invalidate('https://purl.example.edu/1')
+    assert cache.resolve('https://proxy.example.edu/1') is None
+
+def test_redirect_ttl_from_cache_control():
+    """Test that max-age, no-store and missing headers set a hop's TTL."""
+    assert redirect_ttl({'Cache-Control': 'public, max-age=300'}, 60) == 300
+    assert redirect_ttl({'Cache-Control': 'no-store'}, 60) == 0
+    assert redirect_ttl({}, 60) == 60
+
+def test_cache_persists_between_instances(tmp_path):
+    """Test that a chain recorded by one run is resolved by the next."""
+    path = tmp_path / 'redirects.sqlite'
+    first = RedirectCache(path)
+    first.record(make_chain(['https://purl.example.edu/1', 'https://vendor.example.com/db']))
+    first.close()
+
+    second = RedirectCache(path)
+    assert second.resolve('https://purl.example.edu/1') == 'https://vendor.example.com/db'
+    second.close()
+
+def test_probe_purl_skips_cached_hops(cache):
+    """Test that a second probe requests the landing page directly."""
+    with FakeCatalogServer(redirect_hops=3) as server:
+        resource = server.resources(1, start=2)[0]
+        client = HttpClient()
+
+        assert probe_purl(resource, client=client, redirect_cache=cache) == {'purl_led_to_database': True}
+        assert server.request_counts['purl'] + server.request_counts['resolver'] == 4
+
+        assert probe_purl(resource, client=client, redirect_cache=cache) == {'purl_led_to_database': True}
+        assert server.request_counts['purl'] + server.request_counts['resolver'] == 4
+        assert server.request_counts['vendor'] == 2
+
+def test_failing_target_revalidates_chain(cache):
+    """Test that a cached target answering with an error is replaced by following the chain again."""
+    with FakeCatalogServer(redirect_hops=1) as server:
+        resource = server.resources(1, start=2)[0]
+        cache.record(make_chain([resource['purl'], f"{server.base_url}/gone/2"]))
+
+        assert probe_purl(resource, client=HttpClient(), redirect_cache=cache) == {'purl_led_to_database': True}
+        assert server.request_counts['gone'] == 1
+        assert cache.resolve(resource['purl']) == f"{server.base_url}/vendor/2"
+
+def test_head_first_resolves_chain_without_bodies():
+    """Test that HEAD-first follows the chain with HEAD and fetches only the landing page with GET."""
+    with FakeCatalogServer(redirect_hops=2) as server:
+        resource = server.resources(1, start=5)[0]
+
+        assert probe_purl(resource, client=HttpClient(), head_first=True) == {'purl_led_to_database': True}
+        assert server.head_counts == {'purl': 1, 'resolver': 2, 'vendor': 1}
+        assert server.request_counts['vendor'] == 2
+
+def test_probe_purl_async_uses_redirect_cache(cache):
+    """Test that the asyncio backend records and reuses chains like probe_purl."""
+    with FakeCatalogServer(redirect_hops=2) as server:
+        resource = server.resources(1, start=3)[0]
+        client = AsyncHttpClient(use_aiohttp=False)
+
+        async def probe_twice():
+            first = await probe_purl_async(resource, client, redirect_cache=cache, head_first=True)
+            second = await probe_purl_async(resource, client, redirect_cache=cache)
+            return first, second
+
+        assert asyncio.run(probe_twice()) == ({'purl_led_to_database': True}, {'purl_led_to_database': True})
+        assert server.head_counts['vendor'] == 1
+        assert server.request_counts['purl'] + server.request_counts['resolver'] == 3
+        assert cache.stats() == {'hits': 1, 'misses': 1}
+
+@pytest.mark.parametrize('backend', ['threads', 'asyncio'])
+def test_target_without_expected_text_revalidates_chain(cache, backend):
+    """Test that a cached target no longer showing the expected text is replaced by following the chain again."""
+    with FakeCatalogServer(redirect_hops=1) as server:
+        resource = server.resources(1, start=2)[0]
+        if backend == 'threads':
+            def probe():
+                return probe_purl(resource, client=HttpClient(), redirect_cache=cache)
+        else:
+            def probe():
+                return asyncio.run(probe_purl_async(resource, AsyncHttpClient(use_aiohttp=False),
+                                                    redirect_cache=cache))
+
+        assert probe() == {'purl_led_to_database': True}
+        assert cache.resolve(resource['purl']) == f"{server.base_url}/vendor/2"
+
+        # The vendor moves the database; its old address now answers 200 without the expected text
+        server.landing_route = 'platform'
+        assert probe() == {'purl_led_to_database': True}
+        assert cache.resolve(resource['purl']) == f"{server.base_url}/platform/2"
+        assert server.request_counts['vendor'] == 2
+
+def test_shared_fetch_revalidates_mismatched_target(cache):
+    """Test that the shared landing page fetch also follows the chain again on a mismatch."""
+    from database360.probe_resources.probe_purl import fetch_body_prefix
+
+    with FakeCatalogServer(redirect_hops=1) as server:
+        resource = server.resources(1, start=4)[0]
+        client = HttpClient()
+        fetch_body_prefix(resource['purl'], client, redirect_cache=cache)
+        server.landing_route = 'platform'
+
+        encoding, body = fetch_body_prefix(resource['purl'], client, redirect_cache=cache,
+                                           expected_text=resource['database_home_page_should_contain_text'])
+        assert resource['database_home_page_should_contain_text'].encode('utf-8') in body
+        assert cache.resolve(resource['purl']) == f"{server.base_url}/platform/4"
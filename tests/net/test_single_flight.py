@@ -0,0 +1,84 @@
+"""Tests for run-scoped request coalescing."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from database360.net.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    """Test that concurrent callers wait for the in-flight call instead of repeating it."""
+    single_flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return 'page'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: single_flight.do('url', fetch), range(8)))
+
+    assert results == ['page'] * 8
+    assert len(calls) == 1
+    assert single_flight.stats() == {'hits': 7, 'misses': 1}
+
+def test_completed_values_and_errors_are_reused():
+    """Test that later callers reuse completed values and failures."""
+    single_flight = SingleFlight()
+    assert single_flight.do('a', lambda: 1) == 1
+    assert single_flight.do('a', lambda: 2) == 1
+
+    def fail():
+        raise ValueError('boom')
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            single_flight.do('b', fail)
+    assert single_flight.stats() == {'hits': 2, 'misses': 2}
+
+def test_expected_uses_and_lru_eviction():
+    """Test that declared keys are released after their last use and others are evicted LRU."""
+    single_flight = SingleFlight(max_entries=2)
+    single_flight.expect('shared', 2)
+
+    assert single_flight.expected_uses('shared') == 2
+    single_flight.do('shared', lambda: 'body')
+    assert single_flight.expected_uses('shared') == 1
+    single_flight.do('shared', lambda: 'other')
+    assert single_flight.expected_uses('shared') == 0
+    assert single_flight.do('shared', lambda: 'refetched') == 'refetched'
+
+    single_flight.do('x', lambda: 'x')
+    single_flight.do('y', lambda: 'y')
+    single_flight.do('z', lambda: 'z')
+    assert single_flight.do('x', lambda: 'x2') == 'x2'
+
+def test_interrupted_owner_is_not_shared():
+    """Test that an interrupted call is retried by the next caller."""
+    single_flight = SingleFlight()
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        single_flight.do('a', interrupt)
+    assert single_flight.do('a', lambda: 'ok') == 'ok'
+
+def test_do_async_coalesces_coroutines():
+    """Test that coroutines on one loop share a call."""
+    single_flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'page'
+
+    async def run():
+        return await asyncio.gather(*(single_flight.do_async('url', fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == ['page'] * 5
+    assert len(calls) == 1
+    assert single_flight.stats() == {'hits': 4, 'misses': 1}
@@ -0,0 +1,134 @@
+"""Tests for the catalog listing index."""
+
+import re
+from database360.net.client import HttpClient
+from database360.probe_resources.catalog_index import CatalogIndex, normalize_title
+from database360.probe_resources.probe_catalog import probe_resource
+from database360.probe_runner import ProbeRunner
+from database360.testing.fake_server import FakeCatalogServer
+
+LISTING = '''
+<div id="documents">
+  <article><h3><a href="/catalog/1">Art &amp; Architecture Source</a></h3>
+    <a href="https://purl.example.edu/1">Online access</a></article>
+  <article><h3><a href="/catalog/2">JSTOR: Arts &amp; Sciences</a></h3></article>
+  <article><h3><a href="/catalog/3">Art and Architecture Source</a></h3>
+    <a href="https://purl.example.edu/3">Duplicate</a></article>
+</div>
+<a rel="next" href="/catalog?f%5Bformat%5D%5B%5D=Database&amp;page=2">Next &raquo;</a>
+'''
+
+def test_normalize_title():
+    """Test that case, punctuation, '&' and whitespace are normalized."""
+    assert normalize_title('  Art &  Architecture Source ') == normalize_title('art and architecture source')
+    assert normalize_title('JSTOR: Arts & Sciences') == 'jstor arts and sciences'
+    assert normalize_title('Ｗｅｂ of Science') == 'web of science'
+
+def test_add_page_indexes_records_and_listed_links():
+    """Test that records are indexed with the links following them."""
+    index = CatalogIndex()
+    added, next_url = index.add_page(LISTING, 'https://catalog.example.edu/catalog?q=')
+
+    assert added == 2
+    assert next_url == 'https://catalog.example.edu/catalog?f%5Bformat%5D%5B%5D=Database&page=2'
+    assert index.find_record('Art & Architecture Source') == 'https://catalog.example.edu/catalog/1'
+    assert index.find_record('jstor arts and sciences') == 'https://catalog.example.edu/catalog/2'
+    assert index.find_record('Web of Science') is None
+    assert (index.hits, index.misses) == (2, 1)
+    assert index.find_purl_link_text('https://catalog.example.edu/catalog/1',
+                                     'https://purl.example.edu/1') == 'Online access'
+    # The first record with a title wins, so the duplicate's links are not attributed to it
+    assert index.find_purl_link_text('https://catalog.example.edu/catalog/1', 'https://purl.example.edu/3') is None
+
+def test_build_follows_next_links():
+    """Test that every listing page is crawled through the Next links."""
+    with FakeCatalogServer(listing_count=25, page_size=10) as server:
+        index = CatalogIndex.build(server.listing_url, client=HttpClient())
+
+        assert len(index) == 25
+        assert index.pages == 3
+        assert index.find_record('Synthetic Database 00025') == f"{server.base_url}/catalog/25"
+
+def test_build_with_page_template():
+    """Test that {page} templates are paged until a page adds nothing."""
+    with FakeCatalogServer(listing_count=15, page_size=10) as server:
+        index = CatalogIndex.build(server.listing_url + '&page={page}', client=HttpClient(),
+                                   link_pattern=re.compile(r'/catalog/\d+'))
+
+        assert len(index) == 15
+        assert index.pages == 3
+
+def test_probe_resource_answers_from_index(mocker):
+    """Test that indexed records need no catalog requests and misses fall back to a search."""
+    index = CatalogIndex()
+    index.add_page(LISTING, 'https://catalog.example.edu/catalog')
+    client = mocker.Mock()
+    client.get.return_value.text = '<a href="/catalog/9">Web of Science</a>'
+
+    result = probe_resource('https://catalog.example.edu/catalog?q=',
+                            {'database_name': 'Art & Architecture Source', 'purl': 'https://purl.example.edu/1'},
+                            client=client, catalog_index=index)
+    assert result == {'catalog_url_link': 'https://catalog.example.edu/catalog/1', 'purl_link_text': 'Online access'}
+    client.get.assert_not_called()
+
+    result = probe_resource('https://catalog.example.edu/catalog?q=', {'database_name': 'Web of Science'},
+                            client=client, catalog_index=index)
+    assert result == {'catalog_url_link': 'https://catalog.example.edu/catalog/9'}
+    client.get.assert_called_once_with('https://catalog.example.edu/catalog?q=Web%20of%20Science', use_cache=True)
+
+def test_runner_uses_catalog_listing_url():
+    """Test that a run with a listing URL searches only for unlisted databases."""
+    with FakeCatalogServer(listing_count=20, page_size=10) as server:
+        config = {
+            'catalog_search_url': server.catalog_search_url,
+            'catalog_listing_url': server.listing_url,
+            'host_request_interval': 0,
+            'max_workers': 4,
+        }
+        runner = ProbeRunner(config)
+        results = runner.run_probes(server.resources(21))
+
+        assert all(result['purl_probe'] == {'purl_led_to_database': True} for result in results)
+        assert results[20]['catalog_probe']['purl_link_text'] == 'Access Synthetic Database 00021'
+        # 2 listing pages, then a search and a record page for the one unlisted database
+        assert server.request_counts['catalog'] == 4
+        assert (runner.catalog_index.hits, runner.catalog_index.misses) == (20, 1)
+
+def test_add_contained_names():
+    """Test that names are resolved to the first listed title containing them as whole words."""
+    index = CatalogIndex()
+    index.add_page(LISTING, 'https://catalog.example.edu/catalog?q=')
+
+    added = index.add_contained_names(['JSTOR', 'Art & Architecture Source', 'Arts', 'Sci', None])
+
+    assert added == 2
+    assert index.find_record('JSTOR') == 'https://catalog.example.edu/catalog/2'
+    assert index.find_record('arts') == 'https://catalog.example.edu/catalog/2'
+    assert index.find_record('Sci') is None
+
+def test_find_record_compares_punctuation_heavy_names_as_written():
+    """Test that 'C++' does not resolve to a record titled 'C'."""
+    index = CatalogIndex()
+    index.add_page('<a href="/catalog/1">C</a><a href="/catalog/2">C#: The Language</a>', 'https://catalog.example.edu/')
+
+    assert index.find_record('C++') is None
+    assert index.find_record('C') == 'https://catalog.example.edu/catalog/1'
+    assert index.find_record('c#: the language') == 'https://catalog.example.edu/catalog/2'
+
+def test_runner_matches_partial_titles():
+    """Test that 'Catalog Listing Partial Titles' resolves names contained in a listed title."""
+    with FakeCatalogServer(listing_count=10, page_size=10) as server:
+        config = {
+            'catalog_search_url': server.catalog_search_url,
+            'catalog_listing_url': server.listing_url,
+            'catalog_listing_partial_titles': 'yes',
+            'host_request_interval': 0,
+        }
+        resources = server.resources(2)
+        resources[1]['database_name'] = 'Database 00002'
+        runner = ProbeRunner(config)
+        results = runner.run_probes(resources)
+
+        assert results[1]['catalog_probe']['catalog_url_link'] == f"{server.base_url}/catalog/2"
+        # Only the listing page was requested
+        assert server.request_counts['catalog'] == 1
@@ -0,0 +1,60 @@
+"""Tests for anchor link extraction."""
+
+import pytest
+from database360.probe_resources.link_extractor import (
+    iter_links_htmlparser, iter_links_bs4, get_link_extractor, LINK_EXTRACTORS
+)
+
+SEARCH_PAGE = '''
+    <html>
+        <head><title>Search results</title></head>
+        <body>
+            <a name="top"></a>
+            <div class="document">
+                <h3><a href="/catalog/12345" data-counter="1">Art &amp; Architecture <em>Source</em></a></h3>
+                <a href="http://resolver.library.cornell.edu/misc/8910">Online&nbsp;access</a>
+            </div>
+            <div class="document">
+                <h3><a href='/catalog/67890'>  ARTbibliographies Modern  </a></h3>
+                <a href="/catalog/67890?format=marc">MARC &#x2014; view</a>
+            </div>
+            <a href="/catalog?page=2" class="next">Next &raquo;</a>
+            <a href="/empty"/>
+            <script>var s = "<a href='/not-a-link'>";</script>
+            <a href="/unclosed">Unclosed link
+        </body>
+    </html>
+'''
+
+@pytest.mark.parametrize('html', [
+    SEARCH_PAGE,
+    '<a href="/x">one</a><a href="/y">two</a>',
+    '<p>No links here</p>',
+    '',
+    '<a href="/x">A <a href="/y">B</a> C</a>',
+    '<a href="/a?x=1&amp;y=2">Amp &amp; href</a>' * 2000,
+])
+def test_htmlparser_matches_bs4(html):
+    """Test that the streaming extractor yields the same links as BeautifulSoup."""
+    assert list(iter_links_htmlparser(html)) == list(iter_links_bs4(html))
+
+def test_htmlparser_decodes_entities_and_nested_text():
+    """Test that entities are decoded and text of nested tags is included."""
+    links = list(iter_links_htmlparser(SEARCH_PAGE))
+    assert links[0] == (None, '')
+    assert links[1] == ('/catalog/12345', 'Art & Architecture Source')
+    assert links[2] == ('http://resolver.library.cornell.edu/misc/8910', 'Online\xa0access')
+
+def test_htmlparser_stops_early():
+    """Test that links are yielded before the whole page has been parsed."""
+    html = '<a href="/first">First</a>' + '<p>filler</p>' * 10000
+    links = iter_links_htmlparser(html)
+    assert next(links) == ('/first', 'First')
+
+def test_get_link_extractor():
+    """Test extractor lookup by name."""
+    assert get_link_extractor() is iter_links_htmlparser
+    assert get_link_extractor(' BS4 ') is iter_links_bs4
+    assert set(LINK_EXTRACTORS) >= {'htmlparser', 'bs4'}
+    with pytest.raises(ValueError):
+        get_link_extractor('regex')
@@ -0,0 +1,63 @@
+"""Tests for the precompiled link and name matchers."""
+
+import random
+import re
+from database360.probe_resources.matching import NameMatcher, compile_link_pattern, normalize_name, normalize_title
+
+def test_compile_link_pattern_is_cached():
+    """Test that a pattern is compiled once and an empty one means no pattern."""
+    assert compile_link_pattern(r'/catalog/\d+') is compile_link_pattern(r'/catalog/\d+')
+    assert compile_link_pattern(None) is None
+    assert compile_link_pattern('') is None
+
+def test_find_overlapping_names():
+    """Test that every contained name is found, including names inside other names."""
+    matcher = NameMatcher(['Art Source', 'Art & Architecture Source', 'Architecture', 'art source'])
+
+    assert len(matcher) == 4
+    assert matcher.find('ART and Architecture Source (EBSCO)') == ['Architecture', 'Art & Architecture Source']
+    assert matcher.find('Art Source') == ['Art Source', 'art source']
+    assert matcher.find('Web of Science') == []
+
+def test_find_whole_words():
+    """Test that whole_words only matches names at word boundaries."""
+    assert NameMatcher(['Art']).find('Smart Databases') == ['Art']
+    assert NameMatcher(['Art'], whole_words=True).find('Smart Databases') == []
+    assert NameMatcher(['Art'], whole_words=True).find('Art: Databases') == ['Art']
+
+def test_find_agrees_with_substring_search():
+    """Test the automaton against a brute force search on random names."""
+    rng = random.Random(7)
+    for _ in range(50):
+        names = [''.join(rng.choice('ab ') for _ in range(rng.randint(1, 4))) for _ in range(8)]
+        text = ''.join(rng.choice('ab ') for _ in range(20))
+        matcher = NameMatcher(names)
+        expected = {name for name in matcher.names if normalize_title(name) in normalize_title(text)}
+        assert set(matcher.find(text)) == expected
+
+def test_match_links_keeps_first_matching_href():
+    """Test that each name maps to the first link containing it whose href matches the pattern."""
+    links = [
+        (None, 'JSTOR'),
+        ('/search?q=jstor', 'JSTOR'),
+        ('/catalog/1', 'JSTOR: Arts & Sciences'),
+        ('/catalog/2', 'JSTOR Arts and Sciences II'),
+        ('/catalog/3', 'Web of Science'),
+    ]
+    matcher = NameMatcher(['JSTOR', 'JSTOR Arts and Sciences', 'Scopus'])
+
+    assert matcher.match_links(links, re.compile(r'/catalog/\d+')) == {
+        'JSTOR': '/catalog/1',
+        'JSTOR Arts and Sciences': '/catalog/1',
+    }
+    assert matcher.match_links(links)['JSTOR'] == '/search?q=jstor'
+
+def test_punctuation_heavy_names_are_not_normalized():
+    """Test that names losing most of their characters to normalization are ignored."""
+    assert normalize_name('C++') == ''
+    assert normalize_name('AT&T') == 'at and t'
+
+    matcher = NameMatcher(['C++', 'Web of Science'])
+
+    assert matcher.names == ['Web of Science']
+    assert matcher.find('C Programming, Web of Science') == ['Web of Science']
@@ -0,0 +1,72 @@
+"""Tests for link extraction in worker processes."""
+
+import asyncio
+from database360.probe_resources.link_extractor import iter_links_bs4, iter_links_htmlparser
+from database360.probe_resources.parse_pool import ParsePool, prepare_extractor_async
+from database360.probe_runner import ProbeRunner
+from database360.testing.fake_server import FakeCatalogServer
+
+PAGE = '<p><a href="/catalog/1">Web of <b>Science</b></a><a>No href</a></p><a href="/catalog/2">JSTOR'
+
+def test_from_config():
+    """Test that the pool is only created when 'Parse Workers' is set."""
+    assert ParsePool.from_config({}) is None
+    assert ParsePool.from_config({'parse_workers': '0'}) is None
+
+    pool = ParsePool.from_config({'parse_workers': '3'}, iter_links_bs4)
+    assert (pool.workers, pool.queue_size, pool.link_extractor) == (3, 6, iter_links_bs4)
+    assert ParsePool.from_config({'parse_workers': 3, 'parse_queue_size': 1}).queue_size == 1
+
+def test_extract_matches_extractor():
+    """Test that a page parsed in a worker yields the same links as the extractor in process."""
+    pool = ParsePool(2)
+    try:
+        assert list(pool(PAGE)) == list(iter_links_htmlparser(PAGE))
+        assert pool.extract('') == []
+        assert pool.stats()['pages'] == 2
+    finally:
+        pool.close()
+
+def test_prepare_extractor_async():
+    """Test that async probes get an extractor replaying the links parsed in the pool."""
+    pool = ParsePool(1)
+    try:
+        extractor = asyncio.run(prepare_extractor_async(PAGE, pool))
+        assert list(extractor(PAGE)) == list(iter_links_htmlparser(PAGE))
+    finally:
+        pool.close()
+
+    assert asyncio.run(prepare_extractor_async(PAGE, iter_links_bs4)) is iter_links_bs4
+
+def test_runner_with_parse_workers():
+    """Test that both backends give the same results with pages parsed in worker processes."""
+    with FakeCatalogServer() as server:
+        resources = server.resources(6)
+        for backend in ('threads', 'asyncio'):
+            config = {
+                'catalog_search_url': server.catalog_search_url,
+                'host_request_interval': 0,
+                'max_workers': 3,
+                'parse_workers': 2,
+                'parse_queue_size': 1,
+                'probe_backend': backend,
+            }
+            runner = ProbeRunner(config)
+            results = runner.run_probes(resources)
+
+            assert [result['catalog_probe']['purl_link_text'] for result in results] == \
+                [f"Access Synthetic Database {number:05d}" for number in range(1, 7)]
+            # A search page and a record page for each resource
+            assert runner.summary['parse_pool']['pages'] == 12
+            assert runner.parse_pool._executor is None
+
+def test_submit_returns_before_the_page_is_parsed():
+    """Test that submit hands back a future and frees the queue slot once the page is parsed."""
+    pool = ParsePool(1, queue_size=1)
+    try:
+        futures = [pool.submit(PAGE), pool.submit('')]
+        assert [future.result() for future in futures] == [list(iter_links_htmlparser(PAGE)), []]
+        assert asyncio.run(pool.extract_async(PAGE)) == list(iter_links_htmlparser(PAGE))
+        assert pool.stats()['pages'] == 3
+    finally:
+        pool.close()
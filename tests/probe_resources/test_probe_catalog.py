@@ -3,21 +3,21 @@
 import pytest
 import requests
 import time
-from database360.probe_resources.probe_catalog import probe_resource, HEADERS
+from database360.probe_resources.probe_catalog import match_database_link, probe_resource
 
-def test_probe_resource():
+def test_probe_resource(fake_catalog):
     """Test that probe_resource returns expected results."""
     resource = {'database_name': 'Test DB'}
-    catalog_url = 'http://example.com'
+    catalog_url = fake_catalog.catalog_search_url
 
     result = probe_resource(catalog_url, resource)
     assert isinstance(result, dict)
-    assert result == {}  # Should return empty dict for invalid URL
+    assert result == {}  # Should return empty dict when the catalog has no match
 
-def test_probe_resource_with_custom_matcher():
+def test_probe_resource_with_custom_matcher(fake_catalog):
     """Test probe_resource with custom link matcher."""
-    resource = {'database_name': 'Test DB'}
-    catalog_url = 'http://example.com'
+    resource = {'database_name': 'Synthetic Database 00001'}
+    catalog_url = fake_catalog.catalog_search_url
 
     # Test with a custom pattern that won't match anything
     result = probe_resource(catalog_url, resource, link_matcher=r'/custom/pattern/')
@@ -45,9 +45,9 @@ def test_probe_resource_no_matcher(mocker):
         </html>
     '''
 
-    # Mock requests.get
-    mock_get = mocker.patch('requests.get')
-    mock_get.side_effect = [mock_search_response, mock_catalog_response]
+    # Mock the HTTP client
+    mock_client = mocker.Mock()
+    mock_client.get.side_effect = [mock_search_response, mock_catalog_response]
 
     # Test data
     catalog_search_url = "https://catalog.library.cornell.edu/catalog"
@@ -57,19 +57,17 @@ def test_probe_resource_no_matcher(mocker):
     }
 
     # Run the probe with no matcher (should find first link)
-    result = probe_resource(catalog_search_url, resource)
+    result = probe_resource(catalog_search_url, resource, client=mock_client)
     assert result['catalog_url_link'] == 'https://catalog.library.cornell.edu/other/link'
     assert result['purl_link_text'] == 'Click here for Art & Architecture Source'
 
-    # Verify the requests were made with the correct headers
-    calls = mock_get.call_args_list
+    # Verify the requests went through the client
+    calls = mock_client.get.call_args_list
     assert len(calls) == 2  # One call for search, one for PURL
-    assert all(call.kwargs.get('headers') == HEADERS for call in calls)
+    assert calls[0].args[0] == catalog_search_url + 'Art%20%26%20Architecture%20Source'
+    assert calls[1].args[0] == 'https://catalog.library.cornell.edu/other/link'
 
 def test_probe_resources_art_architecture(mocker):
-    # Mock sleep to avoid delays in tests
-    mocker.patch('time.sleep')
-
     # Mock responses for both the search and catalog pages
     mock_search_response = mocker.Mock()
     mock_search_response.text = '''
@@ -90,8 +88,8 @@ def test_probe_resources_art_architecture(mocker):
         </html>
     '''
 
-    mock_get = mocker.patch('requests.get')
-    mock_get.side_effect = [mock_search_response, mock_catalog_response]
+    mock_client = mocker.Mock()
+    mock_client.get.side_effect = [mock_search_response, mock_catalog_response]
 
     # Test data
     catalog_search_url = "https://catalog.library.cornell.edu/catalog"
@@ -101,20 +99,45 @@ def test_probe_resources_art_architecture(mocker):
     }
 
     # Run the probe with default matcher (should find /catalog/ link)
-    result = probe_resource(catalog_search_url, resource, link_matcher=r'/catalog/')
+    result = probe_resource(catalog_search_url, resource, link_matcher=r'/catalog/', client=mock_client)
     assert result['catalog_url_link'] == 'https://catalog.library.cornell.edu/catalog/12345'
     assert result['purl_link_text'] == 'Click here for Art & Architecture Source'
 
     # Reset mocks
-    mock_get.reset_mock()
-    mock_get.side_effect = [mock_search_response, mock_catalog_response]
+    mock_client.get.reset_mock()
+    mock_client.get.side_effect = [mock_search_response, mock_catalog_response]
 
     # Run the probe with custom matcher (should find /other/link)
-    result = probe_resource(catalog_search_url, resource, link_matcher=r'/other/')
+    result = probe_resource(catalog_search_url, resource, link_matcher=r'/other/', client=mock_client)
     assert result['catalog_url_link'] == 'https://catalog.library.cornell.edu/other/link'
     assert result['purl_link_text'] == 'Click here for Art & Architecture Source'
 
-    # Verify the requests were made with the correct headers
-    calls = mock_get.call_args_list
+    # Verify the requests went through the client
+    calls = mock_client.get.call_args_list
     assert len(calls) == 2  # One call for search, one for PURL
-    assert all(call.kwargs.get('headers') == HEADERS for call in calls)
+
+def test_probe_resource_request_error(mocker):
+    """Test that a failed catalog search yields an empty result."""
+    mock_client = mocker.Mock()
+    mock_client.get.side_effect = requests.Timeout('timed out')
+
+    result = probe_resource('https://catalog.example.edu/catalog?q=', {'database_name': 'Test DB'},
+                            client=mock_client)
+    assert result == {}
+
+def test_match_database_link_normalizes_names():
+    """Test that link texts are compared with the database name after normalization."""
+    html = '<a href="/catalog/1">JSTOR: Arts &amp; Sciences</a>'
+
+    assert match_database_link(html, 'https://catalog.example.edu/', 'jstor arts and sciences') == \
+        'https://catalog.example.edu/catalog/1'
+    assert match_database_link(html, 'https://catalog.example.edu/', ': -') is None
+
+def test_match_database_link_keeps_punctuation_heavy_names():
+    """Test that a name that is mostly punctuation is only matched as written."""
+    html = ('<a href="/catalog/1">C Programming Abstracts</a>'
+            '<a href="/catalog/2">C++ Reference Library</a>')
+
+    assert match_database_link(html, 'https://catalog.example.edu/', 'C++') == \
+        'https://catalog.example.edu/catalog/2'
+    assert match_database_link(html, 'https://catalog.example.edu/', 'C#') is None
@@ -2,7 +2,8 @@
 
 import pytest
 import requests
-from database360.probe_resources.probe_purl import probe_purl
+from database360.config.records import Resource
+from database360.probe_resources.probe_purl import probe_purl, purl_probe_inputs, stream_contains_text
 
 def test_probe_purl_empty_resource():
     """Test probe_purl with empty resource."""
@@ -27,6 +28,13 @@ def test_probe_purl_empty_values():
     result = probe_purl(resource)
     assert result == {}
 
+def test_purl_probe_inputs():
+    """Test that empty, None and NaN values become empty strings for dictionaries and resources."""
+    assert purl_probe_inputs({'purl': None, 'database_home_page_should_contain_text': float('nan')}) == ('', '')
+    assert purl_probe_inputs({'purl': ' http://example.com ', 'database_home_page_should_contain_text': 'Text'}) == \
+        ('http://example.com', 'Text')
+    assert purl_probe_inputs(Resource(database_name='DB', purl=' http://example.com ')) == ('http://example.com', '')
+
 def test_probe_purl_missing_text():
     """Test probe_purl with missing expected text."""
     resource = {'purl': 'http://example.com'}
@@ -35,62 +43,92 @@ def test_probe_purl_missing_text():
 
 def test_probe_purl_success(mocker):
     """Test probe_purl with successful match."""
-    # Mock the requests session
-    mock_session = mocker.Mock()
+    # Mock the HTTP client
+    mock_client = mocker.Mock()
     mock_response = mocker.Mock()
-    mock_response.text = 'Welcome to Test Database'
+    mock_response.encoding = 'utf-8'
+    mock_response.iter_content.return_value = [b'Welcome to Test Database']
     mock_response.raise_for_status = mocker.Mock()
-    mock_session.get.return_value = mock_response
-    
-    mocker.patch('requests.Session', return_value=mock_session)
+    mock_client.get.return_value = mock_response
     
     resource = {
         'purl': 'http://example.com/db',
         'database_home_page_should_contain_text': 'Test Database'
     }
     
-    result = probe_purl(resource)
+    result = probe_purl(resource, client=mock_client)
     assert result == {'purl_led_to_database': True}
     
     # Verify the request was made with correct parameters
-    mock_session.get.assert_called_once_with(
+    mock_client.get.assert_called_once_with(
         'http://example.com/db',
-        headers=mocker.ANY,
         allow_redirects=True,
-        timeout=30
+        stream=True
     )
+    mock_response.close.assert_called_once()
 
 def test_probe_purl_no_match(mocker):
     """Test probe_purl with no text match."""
-    # Mock the requests session
-    mock_session = mocker.Mock()
+    # Mock the HTTP client
+    mock_client = mocker.Mock()
     mock_response = mocker.Mock()
-    mock_response.text = 'Different content'
+    mock_response.encoding = 'utf-8'
+    mock_response.iter_content.return_value = [b'Different content']
     mock_response.raise_for_status = mocker.Mock()
-    mock_session.get.return_value = mock_response
-    
-    mocker.patch('requests.Session', return_value=mock_session)
+    mock_client.get.return_value = mock_response
     
     resource = {
         'purl': 'http://example.com/db',
         'database_home_page_should_contain_text': 'Test Database'
     }
     
-    result = probe_purl(resource)
+    result = probe_purl(resource, client=mock_client)
     assert result == {'purl_led_to_database': False}
 
 def test_probe_purl_request_error(mocker):
     """Test probe_purl with request error."""
-    # Mock the requests session to raise an exception
-    mock_session = mocker.Mock()
-    mock_session.get.side_effect = requests.RequestException('Connection error')
-    
-    mocker.patch('requests.Session', return_value=mock_session)
+    # Mock the HTTP client to raise an exception
+    mock_client = mocker.Mock()
+    mock_client.get.side_effect = requests.RequestException('Connection error')
     
     resource = {
         'purl': 'http://example.com/db',
         'database_home_page_should_contain_text': 'Test Database'
     }
     
-    result = probe_purl(resource)
+    result = probe_purl(resource, client=mock_client)
     assert result == {}
+
+def make_stream_response(mocker, chunks, encoding='utf-8'):
+    """Build a mock streamed response yielding the given byte chunks."""
+    response = mocker.Mock()
+    response.encoding = encoding
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+def test_stream_contains_text_across_chunk_boundary(mocker):
+    """Test that a match split over two chunks is found case-insensitively."""
+    response = make_stream_response(mocker, [b'<html>Welcome to TEST DA', b'TABASE home</html>'])
+    assert stream_contains_text(response, 'test database') is True
+
+def test_stream_contains_text_multibyte_boundary(mocker):
+    """Test that a multi-byte character split across chunks is decoded correctly."""
+    body = 'Bienvenue à la Base de données'.encode('utf-8')
+    split = body.index('é'.encode('utf-8')) + 1
+    response = make_stream_response(mocker, [body[:split], body[split:]])
+    assert stream_contains_text(response, 'BASE DE DONNÉES') is True
+
+def test_stream_contains_text_stops_early(mocker):
+    """Test that reading stops once the text is found."""
+    chunks = iter([b'Test Database', b'never read'])
+    response = mocker.Mock()
+    response.encoding = 'utf-8'
+    response.iter_content.return_value = chunks
+
+    assert stream_contains_text(response, 'test database') is True
+    assert next(chunks) == b'never read'
+
+def test_stream_contains_text_byte_cap(mocker):
+    """Test that text beyond max_bytes is not searched."""
+    response = make_stream_response(mocker, [b'x' * 100, b'Test Database'])
+    assert stream_contains_text(response, 'Test Database', max_bytes=105) is False
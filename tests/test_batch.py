@@ -0,0 +1,112 @@
+"""Tests for multi-institution batch mode."""
+
+import json
+from concurrent.futures import Future
+import pytest
+from database360.batch import (
+    BatchInstitution, BatchRunner, institution_name, load_institutions, main, shared_client_config
+)
+
+def write_workbook(path, settings, resources):
+    """Write a configuration workbook with the given Institution settings and resources."""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    institution = workbook.active
+    institution.title = 'Institution'
+    institution.append(['Setting', 'Value'])
+    for setting, value in settings.items():
+        institution.append([setting, value])
+
+    sheet = workbook.create_sheet('Resources')
+    sheet.append(['Database Name', 'PURL', 'Database Home Page Should Contain Text'])
+    for resource in resources:
+        sheet.append([resource['database_name'], resource['purl'], resource['database_home_page_should_contain_text']])
+    workbook.save(path)
+    return str(path)
+
+def fake_institution(fake_catalog, name, count, start=1, max_workers=1):
+    config = {'catalog_search_url': fake_catalog.catalog_search_url, 'host_request_interval': 0,
+              'max_workers': max_workers}
+    return BatchInstitution(name, name, config, fake_catalog.resources(count, start))
+
+def test_institution_name():
+    """Test that names come from the setting, a workbook file name or a Google Sheet ID."""
+    assert institution_name({'institution_name': 'Bowdoin College'}, 'x.xlsx') == 'bowdoin-college'
+    assert institution_name({}, '/data/Colby Configuration.xlsx') == 'colby-configuration'
+    assert institution_name({}, 'https://docs.google.com/spreadsheets/d/1AbC_d-9/edit#gid=0') == '1abc-d-9'
+
+def test_dispatch_is_round_robin_within_per_institution_limits(fake_catalog):
+    """Test that institutions take turns and none exceeds its own Max Workers."""
+    institutions = [fake_institution(fake_catalog, 'large', 6, max_workers=2),
+                    fake_institution(fake_catalog, 'small', 2, start=100)]
+    runner = BatchRunner(institutions, max_workers=10)
+    for institution in institutions:
+        runner._start(institution)
+    runner._active.extend(institutions)
+
+    submitted = []
+
+    class RecordingExecutor:
+        def submit(self, fn, index, total, resource, full):
+            submitted.append(resource['database_name'])
+            return Future()
+
+    pending = {}
+    runner._dispatch(RecordingExecutor(), pending, full=False)
+    assert submitted == ['Synthetic Database 00001', 'Synthetic Database 00100', 'Synthetic Database 00002']
+    assert [i.in_flight for i in institutions] == [2, 1]
+    runner.client.close()
+
+def test_batch_writes_one_result_file_per_institution(fake_catalog, tmp_path):
+    """Test that a batch probes every institution on the shared client and keeps each file in input order."""
+    institutions = [fake_institution(fake_catalog, 'first', 5, max_workers=2),
+                    fake_institution(fake_catalog, 'second', 3, start=50)]
+    runner = BatchRunner(institutions, output_dir=str(tmp_path))
+    summaries = runner.run()
+
+    assert runner.max_workers == 3
+    assert all(i.runner.client is runner.client for i in institutions)
+    assert {name: s['probed'] for name, s in summaries.items()} == {'first': 5, 'second': 3}
+    for institution in institutions:
+        lines = (tmp_path / f"{institution.name}.jsonl").read_text().splitlines()
+        results = [json.loads(line) for line in lines]
+        assert [r['database_name'] for r in results] == [r['database_name'] for r in institution.resources]
+        assert all(r['purl_probe'] == {'purl_led_to_database': True} for r in results)
+
+def test_main_loads_each_configuration(fake_catalog, tmp_path):
+    """Test that the command line loads every workbook, skips unreadable ones and reports them."""
+    sources = []
+    for number, name in enumerate(['Alpha Library', 'Beta Library']):
+        settings = {'Institution Name': name, 'Catalog Search URL': fake_catalog.catalog_search_url,
+                    'Host Request Interval': 0}
+        sources.append(write_workbook(tmp_path / f"{number}.xlsx", settings, fake_catalog.resources(2, 10 * number + 1)))
+    missing = str(tmp_path / 'missing.xlsx')
+
+    assert len(load_institutions(sources, cache_dir=None)) == 2
+    exit_code = main(sources + [missing, '--output-dir', str(tmp_path / 'out'), '--format', 'csv',
+                                '--result-store-dir', str(tmp_path / 'stores'), '--cache-dir', str(tmp_path / 'cache')])
+
+    assert exit_code == 1
+    assert sorted(p.name for p in (tmp_path / 'out').iterdir()) == ['alpha-library.csv', 'beta-library.csv']
+    assert sorted(p.name for p in (tmp_path / 'stores').iterdir()) == ['alpha-library.sqlite', 'beta-library.sqlite']
+
+def test_shared_client_uses_most_polite_settings(fake_catalog, tmp_path):
+    """Test that the shared client takes the slowest pacing and fewest retries of all institutions."""
+    first = {'catalog_search_url': fake_catalog.catalog_search_url, 'host_request_interval': 0.5,
+             'request_retries': 5, 'http_cache_dir': str(tmp_path / 'cache')}
+    second = {'catalog_search_url': fake_catalog.catalog_search_url, 'host_request_interval': 3,
+              'request_retries': 1, 'max_request_rate': 2}
+
+    shared = shared_client_config([first, second])
+    assert shared['host_request_interval'] == 3
+    assert shared['request_retries'] == 1
+    assert shared['max_request_rate'] == 2
+    assert shared['http_cache_dir'] == str(tmp_path / 'cache')
+
+    runner = BatchRunner([BatchInstitution('first', 'first', first, []),
+                          BatchInstitution('second', 'second', second, [])])
+    adapter = runner.client.session.get_adapter(fake_catalog.catalog_search_url)
+    assert adapter.max_retries.total == 1
+    assert runner.client.retries == 1
+    runner.client.close()
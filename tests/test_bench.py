@@ -0,0 +1,32 @@
+"""Tests for the probe benchmark."""
+
+import json
+from database360.bench import main, percentile, run_benchmarks
+
+def test_percentile():
+    """Test nearest-rank percentiles."""
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile([], 0.5) == 0.0
+
+def test_run_benchmarks_reports_measurements():
+    """Test that every synthetic resource is matched and measured."""
+    measurements = run_benchmarks(sizes=[10, 5], max_workers=4)
+
+    assert [m['resources'] for m in measurements] == [5, 10]
+    for m in measurements:
+        assert m['matched'] == m['resources']
+        assert m['resources_per_second'] > 0
+        assert m['p50_ms'] <= m['p95_ms']
+
+def test_run_benchmarks_asyncio_backend():
+    """Test the benchmark with the asyncio backend."""
+    measurements = run_benchmarks(sizes=[5], backend='asyncio')
+    assert measurements[0]['matched'] == 5
+
+def test_main_min_rate(capsys):
+    """Test the JSON output and the --min-rate exit code."""
+    assert main(['--sizes', '3', '--json']) == 0
+    assert json.loads(capsys.readouterr().out)[0]['resources'] == 3
+    assert main(['--sizes', '3', '--min-rate', '1e9']) == 1
@@ -0,0 +1,49 @@
+"""Tests for run checkpoints."""
+
+import pytest
+from database360.checkpoint import Checkpoint
+
+def test_checkpoint_records_and_loads(tmp_path):
+    """Test that recorded results can be loaded by a later run."""
+    checkpoint = Checkpoint(tmp_path / 'checkpoint.jsonl')
+    checkpoint.start()
+    checkpoint.record({'database_name': 'Test DB 1', 'catalog_probe': {}, 'purl_probe': {}})
+    checkpoint.close()
+
+    assert set(Checkpoint(tmp_path / 'checkpoint.jsonl').load()) == {'Test DB 1'}
+
+def test_checkpoint_ignores_truncated_line(tmp_path):
+    """Test that a partially written last line does not break loading or resuming."""
+    path = tmp_path / 'checkpoint.jsonl'
+    path.write_text('{"database_name": "Test DB 1"}\n{"database_name": "Tes')
+
+    checkpoint = Checkpoint(path)
+    assert set(checkpoint.load()) == {'Test DB 1'}
+
+    checkpoint.start(resume=True)
+    checkpoint.record({'database_name': 'Test DB 2'})
+    checkpoint.close()
+    assert set(checkpoint.load()) == {'Test DB 1', 'Test DB 2'}
+
+def test_checkpoint_start_without_resume_clears(tmp_path):
+    """Test that starting a fresh run discards the previous checkpoint."""
+    path = tmp_path / 'checkpoint.jsonl'
+    path.write_text('{"database_name": "Test DB 1"}\n')
+
+    checkpoint = Checkpoint(path)
+    checkpoint.start()
+    checkpoint.close()
+    assert checkpoint.load() == {}
+
+def test_checkpoint_of_other_configuration_ignored(tmp_path):
+    """Test that results recorded for another configuration are not loaded."""
+    path = tmp_path / 'checkpoint.jsonl'
+    checkpoint = Checkpoint(path)
+    checkpoint.start(config_id='alpha')
+    checkpoint.record({'database_name': 'Test DB 1'}, fingerprint='abc')
+    checkpoint.close()
+
+    assert Checkpoint(path).load('alpha') == {
+        'Test DB 1': {'fingerprint': 'abc', 'result': {'database_name': 'Test DB 1'}}
+    }
+    assert Checkpoint(path).load('beta') == {}
@@ -0,0 +1,112 @@
+"""Tests for the command line interface."""
+
+import datetime
+import json
+import subprocess
+import sys
+import time
+import pytest
+from openpyxl import Workbook
+from database360.cli import main, parse_deadline
+
+def test_validate_config_accepts_valid_workbook(workbook_file, tmp_path, capsys):
+    """Test that a valid workbook passes with its resource count and no errors."""
+    exit_code = main(['validate-config', '--config', workbook_file, '--cache-dir', str(tmp_path)])
+
+    output = capsys.readouterr().out
+    assert exit_code == 0
+    assert output.splitlines()[-1] == '2 resources, 0 errors, 0 warnings'
+
+def test_validate_config_reports_errors(tmp_path, capsys):
+    """Test that problems are printed and make the command fail."""
+    workbook = Workbook()
+    institution = workbook.active
+    institution.title = 'Institution'
+    institution.append(['Setting', 'Value'])
+    institution.append(['Catalog Search URL', 'catalog.example.edu'])
+    resources = workbook.create_sheet('Resources')
+    resources.append(['Database Name', 'PURL', 'Database Home Page Should Contain Text'])
+    resources.append(['Test DB', 'https://resolver.example.edu/1', None])
+    path = tmp_path / 'Bad.xlsx'
+    workbook.save(path)
+
+    exit_code = main(['validate-config', '--config', str(path), '--cache-dir', str(tmp_path / 'cache')])
+
+    output = capsys.readouterr().out
+    assert exit_code == 1
+    assert "ERROR: 'Catalog Search URL' is not an http(s) URL: 'catalog.example.edu'" in output
+    assert "WARNING: Resources row 2: the PURL probe needs both" in output
+    assert output.splitlines()[-1] == '1 resources, 1 errors, 1 warnings'
+
+def test_probe_one_against_fake_catalog(fake_catalog, capsys):
+    """Test that probe-one probes an inline resource and succeeds when its PURL matches."""
+    resource = fake_catalog.resources(1, start=4)[0]
+
+    exit_code = main(['probe-one', resource['database_name'],
+                      '--catalog-search-url', fake_catalog.catalog_search_url, '--links-match', r'/catalog/\d+',
+                      '--purl', resource['purl'],
+                      '--expect-text', resource['database_home_page_should_contain_text']])
+
+    result = json.loads(capsys.readouterr().out)
+    assert exit_code == 0
+    assert result['catalog_probe']['catalog_url_link'] == f"{fake_catalog.base_url}/catalog/4"
+    assert result['purl_probe'] == {'purl_led_to_database': True}
+
+def test_probe_one_unknown_resource(workbook_file, tmp_path, capsys):
+    """Test that a name missing from the Resources sheet is reported without probing."""
+    exit_code = main(['probe-one', 'No Such DB', '--config', workbook_file, '--cache-dir', str(tmp_path)])
+
+    assert exit_code == 2
+    assert "No resource named 'No Such DB'" in capsys.readouterr().err
+
+def test_passthrough_commands_accept_their_own_options(capsys):
+    """Test that options after batch and bench reach the subcommand's own parser."""
+    assert main(['bench', '--sizes', '1']) == 0
+    assert 'resources' in capsys.readouterr().out
+
+    with pytest.raises(SystemExit) as exit_info:
+        main(['batch', '--help'])
+    assert exit_info.value.code == 0
+    assert '--sources-file' in capsys.readouterr().out
+
+def test_import_does_not_load_heavy_dependencies():
+    """Test that importing the CLI and building its parser leaves pandas, requests and openpyxl unloaded."""
+    code = ("import sys; from database360.cli import build_parser; build_parser(); "
+            "print(sorted(m for m in ('pandas', 'requests', 'openpyxl', 'aiohttp') if m in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == '[]'
+
+def test_parse_deadline():
+    """Test that --deadline takes the next occurrence of a time of day or a full date and time."""
+    a_minute_ago = (datetime.datetime.now() - datetime.timedelta(minutes=1)).strftime('%H:%M')
+    assert 0 < parse_deadline(a_minute_ago) - time.time() <= 86400
+    assert parse_deadline('2030-01-02T03:04') == datetime.datetime(2030, 1, 2, 3, 4).timestamp()
+    with pytest.raises(SystemExit):
+        main(['probe', '--deadline', 'tomorrow'])
+
+def test_probe_streams_csv_resources(fake_catalog, tmp_path):
+    """Test that probe --stream writes the results of a resources CSV file to the output in order."""
+    workbook = Workbook()
+    institution = workbook.active
+    institution.title = 'Institution'
+    institution.append(['Setting', 'Value'])
+    institution.append(['Catalog Search URL', fake_catalog.catalog_search_url])
+    institution.append(['Host Request Interval', 0])
+    config = tmp_path / 'Configuration.xlsx'
+    workbook.save(config)
+    resources = fake_catalog.resources(3)
+    csv_file = tmp_path / 'resources.csv'
+    csv_file.write_text('Database Name,PURL,Database Home Page Should Contain Text\n' + ''.join(
+        f"{r['database_name']},{r['purl']},{r['database_home_page_should_contain_text']}\n" for r in resources))
+    output = tmp_path / 'results.jsonl'
+
+    exit_code = main(['probe', '--stream', '--config', str(config), '--resources', str(csv_file),
+                      '--output', str(output), '--cache-dir', str(tmp_path / 'cache'),
+                      '--result-store', str(tmp_path / 'results.sqlite'),
+                      '--checkpoint', str(tmp_path / 'checkpoint.jsonl')])
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert exit_code == 0
+    assert [r['database_name'] for r in results] == [r['database_name'] for r in resources]
+    assert all(r['purl_probe'] == {'purl_led_to_database': True} for r in results)
@@ -0,0 +1,63 @@
+"""Tests for probe instrumentation."""
+
+from unittest.mock import Mock
+from database360 import instrumentation
+from database360.instrumentation import ProbeMetrics, RunSummary, retry_count
+
+def test_records_are_ignored_without_a_collector():
+    """Test that probes called on their own record nothing."""
+    with instrumentation.phase('search_fetch'):
+        instrumentation.record_response([200])
+        instrumentation.record_bytes(10)
+    metrics = ProbeMetrics()
+    assert metrics.as_dict()['requests'] == 0
+
+def test_responses_are_attributed_to_the_current_phase():
+    """Test that responses, redirects, cache hits and waits land in the enclosing phase."""
+    metrics = ProbeMetrics()
+    with metrics.activate():
+        with instrumentation.phase('search_fetch'):
+            instrumentation.record_wait(0.5)
+            instrumentation.record_response([200], body_bytes=100)
+        with instrumentation.phase('purl_fetch'):
+            instrumentation.record_response([301, 302, 200], retries=1)
+            instrumentation.record_bytes(50)
+        instrumentation.record_cache_hit()
+
+    result = metrics.as_dict()
+    assert result['phases']['search_fetch']['requests'] == 1
+    assert result['phases']['search_fetch']['rate_limit_wait'] == 0.5
+    assert result['phases']['purl_fetch']['redirects'] == 2
+    assert result['phases']['purl_fetch']['bytes'] == 50
+    assert result['phases']['other']['cache_hits'] == 1
+    assert result['status_codes'] == {'200': 2, '301': 1, '302': 1}
+    assert result['requests'] == 4
+    assert result['retries'] == 1
+    assert result['bytes'] == 150
+    assert result['seconds'] >= 0
+
+def test_retry_count_reads_urllib3_history():
+    """Test that retries of the final response and its redirects are summed, and mocks count as none."""
+    redirect = Mock()
+    redirect.raw.retries.history = ('first',)
+    response = Mock(history=[redirect])
+    response.raw.retries.history = ('first', 'second')
+    assert retry_count(response) == 3
+    assert retry_count(Mock()) == 0
+
+def test_run_summary_aggregates_resources():
+    """Test that the run summary adds up probed resources and counts reused ones."""
+    summary = RunSummary(total=3)
+    for led_to_database in (True, False):
+        metrics = ProbeMetrics()
+        with metrics.activate(), metrics.phase('purl_fetch'):
+            instrumentation.record_response([302, 200], body_bytes=10)
+        summary.add_probed({'catalog_probe': {}, 'purl_probe': {'purl_led_to_database': led_to_database}}, metrics)
+    summary.add_reused()
+
+    result = summary.as_dict(backend='threads')
+    assert (result['resources'], result['probed'], result['reused']) == (3, 2, 1)
+    assert result['purl_matches'] == 1
+    assert result['phases']['purl_fetch']['requests'] == 4
+    assert result['status_codes'] == {'302': 2, '200': 2}
+    assert result['backend'] == 'threads'
@@ -0,0 +1,73 @@
+"""Tests for metrics exporters."""
+
+import json
+import pytest
+from database360.instrumentation import ProbeMetrics, RunSummary, record_response
+from database360.metrics_exporters import (
+    JsonMetricsExporter, PrometheusTextfileExporter, open_metrics_exporter
+)
+from database360.probe_runner import ProbeRunner
+from database360.result_store import ResultStore
+from database360.testing.fake_server import FakeCatalogServer
+
+def make_summary():
+    summary = RunSummary(total=1)
+    metrics = ProbeMetrics()
+    with metrics.activate(), metrics.phase('search_fetch'):
+        record_response([200], body_bytes=42)
+    summary.add_probed({'catalog_probe': {}, 'purl_probe': {}}, metrics)
+    return summary.as_dict(shared_fetches={'hits': 2, 'misses': 3},
+                           parse_pool={'workers': 2, 'pages': 7, 'queue_wait': 0.5},
+                           shared_cache={'hits': 4, 'misses': 1, 'hit_rate': 0.8,
+                                         'namespaces': {'catalog_search': {'hits': 4, 'misses': 1}}}), metrics
+
+def test_json_exporter_writes_summary_and_resources(tmp_path):
+    """Test that the JSON exporter keeps per-resource metrics alongside the summary."""
+    summary, metrics = make_summary()
+    exporter = JsonMetricsExporter(tmp_path / 'metrics.json')
+    exporter.resource_finished({'database_name': 'Stored DB', 'catalog_probe': {}})
+    exporter.resource_finished({'database_name': 'Probed DB', 'metrics': metrics.as_dict()})
+    exporter.run_finished(summary)
+
+    data = json.loads((tmp_path / 'metrics.json').read_text())
+    assert data['summary']['probed'] == 1
+    assert [r['database_name'] for r in data['resources']] == ['Probed DB']
+    assert data['resources'][0]['phases']['search_fetch']['bytes'] == 42
+
+def test_json_exporter_skips_reused_results(tmp_path):
+    """Test that an incremental run only exports the resources it probed."""
+    with FakeCatalogServer() as server:
+        config = {'catalog_search_url': server.catalog_search_url, 'host_request_interval': 0}
+        resources = server.resources(2)
+        store = ResultStore(tmp_path / 'results.sqlite')
+        ProbeRunner(config, result_store=store).run_probes(resources[:1])
+
+        exporter = JsonMetricsExporter(tmp_path / 'metrics.json')
+        ProbeRunner(config, result_store=store, hooks=[exporter]).run_probes(resources)
+        store.close()
+
+    data = json.loads((tmp_path / 'metrics.json').read_text())
+    assert (data['summary']['probed'], data['summary']['reused']) == (1, 1)
+    assert [r['database_name'] for r in data['resources']] == [resources[1]['database_name']]
+
+def test_prometheus_exporter_writes_gauges(tmp_path):
+    """Test that the Prometheus exporter writes labelled gauges in the text format."""
+    summary, _ = make_summary()
+    PrometheusTextfileExporter(tmp_path / 'database360.prom').run_finished(summary)
+
+    text = (tmp_path / 'database360.prom').read_text()
+    assert '# TYPE database360_run_seconds gauge' in text
+    assert 'database360_resources{state="probed"} 1' in text
+    assert 'database360_phase_bytes{phase="search_fetch"} 42' in text
+    assert 'database360_http_responses{code="200"} 1' in text
+    assert 'database360_shared_fetches{result="hit"} 2' in text
+    assert 'database360_parse_pool_pages 7' in text
+    assert 'database360_shared_cache{namespace="catalog_search",result="miss"} 1' in text
+    assert list(tmp_path.iterdir()) == [tmp_path / 'database360.prom']
+
+def test_open_metrics_exporter_by_extension(tmp_path):
+    """Test that the exporter is chosen from the file extension."""
+    assert isinstance(open_metrics_exporter(str(tmp_path / 'm.json')), JsonMetricsExporter)
+    assert isinstance(open_metrics_exporter(str(tmp_path / 'm.prom')), PrometheusTextfileExporter)
+    with pytest.raises(ValueError):
+        open_metrics_exporter(str(tmp_path / 'm.txt'))
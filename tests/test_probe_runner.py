@@ -32,7 +32,12 @@ def test_probe_runner_with_custom_link_matcher(mock_probe_resource, mocker):
     mock_probe_resource.assert_called_once_with(
         'http://example.com',
         resource,
-        link_matcher=r'/custom/pattern/'
+        link_matcher=r'/custom/pattern/',
+        client=runner.client,
+        link_extractor=runner.link_extractor,
+        catalog_index=None,
+        single_flight=runner.single_flight,
+        shared_cache=None
     )
 
     # Verify results
@@ -58,7 +63,12 @@ def test_probe_runner_without_link_matcher(mock_probe_resource, mocker):
     mock_probe_resource.assert_called_once_with(
         'http://example.com',
         resource,
-        link_matcher=None
+        link_matcher=None,
+        client=runner.client,
+        link_extractor=runner.link_extractor,
+        catalog_index=None,
+        single_flight=runner.single_flight,
+        shared_cache=None
     )
 
     # Verify results
@@ -66,9 +76,9 @@ def test_probe_runner_without_link_matcher(mock_probe_resource, mocker):
     assert results[0]['database_name'] == 'Test DB'
     assert results[0]['catalog_probe'] == {'catalog_url_link': 'http://example.com/catalog/123'}
 
-def test_run_probes():
+def test_run_probes(fake_catalog):
     """Test that ProbeRunner can run probes on resources."""
-    institution_config = {'catalog_search_url': 'http://example.com'}
+    institution_config = {'catalog_search_url': fake_catalog.catalog_search_url, 'host_request_interval': 0}
     resources = [
         {'database_name': 'Test DB 1'},
         {'database_name': 'Test DB 2'}
@@ -82,3 +92,208 @@ def test_run_probes():
     assert results[1]['database_name'] == 'Test DB 2'
     assert 'catalog_probe' in results[0]
     assert 'catalog_probe' in results[1]
+
+def test_probe_runner_max_workers_from_config():
+    """Test that the worker count is read from the institution config."""
+    runner = ProbeRunner({'catalog_search_url': 'http://example.com', 'max_workers': 8.0})
+    assert runner.max_workers == 8
+
+    runner = ProbeRunner({'catalog_search_url': 'http://example.com', 'max_workers': float('nan')})
+    assert runner.max_workers == 1
+
+    runner = ProbeRunner({'catalog_search_url': 'http://example.com'}, max_workers=4)
+    assert runner.max_workers == 4
+
+@patch('database360.probe_runner.probe_purl')
+@patch('database360.probe_runner.probe_resource')
+def test_concurrent_run_preserves_input_order(mock_probe_resource, mock_probe_purl):
+    """Test that concurrent runs return results in input order."""
+    import time
+
+    def slow_first(catalog_search_url, resource, **kwargs):
+        # Make earlier resources finish later than the ones after them
+        time.sleep(0.05 * (5 - resource['index']))
+        return {'catalog_url_link': f"http://example.com/catalog/{resource['index']}"}
+
+    mock_probe_resource.side_effect = slow_first
+    mock_probe_purl.return_value = {}
+
+    runner = ProbeRunner({'catalog_search_url': 'http://example.com'}, max_workers=5)
+    resources = [{'database_name': f'DB {i}', 'index': i} for i in range(5)]
+    results = runner.run_probes(resources)
+
+    assert [r['database_name'] for r in results] == [f'DB {i}' for i in range(5)]
+    assert results[3]['catalog_probe'] == {'catalog_url_link': 'http://example.com/catalog/3'}
+
+@patch('database360.probe_runner.probe_purl')
+@patch('database360.probe_runner.probe_resource')
+def test_incremental_run_skips_unchanged_resources(mock_probe_resource, mock_probe_purl, tmp_path):
+    """Test that unchanged resources reuse stored results unless a full run is requested."""
+    from database360.result_store import ResultStore
+
+    mock_probe_resource.return_value = {'catalog_url_link': 'http://example.com/catalog/123'}
+    mock_probe_purl.return_value = {}
+    store = ResultStore(tmp_path / 'results.sqlite')
+    runner = ProbeRunner({'catalog_search_url': 'http://example.com'}, result_store=store)
+
+    resources = [{'database_name': 'Test DB 1'}, {'database_name': 'Test DB 2'}]
+    first = runner.run_probes(resources)
+    assert mock_probe_resource.call_count == 2
+
+    # Only the changed resource is probed again
+    resources[1] = {'database_name': 'Test DB 2', 'purl': 'http://example.com/new'}
+    second = runner.run_probes(resources)
+    assert mock_probe_resource.call_count == 3
+    # A reused result is not measured again, so it carries no metrics
+    assert second[0] == {key: value for key, value in first[0].items() if key != 'metrics'}
+    assert 'metrics' in second[1]
+
+    # A full run probes everything
+    runner.run_probes(resources, full=True)
+    assert mock_probe_resource.call_count == 5
+    store.close()
+
+@patch('database360.probe_runner.probe_purl')
+@patch('database360.probe_runner.probe_resource')
+def test_run_probes_writes_to_sink(mock_probe_resource, mock_probe_purl, mocker):
+    """Test that each result is written to the sink and iter_probes yields in order."""
+    mock_probe_resource.return_value = {}
+    mock_probe_purl.return_value = {}
+    sink = mocker.Mock()
+    runner = ProbeRunner({'catalog_search_url': 'http://example.com'})
+    resources = [{'database_name': 'Test DB 1'}, {'database_name': 'Test DB 2'}]
+
+    results = runner.run_probes(resources, sink=sink)
+    assert [call.args[0] for call in sink.write.call_args_list] == results
+
+    names = [result['database_name'] for result in runner.iter_probes(resources)]
+    assert names == ['Test DB 1', 'Test DB 2']
+
+@patch('database360.probe_runner.probe_purl')
+@patch('database360.probe_runner.probe_resource')
+def test_resume_skips_completed_resources(mock_probe_resource, mock_probe_purl, tmp_path):
+    """Test that a resumed run only probes resources missing from the checkpoint."""
+    from database360.checkpoint import Checkpoint
+
+    mock_probe_resource.return_value = {'catalog_url_link': 'http://example.com/catalog/1'}
+    mock_probe_purl.return_value = {}
+    checkpoint = Checkpoint(tmp_path / 'checkpoint.jsonl')
+    runner = ProbeRunner({'catalog_search_url': 'http://example.com'}, checkpoint=checkpoint)
+    resources = [{'database_name': 'Test DB 1'}, {'database_name': 'Test DB 2'}]
+
+    # Interrupt the run after the first resource
+    results = runner.iter_probes(resources)
+    next(results)
+    results.close()
+
+    mock_probe_resource.return_value = {'catalog_url_link': 'http://example.com/catalog/2'}
+    results = runner.run_probes(resources, resume=True)
+
+    assert mock_probe_resource.call_count == 2
+    assert results[0]['catalog_probe'] == {'catalog_url_link': 'http://example.com/catalog/1'}
+    assert results[1]['catalog_probe'] == {'catalog_url_link': 'http://example.com/catalog/2'}
+
+@pytest.mark.parametrize('backend', ['threads', 'asyncio'])
+def test_run_shares_identical_fetches(fake_catalog, backend):
+    """Test that resources sharing a PURL or catalog record fetch it once per run."""
+    first = fake_catalog.resources(1)[0]
+    resources = [
+        first,
+        dict(first),
+        {'database_name': 'Synthetic Database 00002', 'purl': first['purl'],
+         'database_home_page_should_contain_text': 'Welcome to'},
+    ]
+    runner = ProbeRunner({'catalog_search_url': fake_catalog.catalog_search_url, 'host_request_interval': 0,
+                          'max_workers': 3, 'probe_backend': backend})
+    results = runner.run_probes(resources)
+
+    assert [r['purl_probe'] for r in results] == [{'purl_led_to_database': True}] * 3
+    assert results[0]['catalog_probe'] == results[1]['catalog_probe']
+    assert results[2]['catalog_probe'] == {'catalog_url_link': f"{fake_catalog.base_url}/catalog/2"}
+    # Two searches, two record pages and one PURL chain
+    assert fake_catalog.request_counts['catalog'] == 4
+    assert fake_catalog.request_counts['purl'] == 1
+    assert runner.single_flight.stats() == {'hits': 4, 'misses': 5}
+
+@pytest.mark.parametrize('backend', ['threads', 'asyncio'])
+def test_run_reports_metrics_to_hooks(fake_catalog, backend):
+    """Test that each result carries per-phase metrics and hooks receive results and the run summary."""
+    from database360.instrumentation import ProbeHook
+
+    class RecordingHook(ProbeHook):
+        def __init__(self):
+            self.results = []
+            self.summaries = []
+
+        def resource_finished(self, result):
+            self.results.append(result['database_name'])
+
+        def run_finished(self, summary):
+            self.summaries.append(summary)
+
+    hook = RecordingHook()
+    resources = fake_catalog.resources(3)
+    runner = ProbeRunner({'catalog_search_url': fake_catalog.catalog_search_url, 'host_request_interval': 0,
+                          'max_workers': 2, 'probe_backend': backend}, hooks=[hook])
+    results = runner.run_probes(resources)
+
+    phases = results[0]['metrics']['phases']
+    assert phases['search_fetch']['requests'] == 1
+    assert phases['search_fetch']['status_codes'] == {'200': 1}
+    assert phases['record_fetch']['requests'] == 1
+    # The PURL redirects through the resolver to the vendor's landing page
+    assert phases['purl_fetch']['redirects'] == 2
+    assert phases['purl_fetch']['status_codes'] == {'302': 2, '200': 1}
+    assert phases['purl_fetch']['bytes'] > 0
+    assert 'search_parse' in phases and 'record_parse' in phases
+    assert results[0]['metrics']['requests'] == 5
+
+    assert hook.results == [r['database_name'] for r in resources]
+    assert hook.summaries == [runner.summary]
+    assert runner.summary['probed'] == 3
+    assert runner.summary['purl_matches'] == 3
+    assert runner.summary['requests'] == 15
+    assert runner.summary['status_codes'] == {'200': 9, '302': 6}
+
+@pytest.mark.parametrize('backend', ['threads', 'asyncio'])
+def test_streamed_resources_bounded_by_window(fake_catalog, backend):
+    """Test that an iterator of resources is read no further ahead than the resource window."""
+    resources = fake_catalog.resources(6)
+    pulled = []
+
+    def stream():
+        for resource in resources:
+            pulled.append(resource['database_name'])
+            yield resource
+
+    runner = ProbeRunner({'catalog_search_url': fake_catalog.catalog_search_url, 'host_request_interval': 0,
+                          'max_workers': 2, 'probe_backend': backend, 'resource_window': 2})
+    results = runner.iter_probes(stream())
+
+    first = next(results)
+    assert first['database_name'] == resources[0]['database_name']
+    assert len(pulled) == 2
+    names = [first['database_name']] + [result['database_name'] for result in results]
+    assert names == [resource['database_name'] for resource in resources]
+    assert runner.summary['resources'] == 6
+
+@patch('database360.probe_runner.probe_purl')
+@patch('database360.probe_runner.probe_resource')
+def test_resume_ignores_changed_inputs(mock_probe_resource, mock_probe_purl, tmp_path):
+    """Test that a resume probes again resources whose inputs or institution changed since the checkpoint."""
+    from database360.checkpoint import Checkpoint
+
+    mock_probe_resource.return_value = {'catalog_url_link': 'http://example.com/catalog/1'}
+    mock_probe_purl.return_value = {}
+    path = tmp_path / 'checkpoint.jsonl'
+    resources = [{'database_name': 'Test DB 1'}, {'database_name': 'Test DB 2'}]
+    ProbeRunner({'catalog_search_url': 'http://example.com'}, checkpoint=Checkpoint(path)).run_probes(resources)
+
+    changed = [{'database_name': 'Test DB 1', 'purl': 'http://example.com/purl/1'}, resources[1]]
+    ProbeRunner({'catalog_search_url': 'http://example.com'},
+                checkpoint=Checkpoint(path)).run_probes(changed, resume=True)
+    assert mock_probe_resource.call_count == 3
+
+    ProbeRunner({'catalog_search_url': 'http://other.example.com'},
+                checkpoint=Checkpoint(path)).run_probes(resources, resume=True)
+    assert mock_probe_resource.call_count == 5
@@ -0,0 +1,94 @@
+"""Tests for the result history and run diffs."""
+
+import json
+from database360.cli import main
+from database360.result_history import HistoryRecorder, ResultHistory, format_change, is_regression
+
+def result(name, link=None, text=None, error=None, led=None):
+    catalog = {key: value for key, value in (('catalog_url_link', link), ('purl_link_text', text), ('error', error))
+               if value is not None}
+    return {'database_name': name, 'catalog_probe': catalog,
+            'purl_probe': {} if led is None else {'purl_led_to_database': led}, 'metrics': {'seconds': 1}}
+
+BASELINE = [
+    result('Stable DB', '/catalog/1', 'Access', led=True),
+    result('Drifting DB', '/catalog/2', 'Access', led=True),
+    result('Broken DB', '/catalog/3', 'Access', led=True),
+    result('Vanished Link DB', '/catalog/4', led=False),
+    result('Old DB', '/catalog/5'),
+]
+LATEST = [
+    result('Stable DB', '/catalog/1', 'Access', led=True),
+    result('Drifting DB', '/catalog/2', 'Online access', led=True),
+    result('Broken DB', '/catalog/3', 'Access', led=False),
+    result('Vanished Link DB', error='HTTP 500'),
+    result('New DB', '/catalog/6', led=True),
+]
+
+def record_runs(path, *runs):
+    history = ResultHistory(path)
+    recorder = HistoryRecorder(history)
+    for results in runs:
+        for item in results:
+            recorder.resource_finished(item)
+        recorder.run_finished({'resources': len(results)})
+    return history
+
+def test_is_regression():
+    """Test that lost PURLs, lost catalog links and new errors are regressions, drift is not."""
+    assert is_regression({'purl_led_to_database': True}, {'purl_led_to_database': False})
+    assert is_regression({'catalog_url_link': '/catalog/1'}, {})
+    assert is_regression({}, {'catalog_error': 'HTTP 500'})
+    assert not is_regression({'purl_link_text': 'Access'}, {'purl_link_text': 'Online access'})
+    assert not is_regression({'purl_led_to_database': False}, {'purl_led_to_database': True})
+
+def test_iter_changes_streams_only_differences(tmp_path):
+    """Test that only changed, added and removed resources are reported."""
+    history = record_runs(tmp_path / 'history.sqlite', BASELINE, LATEST)
+    latest, baseline = history.finished_runs()
+
+    changes = {change['database_name']: change for change in history.iter_changes(baseline, latest)}
+
+    assert sorted(changes) == ['Broken DB', 'Drifting DB', 'New DB', 'Old DB', 'Vanished Link DB']
+    assert changes['Drifting DB'] == {'database_name': 'Drifting DB', 'status': 'changed',
+                                      'changes': {'purl_link_text': ['Access', 'Online access']},
+                                      'regression': False}
+    assert changes['Broken DB']['changes'] == {'purl_led_to_database': [True, False]}
+    assert changes['Broken DB']['regression']
+    assert changes['Vanished Link DB']['regression']
+    assert changes['Old DB']['status'] == 'removed'
+    assert changes['New DB']['status'] == 'added'
+    assert format_change(changes['Broken DB']) == "REGRESSION Broken DB: purl_led_to_database True -> False"
+    assert [row['purl_link_text'] for row in history.resource_history('Drifting DB')] == ['Access', 'Online access']
+    history.close()
+
+def test_unfinished_runs_are_not_diffed(tmp_path):
+    """Test that an interrupted run is skipped when choosing the runs to compare."""
+    history = record_runs(tmp_path / 'history.sqlite', BASELINE)
+    HistoryRecorder(history).resource_finished(LATEST[0])
+
+    assert len(history.finished_runs()) == 1
+    history.close()
+
+def test_diff_command_exit_codes(tmp_path, capsys):
+    """Test that the diff command fails on regressions and needs two finished runs."""
+    path = str(tmp_path / 'history.sqlite')
+    record_runs(path, BASELINE).close()
+    assert main(['diff', '--history', path]) == 2
+
+    record_runs(path, LATEST).close()
+    capsys.readouterr()
+    assert main(['diff', '--history', path]) == 1
+    output = capsys.readouterr().out.splitlines()
+    assert "CHANGED Drifting DB: purl_link_text 'Access' -> 'Online access'" in output
+    assert output[-1] == "Run 2 against run 1: 3 changed, 1 added, 1 removed, 2 regressions"
+
+    assert main(['diff', '--history', path, '--run', '1', '--baseline', '1', '--format', 'jsonl']) == 0
+    assert capsys.readouterr().out == ''
+
+    record_runs(path, LATEST).close()
+    assert main(['diff', '--history', path, '--fail-on', 'change']) == 0
+    capsys.readouterr()
+    assert main(['diff', '--history', path, '--baseline', '1', '--format', 'jsonl', '--fail-on', 'never']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert json.loads(lines[0])['database_name'] == 'Broken DB'
@@ -0,0 +1,78 @@
+"""Tests for result sinks."""
+
+import csv
+import json
+import sqlite3
+import pytest
+from database360.result_sinks import JsonlSink, CsvSink, SQLiteSink, open_sink, flatten_result
+
+RESULTS = [
+    {
+        'database_name': 'Test DB 1',
+        'catalog_probe': {'catalog_url_link': 'https://catalog.example.edu/catalog/1', 'purl_link_text': 'Online'},
+        'purl_probe': {'purl_led_to_database': True},
+    },
+    {
+        'database_name': 'Test DB 2',
+        'catalog_probe': {'error': 'timed out'},
+        'purl_probe': {},
+    },
+]
+
+def test_flatten_result():
+    """Test that nested results flatten to fixed columns."""
+    assert flatten_result(RESULTS[1]) == {
+        'database_name': 'Test DB 2',
+        'catalog_url_link': None,
+        'purl_link_text': None,
+        'catalog_error': 'timed out',
+        'purl_led_to_database': None,
+    }
+
+def test_jsonl_sink_writes_each_result_immediately(tmp_path):
+    """Test that each result is readable as soon as it is written."""
+    path = tmp_path / 'results.jsonl'
+    with JsonlSink(path) as sink:
+        sink.write(RESULTS[0])
+        assert json.loads(path.read_text().splitlines()[0]) == RESULTS[0]
+        sink.write(RESULTS[1])
+
+    assert [json.loads(line) for line in path.read_text().splitlines()] == RESULTS
+
+def test_csv_sink(tmp_path):
+    """Test that the CSV sink writes a header and one row per result."""
+    path = tmp_path / 'results.csv'
+    with CsvSink(path) as sink:
+        for result in RESULTS:
+            sink.write(result)
+    with CsvSink(path, append=True) as sink:
+        sink.write(RESULTS[0])
+
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['database_name'] for row in rows] == ['Test DB 1', 'Test DB 2', 'Test DB 1']
+    assert rows[0]['purl_led_to_database'] == 'True'
+    assert rows[1]['catalog_error'] == 'timed out'
+
+def test_sqlite_sink(tmp_path):
+    """Test that the SQLite sink stores flattened columns and the full result."""
+    path = tmp_path / 'results.sqlite'
+    with SQLiteSink(path) as sink:
+        for result in RESULTS:
+            sink.write(result)
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute('SELECT database_name, catalog_url_link, result FROM probe_results').fetchall()
+    conn.close()
+    assert rows[0][:2] == ('Test DB 1', 'https://catalog.example.edu/catalog/1')
+    assert json.loads(rows[1][2]) == RESULTS[1]
+
+def test_open_sink_by_extension(tmp_path):
+    """Test that the sink format is chosen from the file extension."""
+    for name, sink_class in [('r.jsonl', JsonlSink), ('r.csv', CsvSink), ('r.sqlite', SQLiteSink)]:
+        sink = open_sink(tmp_path / name)
+        assert isinstance(sink, sink_class)
+        sink.close()
+
+    with pytest.raises(ValueError):
+        open_sink(tmp_path / 'results.xlsx')
@@ -0,0 +1,47 @@
+"""Tests for the result store."""
+
+import time
+import pytest
+from database360.result_store import ResultStore, probe_succeeded, resource_fingerprint
+
+INSTITUTION = {'catalog_search_url': 'https://catalog.example.edu/catalog?q='}
+
+def test_fingerprint_tracks_probe_inputs():
+    """Test that the fingerprint changes only when probe inputs change."""
+    resource = {'database_name': 'Test DB', 'purl': 'https://resolver.example.edu/1', 'notes': 'a'}
+    base = resource_fingerprint(resource, INSTITUTION)
+
+    assert resource_fingerprint(dict(resource, notes='b'), INSTITUTION) == base
+    assert resource_fingerprint(dict(resource, purl='https://resolver.example.edu/2'), INSTITUTION) != base
+    assert resource_fingerprint(resource, dict(INSTITUTION, valid_catalog_links_match='/catalog/')) != base
+    # Missing, empty and NaN values are equivalent
+    assert resource_fingerprint(dict(resource, database_home_page_should_contain_text=float('nan')),
+                                INSTITUTION) == base
+
+def test_store_roundtrip_and_freshness(tmp_path):
+    """Test that fresh results are returned only for matching fingerprints."""
+    store = ResultStore(tmp_path / 'results.sqlite')
+    result = {'database_name': 'Test DB', 'catalog_probe': {}, 'purl_probe': {'purl_led_to_database': True}}
+    store.put('Test DB', 'abc', result)
+
+    assert store.get_fresh('Test DB', 'abc', max_age=60) == result
+    assert store.get_fresh('Test DB', 'changed', max_age=60) is None
+    assert store.get_fresh('Other DB', 'abc', max_age=60) is None
+
+    store.put('Test DB', 'abc', result, probed_at=time.time() - 120)
+    assert store.get_fresh('Test DB', 'abc', max_age=60) is None
+    store.close()
+
+    # Results persist across connections
+    reopened = ResultStore(tmp_path / 'results.sqlite')
+    assert reopened.get('Test DB')[0] == 'abc'
+    reopened.close()
+
+def test_probe_succeeded():
+    """Test that a result succeeds only with a catalog link and a matching PURL, if probed."""
+    found = {'catalog_url_link': 'https://catalog.example.edu/catalog/1'}
+
+    assert probe_succeeded({'catalog_probe': found})
+    assert probe_succeeded({'catalog_probe': found, 'purl_probe': {'purl_led_to_database': True}})
+    assert not probe_succeeded({'catalog_probe': found, 'purl_probe': {'purl_led_to_database': False}})
+    assert not probe_succeeded({'catalog_probe': {'error': 'timeout'}})
@@ -0,0 +1,117 @@
+"""Tests for the probe scheduler."""
+
+import time
+from database360.probe_runner import ProbeRunner
+from database360.result_store import ResultStore
+from database360.scheduler import ProbeScheduler
+from database360.testing.fake_server import FakeCatalogServer
+
+OK = {'catalog_probe': {'catalog_url_link': '/catalog/1'}, 'purl_probe': {'purl_led_to_database': True},
+      'metrics': {'seconds': 2.0}}
+BROKEN = {'catalog_probe': {'catalog_url_link': '/catalog/2'}, 'purl_probe': {'purl_led_to_database': False},
+          'metrics': {'seconds': 0.5}}
+
+def test_from_config():
+    """Test that a scheduler is only used with a deadline, a time budget or 'Prioritize Probes'."""
+    assert ProbeScheduler.from_config({}) is None
+    assert ProbeScheduler.from_config({'prioritize_probes': 'yes'}).deadline is None
+    assert ProbeScheduler.from_config({}, deadline=123.0).deadline == 123.0
+
+    scheduler = ProbeScheduler.from_config({'time_budget_minutes': '10'})
+    assert 590 < scheduler.time_left() <= 600
+
+def test_order_by_score(tmp_path):
+    """Test that the Priority column, failures, staleness and deferrals raise the score."""
+    store = ResultStore(tmp_path / 'results.sqlite')
+    now = time.time()
+    store.record_outcome('Fine DB', True, at=now)
+    store.record_outcome('Broken DB', True, at=now - 3600)
+    store.record_outcome('Broken DB', False, at=now)
+    store.record_outcome('Stale DB', True, at=now - 5 * 86400)
+    store.record_outcome('Deferred DB', True, at=now)
+    store.record_deferral('Deferred DB')
+    store.record_deferral('Deferred DB')
+    resources = [{'database_name': name} for name in ('Fine DB', 'Stale DB', 'Deferred DB', 'Broken DB', 'New DB')]
+    resources.append({'database_name': 'Key DB', 'priority': '2'})
+
+    scheduler = ProbeScheduler(store)
+
+    assert [resource['database_name'] for _, resource in scheduler.order(resources)] == \
+        ['Key DB', 'Broken DB', 'New DB', 'Deferred DB', 'Stale DB', 'Fine DB']
+    assert scheduler.order(resources)[0][0] == 6
+    assert round(scheduler.score(resources[1], now), 3) == 5
+    store.close()
+
+def test_admit_and_defer(tmp_path):
+    """Test that probes are admitted while their last duration fits and deferred with their stored result."""
+    store = ResultStore(tmp_path / 'results.sqlite')
+    store.put('Slow DB', 'abc', dict(OK, database_name='Slow DB'))
+    scheduler = ProbeScheduler(store, deadline=time.time() + 1)
+
+    assert not scheduler.admit({'database_name': 'Slow DB'})
+    assert scheduler.admit({'database_name': 'New DB'})
+    scheduler.probed(dict(BROKEN, database_name='New DB'))
+    assert scheduler.admit({'database_name': 'Other DB'})
+    assert scheduler.estimate({'database_name': 'Other DB'}) == 0.5
+
+    assert scheduler.defer({'database_name': 'Slow DB'}) == {
+        'catalog_probe': OK['catalog_probe'], 'purl_probe': OK['purl_probe'], 'database_name': 'Slow DB',
+        'deferred': True}
+    assert scheduler.defer({'database_name': 'Other DB'}) == {
+        'database_name': 'Other DB', 'catalog_probe': {}, 'purl_probe': {}, 'deferred': True}
+    states = store.schedule_states()
+    assert states['Slow DB'][2] == 1
+    assert states['New DB'][1] is not None
+    assert scheduler.stats()['deferred'] == 2
+    store.close()
+
+def test_runner_defers_after_deadline(tmp_path):
+    """Test that a run past its deadline defers every resource and the next run probes them first."""
+    with FakeCatalogServer() as server:
+        config = {'catalog_search_url': server.catalog_search_url, 'host_request_interval': 0}
+        resources = server.resources(3)
+        store = ResultStore(tmp_path / 'results.sqlite')
+
+        results = ProbeRunner(config, result_store=store).run_probes(resources, deadline=time.time() - 1)
+        assert all(result['deferred'] for result in results)
+        assert server.request_counts['catalog'] == 0
+
+        resources.insert(0, server.resources(1, start=9)[0])
+        runner = ProbeRunner(dict(config, prioritize_probes='yes'), result_store=store)
+        results = runner.run_probes(resources)
+        assert [result['database_name'] for result in results] == \
+            ['Synthetic Database 00001', 'Synthetic Database 00002', 'Synthetic Database 00003',
+             'Synthetic Database 00009']
+        assert runner.summary['schedule'] == {'deferred': 0, 'deadline': None}
+        assert store.schedule_states()['Synthetic Database 00001'][2] == 0
+        store.close()
+
+def test_reused_results_leave_the_schedule_unchanged(tmp_path):
+    """Test that a result reused from the store is not recorded as a probe of the run."""
+    with FakeCatalogServer() as server:
+        config = {'catalog_search_url': server.catalog_search_url, 'host_request_interval': 0,
+                  'prioritize_probes': 'yes'}
+        resources = server.resources(1)
+        store = ResultStore(tmp_path / 'results.sqlite')
+        ProbeRunner(config, result_store=store).run_probes(resources)
+        states = store.schedule_states()
+
+        runner = ProbeRunner(config, result_store=store)
+        results = runner.run_probes(resources)
+
+        assert 'metrics' not in results[0]
+        assert store.schedule_states() == states
+        assert runner.scheduler.estimate({'database_name': 'Other DB'}) == 0.0
+        assert runner.scheduler.estimate(resources[0]) > 0
+        store.close()
+
+def test_async_runner_cancels_probes_at_deadline():
+    """Test that the asyncio backend defers the probes still running at the deadline."""
+    with FakeCatalogServer(latency=0.5) as server:
+        config = {'catalog_search_url': server.catalog_search_url, 'host_request_interval': 0,
+                  'probe_backend': 'asyncio'}
+        runner = ProbeRunner(config)
+        results = runner.run_probes(server.resources(2), deadline=time.time() + 0.2)
+
+        assert [result.get('deferred') for result in results] == [True, True]
+        assert runner.summary['schedule']['deferred'] == 2
@@ -0,0 +1,93 @@
+"""Tests for the cache shared between processes."""
+
+import subprocess
+import sys
+import time
+import pytest
+from database360.probe_runner import ProbeRunner
+from database360.shared_cache import SharedCache, cached_json
+from database360.testing.fake_server import FakeCatalogServer
+
+@pytest.fixture
+def cache(tmp_path):
+    """Return an empty shared cache."""
+    cache = SharedCache(tmp_path / 'shared.sqlite', max_bytes=100)
+    yield cache
+    cache.close()
+
+def test_get_set_and_expiry(cache, mocker):
+    """Test that values are namespaced, expire after their TTL and are counted as hits or misses."""
+    cache.set('a', 'key', b'one')
+    cache.set_json('b', 'key', {'x': 1}, ttl=5)
+
+    assert cache.get('a', 'key') == b'one'
+    assert cache.get_json('b', 'key') == {'x': 1}
+    assert cache.get('a', 'other') is None
+
+    now = time.time()
+    mocker.patch('database360.shared_cache.time.time', return_value=now + 10)
+    assert cache.get_json('b', 'key') is None
+    assert cache.get('a', 'key') == b'one'
+
+    cache.delete('a', 'key')
+    assert cache.get('a', 'key') is None
+    assert cache.stats() == {'hits': 3, 'misses': 3, 'hit_rate': 0.5,
+                             'namespaces': {'a': {'hits': 2, 'misses': 2}, 'b': {'hits': 1, 'misses': 1}}}
+
+def test_prune_evicts_least_recently_used(cache, mocker):
+    """Test that the least recently used values are evicted beyond max_bytes."""
+    now = time.time()
+    clock = mocker.patch('database360.shared_cache.time.time')
+    for offset, key in enumerate(['old', 'used', 'new']):
+        clock.return_value = now + offset
+        cache.set('n', key, b'x' * 40)
+    clock.return_value = now + 3
+    cache.get('n', 'used')
+
+    cache.prune()
+
+    assert cache.get('n', 'old') is None
+    assert cache.get('n', 'used') is not None
+    assert cache.get('n', 'new') is not None
+
+def test_cached_json_skips_none(cache):
+    """Test that failed computations are not stored."""
+    assert cached_json(cache, 'n', 'key', lambda: None) is None
+    assert cached_json(cache, 'n', 'key', lambda: ['link']) == ['link']
+    assert cached_json(cache, 'n', 'key', lambda: pytest.fail("computed again")) == ['link']
+    assert cached_json(None, 'n', 'key', lambda: 'computed') == 'computed'
+
+def test_concurrent_processes(tmp_path):
+    """Test that several processes write to one cache at the same time."""
+    path = tmp_path / 'shared.sqlite'
+    script = ("import sys\nfrom database360.shared_cache import SharedCache\n"
+              "cache = SharedCache(sys.argv[1])\n"
+              "for i in range(200):\n    cache.set('n', f'{sys.argv[2]}-{i}', b'v')\n")
+    workers = [subprocess.Popen([sys.executable, '-c', script, str(path), str(worker)]) for worker in range(4)]
+    assert [worker.wait(timeout=60) for worker in workers] == [0, 0, 0, 0]
+
+    cache = SharedCache(path)
+    assert all(cache.get('n', f'{worker}-199') == b'v' for worker in range(4))
+    cache.close()
+
+def test_runners_share_catalog_results(tmp_path):
+    """Test that a second runner reuses the catalog links, record pages and PURL chains of the first."""
+    with FakeCatalogServer(redirect_hops=2) as server:
+        config = {'catalog_search_url': server.catalog_search_url, 'host_request_interval': 0,
+                  'shared_cache_file': str(tmp_path / 'shared.sqlite')}
+        resources = server.resources(3)
+        first = ProbeRunner(config).run_probes(resources)
+        catalog_requests = server.request_counts['catalog']
+        resolver_requests = server.request_counts['resolver']
+
+        runner = ProbeRunner(config)
+        second = runner.run_probes(resources)
+
+        assert [r['catalog_probe'] for r in second] == [r['catalog_probe'] for r in first]
+        assert all(r['purl_probe'] == {'purl_led_to_database': True} for r in second)
+        assert server.request_counts['catalog'] == catalog_requests
+        assert server.request_counts['resolver'] == resolver_requests
+        namespaces = runner.summary['shared_cache']['namespaces']
+        assert namespaces['catalog_search'] == {'hits': 3, 'misses': 0}
+        assert namespaces['catalog_record'] == {'hits': 3, 'misses': 0}
+        assert runner.summary['redirect_cache'] == {'hits': 3, 'misses': 0}
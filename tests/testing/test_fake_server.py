@@ -0,0 +1,52 @@
+"""Tests for the fake catalog server."""
+
+import requests
+from database360.probe_resources.probe_catalog import probe_resource
+from database360.probe_resources.probe_purl import probe_purl
+from database360.net.client import HttpClient
+from database360.testing.fake_server import FakeCatalogServer
+
+def test_search_page_lists_matching_document_first(fake_catalog):
+    """Test that a synthetic database name is the first search result."""
+    response = requests.get(fake_catalog.catalog_search_url + 'Synthetic Database 00007')
+
+    assert response.status_code == 200
+    assert response.text.index('/catalog/7"') < response.text.index('/catalog/100007"')
+    assert fake_catalog.request_counts['catalog'] == 1
+
+def test_unknown_name_has_no_results(fake_catalog):
+    """Test that names of other databases find nothing."""
+    response = requests.get(fake_catalog.catalog_search_url + 'Test DB')
+
+    assert '/catalog/' not in response.text.split('id="documents"')[1]
+
+def test_purl_redirect_chain():
+    """Test that a PURL reaches the landing page through the configured number of hops."""
+    with FakeCatalogServer(redirect_hops=3) as server:
+        response = requests.get(server.purl(5))
+
+    assert response.url.endswith('/vendor/5')
+    assert len(response.history) == 4
+    assert 'Welcome to Synthetic Database 00005' in response.text
+
+def test_error_rate_and_padding():
+    """Test that injected errors and padding are applied."""
+    with FakeCatalogServer(error_rate=1.0) as server:
+        assert requests.get(server.purl(1)).status_code == 503
+    with FakeCatalogServer(padding_bytes=10000) as server:
+        assert len(requests.get(server.purl(1)).content) > 10000
+
+def test_probes_match_synthetic_resources(fake_catalog):
+    """Test that the catalog and PURL probes succeed on synthetic resources."""
+    resource = fake_catalog.resources(1, start=3)[0]
+    client = HttpClient()
+
+    catalog_result = probe_resource(fake_catalog.catalog_search_url, resource, link_matcher=r'/catalog/\d+',
+                                    client=client)
+    purl_result = probe_purl(resource, client=client)
+
+    assert catalog_result == {
+        'catalog_url_link': f"{fake_catalog.base_url}/catalog/3",
+        'purl_link_text': 'Access Synthetic Database 00003',
+    }
+    assert purl_result == {'purl_led_to_database': True}